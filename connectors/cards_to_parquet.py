@@ -1,17 +1,17 @@
+import os
+import sys
+
 import pandas as pd
 import sqlite3
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scraping-scripts")
+)
 
-def init_driver():
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service)
-    return driver
+from chromedriver import init_driver  # noqa: E402
 
 
 def scrape_cards(driver, link):
@@ -73,11 +73,13 @@ if __name__ == "__main__":
     link = "http://ufcstats.com/statistics/events/completed?page=all"
     cards_df = scrape_cards(driver, link)
 
-    # Specify the path and name of the Excel file you want to create
-    excel_file_path = "cards.xlsx"  # Update this path
-    # Save the DataFrame to an Excel file
-    cards_df.to_excel(excel_file_path, index=False)
+    # Write a Parquet dataset partitioned by event year/month (same layout as
+    # scraping-scripts/parquet_store.py) instead of a slow openpyxl workbook
+    parquet_path = "parquet/cards"  # Update this path
+    cards_df.assign(
+        year=cards_df["date"].dt.year, month=cards_df["date"].dt.month
+    ).to_parquet(parquet_path, partition_cols=["year", "month"], index=False)
 
-    print(f"Saved scraped data to '{excel_file_path}'.")
+    print(f"Saved scraped data to '{parquet_path}'.")
 
     driver.quit()
@@ -1,28 +1,66 @@
+import os
+import sys
+
 import pandas as pd
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scraping-scripts")
+)
+
+import migrations  # noqa: E402
+
+# Define paths to the Parquet datasets written by cards_to_parquet.py and
+# tests/fights_to_parquet.py (or scraping-scripts/parquet_store.py)
+fights_path = "parquet/fights"  # Update this path
+cards_path = "parquet/cards"  # Update this path
+
+# Rows are merged into the keyed tables instead of replacing them, so the
+# primary keys, indexes and details_scraped flags survive a reload
+UPSERT_CARDS = """
+    INSERT INTO All_Cards (card_link, title, date, location, eventID)
+    SELECT card_link, title, date, location, eventID FROM Staging_Cards WHERE true
+    ON CONFLICT (card_link) DO UPDATE SET
+        title = excluded.title,
+        date = excluded.date,
+        location = excluded.location,
+        eventID = excluded.eventID
+"""
 
-# Define paths to the Excel files
-fights_file_path = "fights_data.xlsx"  # Update this path
-cards_file_path = "cards.xlsx"  # Update this path
+UPSERT_FIGHTS = """
+    INSERT INTO All_Fights (fight_link, card_link, eventID)
+    SELECT f.fight_link, c.card_link, f.eventID
+    FROM Staging_Fights f
+    LEFT JOIN All_Cards c ON c.eventID = f.eventID
+    WHERE true
+    ON CONFLICT (fight_link) DO UPDATE SET
+        card_link = excluded.card_link,
+        eventID = excluded.eventID
+"""
 
 # Create a SQLAlchemy engine for the SQLite database
 engine = create_engine("sqlite:///UFC_Data.db")
+migrations.migrate(engine)
 
-# Read the data from Excel files into Pandas DataFrames
-fights_df = pd.read_excel(fights_file_path)
-cards_df = pd.read_excel(cards_file_path)
-
-# Check if the date column is in number format and convert if necessary
-if cards_df["date"].dtype == "float64":
-    cards_df["date"] = pd.TimedeltaIndex(cards_df["date"], unit="d") + pd.to_datetime(
-        "1899-12-30"
-    )
-elif cards_df["date"].dtype != "datetime64[ns]":
-    # Attempt to convert to datetime if not already
-    cards_df["date"] = pd.to_datetime(cards_df["date"])
+# Read the datasets into Pandas DataFrames; only the columns each table keeps
+# are loaded, and Parquet keeps the dates typed so no Excel serial-date fixup
+# is needed
+fights_df = pd.read_parquet(fights_path, columns=["fight_link", "eventID"])
+cards_df = pd.read_parquet(
+    cards_path, columns=["card_link", "title", "date", "location", "eventID"]
+)
 
 # Write the data to tables in the SQLite database
-fights_df.to_sql("All_Fights", engine, if_exists="replace", index=False)
-cards_df.to_sql("All_Cards", engine, if_exists="replace", index=False)
+with engine.begin() as conn:
+    cards_df.drop_duplicates("card_link").to_sql(
+        "Staging_Cards", conn, if_exists="replace", index=False
+    )
+    fights_df.drop_duplicates("fight_link").to_sql(
+        "Staging_Fights", conn, if_exists="replace", index=False
+    )
+    conn.execute(text(UPSERT_CARDS))
+    conn.execute(text(UPSERT_FIGHTS))
+    conn.execute(text("DROP TABLE Staging_Cards"))
+    conn.execute(text("DROP TABLE Staging_Fights"))
 
 print("Data has been successfully written to the UFC Data database.")
@@ -1,61 +1,89 @@
+import argparse
 import sqlite3
 
 
-def split_and_update(db_path):
+# "X of Y" text columns to split into <COL>_SUCCESSFUL / <COL>_ATTEMPTS
+SPLIT_COLUMNS = {
+    "Fight_Details": ["SIG_STR", "TOTAL_STR", "TD"],
+    "Significant_Strikes": ["HEAD", "BODY", "LEG", "DISTANCE", "CLINCH", "GROUND"],
+}
+
+
+def split_expressions(column):
+    # Values that aren't "X of Y" (missing or "---") become NULL, as they do
+    # when the scrapers type them at parse time
+    sep = f"instr(upper({column}), ' OF ')"
+    successful = (
+        f"CASE WHEN {sep} > 0 "
+        f"THEN CAST(trim(substr({column}, 1, {sep} - 1)) AS INTEGER) END"
+    )
+    attempts = (
+        f"CASE WHEN {sep} > 0 "
+        f"THEN CAST(trim(substr({column}, {sep} + 4)) AS INTEGER) END"
+    )
+    return successful, attempts
+
+
+def add_missing_columns(cursor, table, columns):
+    existing = {row[1].upper() for row in cursor.execute(f"PRAGMA table_info({table})")}
+    for column in columns:
+        for suffix in ("SUCCESSFUL", "ATTEMPTS"):
+            if f"{column}_{suffix}" not in existing:
+                cursor.execute(
+                    f"ALTER TABLE {table} ADD COLUMN {column}_{suffix} INTEGER"
+                )
+
+
+def split_statement(table, column, full=False):
+    successful, attempts = split_expressions(column)
+    # Rows from the typed writer have no raw text, only the typed columns,
+    # which must not be overwritten
+    statement = (
+        f"UPDATE {table} SET {column}_SUCCESSFUL = {successful}, "
+        f"{column}_ATTEMPTS = {attempts} WHERE {column} IS NOT NULL"
+    )
+    if not full:
+        # Rows not split yet are still NULL; rows split wrongly before, e.g.
+        # stored as 0, no longer match their text either
+        statement += (
+            f" AND ({column}_SUCCESSFUL IS NOT {successful} "
+            f"OR {column}_ATTEMPTS IS NOT {attempts})"
+        )
+    return statement
+
+
+def split_and_update(db_path, full=False):
+    """
+    Splits the "X of Y" stat columns into numeric successful/attempts columns
+    with one set-based UPDATE per column. Only rows that still hold the raw
+    text are touched.
+
+    Parameters:
+    db_path: Path to the SQLite database.
+    full: Re-split every row with raw text instead of only rows whose split
+        columns don't match it.
+    """
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
 
-    cursor.execute("SELECT rowid, SIG_STR, TOTAL_STR, TD FROM Fight_Details")
-    rows = cursor.fetchall()
-
-    for row in rows:
-        rowid, sig_str, total_str, td = row
-        # Ensure all values are treated as strings for split operation
-        sig_str = str(sig_str)
-        total_str = str(total_str)
-        td = str(td)
-
-        # Process SIG_STR
-        if " OF " in sig_str:
-            sig_str_parts = sig_str.split(" OF ")
-            sig_str_successful, sig_str_attempts = map(int, sig_str_parts)
-        else:
-            sig_str_successful = sig_str_attempts = 0
-
-        # Process TOTAL_STR
-        if " OF " in total_str:
-            total_str_parts = total_str.split(" OF ")
-            total_str_successful, total_str_attempts = map(int, total_str_parts)
-        else:
-            total_str_successful = total_str_attempts = 0
-
-        # Process TD
-        if " OF " in td:
-            td_parts = td.split(" OF ")
-            td_successful, td_attempts = map(int, td_parts)
-        else:
-            td_successful = td_attempts = 0
-
-        # Execute the update query
-        cursor.execute(
-            """UPDATE Fight_Details SET 
-            SIG_STR_SUCCESSFUL=?, SIG_STR_ATTEMPTS=?, 
-            TOTAL_STR_SUCCESSFUL=?, TOTAL_STR_ATTEMPTS=?, 
-            TD_SUCCESSFUL=?, TD_ATTEMPTS=? 
-            WHERE rowid=?""",
-            (
-                sig_str_successful,
-                sig_str_attempts,
-                total_str_successful,
-                total_str_attempts,
-                td_successful,
-                td_attempts,
-                rowid,
-            ),
-        )
+    for table, columns in SPLIT_COLUMNS.items():
+        add_missing_columns(cursor, table, columns)
+
+        updated = 0
+        for column in columns:
+            cursor.execute(split_statement(table, column, full))
+            updated += cursor.rowcount
+        print(f"Split {updated} values in {table}")
 
     conn.commit()
     conn.close()
 
 
-split_and_update("UFC_Data.db")
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Split "X of Y" stat columns')
+    parser.add_argument("--db", default="UFC_Data.db")
+    parser.add_argument(
+        "--full", action="store_true", help="Re-split rows that were already split"
+    )
+    args = parser.parse_args()
+    split_and_update(args.db, full=args.full)
@@ -1,23 +1,59 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from webdriver_manager.chrome import ChromeDriverManager
 import pandas as pd
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from sqlalchemy import create_engine
-from sqlalchemy import text
-from tqdm import tqdm
+from sqlalchemy import create_engine, make_url, text
+import argparse
+import functools
+
+import crawler
+import db_writer
+import driver_pool
+import driver_profiles
+import js_extract
+import metrics
+import migrations
+import page_cache
+import rate_limit
+import retry
+import work_queue
+import ufc_parsers
+from chromedriver import init_driver
+from ufc_http import init_session, is_http_session, fetch_html
+
+
+def wait_for(driver, condition, css_selector, timeout=10):
+    """
+    Waits until expected_conditions.<condition> holds for css_selector.
+    """
+    # Selenium is imported on first use, so HTTP scrapes and DB-only jobs
+    # never pay for it
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    WebDriverWait(driver, timeout).until(
+        getattr(EC, condition)((By.CSS_SELECTOR, css_selector))
+    )
+
+
+def init_backend(backend, driver_profile=driver_profiles.DEFAULT_PROFILE):
+    # The HTTP backend is the default; Selenium is kept as an opt-in fallback
+    if backend == "selenium":
+        return init_driver(profile=driver_profile)
+    return init_session()
+
 
+def close_backend(driver):
+    if is_http_session(driver):
+        driver.close()
+    else:
+        driver.quit()
 
-def init_driver():
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service)
-    return driver
+
+EVENTS_URL = "http://ufcstats.com/statistics/events/completed?page=all"
+DEFAULT_DB_URL = "sqlite:///UFC_Data.db"
 
 
 # Setup the database connection
-engine = create_engine("sqlite:///UFC_Data.db")
+engine = create_engine(DEFAULT_DB_URL)
 
 
 def get_unprocessed_event_links(engine):
@@ -31,8 +67,8 @@ def get_unprocessed_event_links(engine):
     pd.DataFrame: DataFrame containing event links that need processing.
     """
     query = """
-    SELECT card_link FROM All_Cards
-    WHERE details_scraped IS FALSE OR details_scraped IS NULL
+    SELECT card_link AS card_link FROM All_Cards
+    WHERE details_scraped IS NOT TRUE
     """
     df = pd.read_sql_query(query, engine)
     return df["card_link"].tolist()
@@ -41,411 +77,543 @@ def get_unprocessed_event_links(engine):
 def get_unprocessed_fight_links(engine):
 
     query = """
-    SELECT fight_link
+    SELECT fight_link AS fight_link
     FROM All_Fights
-    WHERE details_scraped = 'FALSE' OR details_scraped IS NULL
+    WHERE details_scraped IS NOT TRUE
     """
     unscraped_fights_df = pd.read_sql(query, engine)
     return unscraped_fights_df["fight_link"].tolist()
 
 
+def get_unprofiled_fighter_links(engine):
+    # Fighters is keyed on the link, so every fighter is listed once however
+    # many fights they appear in
+    query = """
+    SELECT fighter_link AS fighter_link
+    FROM Fighters
+    WHERE profile_scraped IS NOT TRUE
+    """
+    return pd.read_sql_query(query, engine)["fighter_link"].tolist()
+
+
 def scrape_cards(driver, link):
-    driver.get(link)
-    WebDriverWait(driver, 10).until(
-        EC.visibility_of_all_elements_located(
-            (By.CSS_SELECTOR, "a.b-link.b-link_style_black")
+    if is_http_session(driver):
+        return ufc_parsers.parse_cards(fetch_html(driver, link), base_url=link)
+
+    with metrics.timed("fetch"):
+        driver.get(link)
+    with metrics.timed("wait"):
+        wait_for(
+            driver, "visibility_of_all_elements_located", "a.b-link.b-link_style_black"
         )
-    )
-    event_rows = driver.find_elements(
-        By.CSS_SELECTOR,
-        "body > section > div > div > div > div.b-statistics__sub-inner > div > table > tbody > tr",
-    )
-    cards = []
+    # Read the whole events table in one execute_script call
+    return js_extract.extract_cards(driver)
+
 
-    for row in event_rows:
-        card_link_elements = row.find_elements(
-            By.CSS_SELECTOR, "a.b-link.b-link_style_black"
+def fetch_event_page(driver, card_link, eventID):
+    # Raises on failure so callers can retry or record it
+    if is_http_session(driver):
+        return ufc_parsers.parse_event_page(
+            fetch_html(driver, card_link), eventID, base_url=card_link
         )
-        if card_link_elements:
-            card_link = card_link_elements[0].get_attribute("href")
-            title = card_link_elements[0].text
-        else:
-            card_link = ""
-            title = ""
-
-        date_elements = row.find_elements(By.CSS_SELECTOR, "td:nth-child(1)")
-        location_elements = row.find_elements(By.CSS_SELECTOR, "td:nth-child(2)")
-
-        date = date_elements[0].text.split("\n")[-1] if date_elements else ""
-        location = location_elements[0].text if location_elements else ""
-
-        if title:  # Only add to cards if there is a title
-            cards.append(
-                {
-                    "card_link": card_link,
-                    "title": title,
-                    "date": date,
-                    "location": location,
-                }
-            )
 
-    cards_df = pd.DataFrame(cards)
-    # Convert date text to datetime
-    cards_df["date"] = pd.to_datetime(cards_df["date"])
-    # Sort by date in descending order
-    cards_df = cards_df.sort_values(by="date", ascending=False).reset_index(drop=True)
-    # Assign eventID starting from the total number of events for the most recent event
-    total_events = len(cards_df)
-    cards_df["eventID"] = range(total_events, 0, -1)
-    # Assign eventID with leading zeros
-    cards_df["eventID"] = cards_df["eventID"].apply(lambda x: f"{x:04}")
+    with metrics.timed("fetch"):
+        driver.get(card_link)
+    with metrics.timed("wait"):
+        wait_for(
+            driver, "presence_of_all_elements_located", "tr.b-fight-details__table-row"
+        )
+    return js_extract.extract_event_page(driver, eventID)
 
-    return cards_df
 
+def scrape_event_pages(driver, cards_df):
+    """
+    Loads every card's event page once, yielding both its fight links and its
+    Event_Details rows as soon as the page is parsed, so callers can write one
+    card at a time instead of holding every card's rows.
 
-def scrape_fights(driver, cards_df):
-    all_fights = []
-    # Iterate over the first five cards
-    for index, row in cards_df.iloc[:].iterrows():
-        card_link = row["card_link"]
-        eventID = row["eventID"]
+    Parameters:
+    driver: Selenium WebDriver or HTTP session from init_backend.
+    cards_df: Cards with card_link and eventID columns.
 
-        driver.get(card_link)
+    Yields:
+    tuple: (All_Fights DataFrame of fight_link and eventID, Event_Details
+    DataFrame) per card. Cards whose page failed are skipped.
+    """
+    for card_link, eventID in zip(cards_df["card_link"], cards_df["eventID"]):
         try:
-            WebDriverWait(driver, 10).until(
-                EC.visibility_of_element_located(
-                    (By.CSS_SELECTOR, 'a[href*="fight-details"]')
-                )
-            )
-            fights_elements = driver.find_elements(
-                By.CSS_SELECTOR, 'a[href*="fight-details"]'
+            fights, event_details_df = retry.call_with_retry(
+                lambda: fetch_event_page(driver, card_link, eventID), card_link
             )
-            fights = [
-                {"fight_link": element.get_attribute("href"), "eventID": eventID}
-                for element in fights_elements
-            ]
-            all_fights.extend(fights)
-        except Exception as e:
+        except retry.ScrapeFailure as failure:
             print(
-                f"An error occurred while scraping event details from {card_link}: {e}"
+                f"An error occurred while scraping event details from {card_link}: "
+                f"{failure}"
             )
+            continue
+        yield pd.DataFrame(fights), event_details_df
+
 
-    df_fights = pd.DataFrame(all_fights)
-    return df_fights
+def scrape_fights(driver, cards_df):
+    frames = [fights_df for fights_df, _ in scrape_event_pages(driver, cards_df)]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
 
 
-def scrape_event_details(driver, event_links):
-    all_event_details = []
+def fetch_event_details(driver, event_link):
+    # Raises on failure so callers can retry or record it
+    if is_http_session(driver):
+        return ufc_parsers.parse_event_details(
+            fetch_html(driver, event_link), base_url=event_link
+        )
 
+    with metrics.timed("fetch"):
+        driver.get(event_link)
+    with metrics.timed("wait"):
+        wait_for(
+            driver, "presence_of_all_elements_located", "tr.b-fight-details__table-row"
+        )
+    # Serialize every fight row in one round-trip instead of
+    # ~10 find_element calls per row
+    return js_extract.extract_event_details(driver)
+
+
+def iter_event_details(driver, event_links, handle_failure=None):
+    """
+    Scrapes event pages one at a time, yielding ("Event_Details", df) per
+    event so callers can stream rows to a sink instead of accumulating them.
+    Transient errors are retried; pages that still fail go to handle_failure.
+    """
     for event_link in event_links:
         try:
-            driver.get(event_link)
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_all_elements_located(
-                    (By.CSS_SELECTOR, "tr.b-fight-details__table-row")
-                )
-            )
-            # Extract event title here
-            event_title_element = driver.find_element(
-                By.CSS_SELECTOR, "body > section > div > h2 > span"
-            )
-            event_title = (
-                event_title_element.text.strip()
-            )  # Use strip() to remove any excess whitespace
-
-            details_rows = driver.find_elements(
-                By.CSS_SELECTOR, "tr.b-fight-details__table-row"
+            yield "Event_Details", retry.call_with_retry(
+                lambda: fetch_event_details(driver, event_link), event_link
             )
-            num_rows = len(details_rows)
-
-            for i in range(1, num_rows + 1):
-                # Attempt to dynamically check for NC status within the fight details
-                nc_check_selector = f"tr:nth-child({i}) > td.b-fight-details__table-col.b-fight-details__table-col_style_align-top > p:nth-child(1)"
-                nc_elements = driver.find_elements(By.CSS_SELECTOR, nc_check_selector)
-                is_nc = any("NC" in el.text for el in nc_elements)
-
-                # Shared details extraction remains the same
-                weight_class_selector = f"tr:nth-child({i}) > td:nth-child(7) > p"
-                method_selector = (
-                    f"tr:nth-child({i}) > td:nth-child(8) > p:nth-child(1)"
-                )
-                round_selector = f"tr:nth-child({i}) > td:nth-child(9) > p"
-                time_selector = f"tr:nth-child({i}) > td:nth-child(10) > p"
-
-                weight_class = driver.find_element(
-                    By.CSS_SELECTOR, weight_class_selector
-                ).text
-                method = driver.find_element(By.CSS_SELECTOR, method_selector).text
-                round = driver.find_element(By.CSS_SELECTOR, round_selector).text
-                time = driver.find_element(By.CSS_SELECTOR, time_selector).text
-
-                # Iterate for each fighter in the row
-                for j in range(1, 3):
-                    row_index = i  # Adjust for 1-based indexing in CSS
-                    fighter_name_selector = f"tr:nth-child({row_index}) > td:nth-child(2) > p:nth-child({j}) > a"
-                    kd_selector = f"tr:nth-child({row_index}) > td:nth-child(3) > p:nth-child({j})"
-                    str_selector = f"tr:nth-child({row_index}) > td:nth-child(4) > p:nth-child({j})"
-                    td_selector = f"tr:nth-child({row_index}) > td:nth-child(5) > p:nth-child({j})"
-                    sub_selector = f"tr:nth-child({row_index}) > td:nth-child(6) > p:nth-child({j})"
-
-                    fighter_name = driver.find_element(
-                        By.CSS_SELECTOR, fighter_name_selector
-                    ).text
-                    kd = driver.find_element(By.CSS_SELECTOR, kd_selector).text
-                    str = driver.find_element(By.CSS_SELECTOR, str_selector).text
-                    td = driver.find_element(By.CSS_SELECTOR, td_selector).text
-                    sub = driver.find_element(By.CSS_SELECTOR, sub_selector).text
-
-                    # Assign "NC" to both fighters if the NC flag is found; otherwise, assign "WIN" to the first and "LOSS" to the second
-                    w_l = "NC" if is_nc else ("WIN" if j == 1 else "LOSS")
-
-                    fighter_details = {
-                        "W/L": w_l,
-                        "Fighter": fighter_name,
-                        "KD": kd,
-                        "STR": str,
-                        "TD": td,
-                        "SUB": sub,
-                        "Weight Class": weight_class,
-                        "Method": method,
-                        "Round": round,
-                        "Time": time,
-                        "Event Title": event_title,
-                    }
-                    all_event_details.append(fighter_details)
-
-        except Exception as e:
+        except retry.ScrapeFailure as failure:
             print(
-                f"An error occurred while scraping event details from {event_link}: {e}"
+                f"An error occurred while scraping event details from {event_link}: "
+                f"{failure}"
             )
+            if handle_failure is not None:
+                handle_failure(event_link, failure)
 
-    return pd.DataFrame(all_event_details)
 
+def scrape_event_details(driver, event_links):
+    frames = [df for _, df in iter_event_details(driver, event_links)]
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
 
-def scrape_fight_details(driver, fight_link):
-    try:
+
+def extract_fight_page(driver):
+    # Reads both stats tables from the fight page the driver is already on
+    with metrics.timed("wait"):
+        wait_for(
+            driver,
+            "presence_of_all_elements_located",
+            "body > section > div > div > section:nth-child(3) > p",
+        )
+        wait_for(
+            driver,
+            "presence_of_all_elements_located",
+            "body > section > div > div > table > tbody > tr",
+        )
+    return js_extract.extract_fight_page(driver)
+
+
+def fetch_fight_page(driver, fight_link):
+    # Raises on failure so callers can retry or record it
+    if is_http_session(driver):
+        return ufc_parsers.parse_fight_page(
+            fetch_html(driver, fight_link), base_url=fight_link
+        )
+
+    with metrics.timed("fetch"):
         driver.get(fight_link)
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_all_elements_located(
-                (
-                    By.CSS_SELECTOR,
-                    "body > section > div > div > section:nth-child(3) > p",
-                )
-            )
+    return extract_fight_page(driver)
+
+
+def fetch_fighter_profile(driver, fighter_link):
+    # Raises on failure so callers can retry or record it
+    if is_http_session(driver):
+        return ufc_parsers.parse_fighter_profile(
+            fetch_html(driver, fighter_link), base_url=fighter_link
         )
-        event_title_element = driver.find_element(
-            By.CSS_SELECTOR, "body > section > div > h2 > a"
+
+    with metrics.timed("fetch"):
+        driver.get(fighter_link)
+    with metrics.timed("wait"):
+        wait_for(
+            driver, "presence_of_element_located", "span.b-content__title-highlight"
         )
-        EVENT_TITLE = event_title_element.text.strip()
-
-        # Initialize data structure
-        data = {
-            "FIGHTER": [],
-            "KD": [],
-            "SIG_STR": [],
-            "SIG_STR_PCT": [],
-            "TOTAL_STR": [],
-            "TD": [],
-            "TD_PCT": [],
-            "SUB_ATT": [],
-            "REV": [],
-            "CTRL": [],
-            "EVENT_TITLE": [],
-        }
-
-        # Define selectors for each data point for both fighters
-        selectors = {
-            "FIGHTER": [
-                "body > section > div > div > section:nth-child(4) > table > tbody > tr > td.b-fight-details__table-col.l-page_align_left > p:nth-child(1) > a",
-                "body > section > div > div > section:nth-child(4) > table > tbody > tr > td.b-fight-details__table-col.l-page_align_left > p:nth-child(2) > a",
-            ],
-            "KD": [
-                "body > section > div > div > section:nth-child(4) > table > tbody > tr > td:nth-child(2) > p:nth-child(1)",
-                "body > section > div > div > section:nth-child(4) > table > tbody > tr > td:nth-child(2) > p:nth-child(2)",
-            ],
-            "SIG_STR": [
-                "body > section > div > div > section:nth-child(4) > table > tbody > tr > td:nth-child(3) > p:nth-child(1)",
-                "body > section > div > div > section:nth-child(4) > table > tbody > tr > td:nth-child(3) > p:nth-child(2)",
-            ],
-            "SIG_STR_PCT": [
-                "body > section > div > div > section:nth-child(4) > table > tbody > tr > td:nth-child(4) > p:nth-child(1)",
-                "body > section > div > div > section:nth-child(4) > table > tbody > tr > td:nth-child(4) > p:nth-child(2)",
-            ],
-            "TOTAL_STR": [
-                "body > section > div > div > section:nth-child(4) > table > tbody > tr > td:nth-child(5) > p:nth-child(1)",
-                "body > section > div > div > section:nth-child(4) > table > tbody > tr > td:nth-child(5) > p:nth-child(2)",
-            ],
-            "TD": [
-                "body > section > div > div > section:nth-child(4) > table > tbody > tr > td:nth-child(6) > p:nth-child(1)",
-                "body > section > div > div > section:nth-child(4) > table > tbody > tr > td:nth-child(6) > p:nth-child(2)",
-            ],
-            "TD_PCT": [
-                "body > section > div > div > section:nth-child(4) > table > tbody > tr > td:nth-child(7) > p:nth-child(1)",
-                "body > section > div > div > section:nth-child(4) > table > tbody > tr > td:nth-child(7) > p:nth-child(2)",
-            ],
-            "SUB_ATT": [
-                "body > section > div > div > section:nth-child(4) > table > tbody > tr > td:nth-child(8) > p:nth-child(1)",
-                "body > section > div > div > section:nth-child(4) > table > tbody > tr > td:nth-child(8) > p:nth-child(2)",
-            ],
-            "REV": [
-                "body > section > div > div > section:nth-child(4) > table > tbody > tr > td:nth-child(9) > p:nth-child(1)",
-                "body > section > div > div > section:nth-child(4) > table > tbody > tr > td:nth-child(9) > p:nth-child(2)",
-            ],
-            "CTRL": [
-                "body > section > div > div > section:nth-child(4) > table > tbody > tr > td:nth-child(10) > p:nth-child(1)",
-                "body > section > div > div > section:nth-child(4) > table > tbody > tr > td:nth-child(10) > p:nth-child(2)",
-            ],
-        }
-
-        # Extract data for both fighters across all categories
-        for category, sel_pair in selectors.items():
-            element1 = driver.find_element(By.CSS_SELECTOR, sel_pair[0])
-            element2 = driver.find_element(By.CSS_SELECTOR, sel_pair[1])
-            data[category].append(element1.text if element1 else "N/A")
-            data[category].append(element2.text if element2 else "N/A")
-
-        data["EVENT_TITLE"].extend([EVENT_TITLE] * 2)
-        # Create DataFrame
-        fight_Details = pd.DataFrame(data)
-
-        return fight_Details
-
-    except Exception as e:
-        print(f"An error occurred while scraping fight details: {e}")
-        return pd.DataFrame()
+    return js_extract.extract_fighter_profile(driver)
 
 
-def scrape_significant_strikes(driver, fight_link):
+def scrape_fight_page(driver, fight_link):
+    """
+    Loads a fight page once and extracts both of its stats tables, retrying
+    transient errors with backoff.
+
+    Parameters:
+    driver: Selenium WebDriver or HTTP session from init_backend.
+    fight_link: URL of the ufcstats fight-details page.
+
+    Returns:
+    tuple: (Fight_Details DataFrame, Significant_Strikes DataFrame), both empty on failure.
+    """
     try:
-        driver.get(fight_link)
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_all_elements_located(
-                (By.CSS_SELECTOR, "body > section > div > div > table > tbody > tr")
-            )
+        return retry.call_with_retry(
+            lambda: fetch_fight_page(driver, fight_link), fight_link
+        )
+    except retry.ScrapeFailure as failure:
+        print(f"An error occurred while scraping fight page {fight_link}: {failure}")
+        return pd.DataFrame(), pd.DataFrame()
+
+
+def iter_fight_pages(driver, fight_links):
+    """
+    Scrapes fight pages one at a time, yielding ("Fight_Details", df) and
+    ("Significant_Strikes", df) for every page.
+    """
+    for fight_link in fight_links:
+        fight_details_df, sig_strike_df = scrape_fight_page(driver, fight_link)
+        # Tag rows with their fight, as the database writer does
+        yield "Fight_Details", fight_details_df.assign(FIGHT_LINK=fight_link)
+        yield "Significant_Strikes", sig_strike_df.assign(FIGHT_LINK=fight_link)
+
+
+def scrape_fight_details(driver, fight_link):
+    return scrape_fight_page(driver, fight_link)[0]
+
+
+def scrape_significant_strikes(driver, fight_link):
+    return scrape_fight_page(driver, fight_link)[1]
+
+
+def get_known_card_links(engine):
+    query = "SELECT card_link AS card_link FROM All_Cards"
+    return set(pd.read_sql_query(query, engine)["card_link"])
+
+
+def add_new_events(engine, driver, events_url=EVENTS_URL):
+    """
+    Diffs the completed events list against All_Cards and stores any new
+    cards together with their fight links and event details, read from a
+    single load of each event page.
+
+    Parameters:
+    engine: SQLAlchemy engine connected to the SQLite database.
+    driver: Selenium WebDriver or HTTP session from init_backend.
+    events_url: URL of the completed events list.
+
+    Returns:
+    pd.DataFrame: The newly added cards.
+    """
+    cards_df = scrape_cards(driver, events_url)
+    # The completed list also shows the next upcoming card, which has no results yet
+    cards_df = cards_df[cards_df["date"] <= pd.Timestamp.now().normalize()]
+    new_cards_df = cards_df[~cards_df["card_link"].isin(get_known_card_links(engine))]
+    if new_cards_df.empty:
+        return new_cards_df
+
+    card_links = dict(zip(new_cards_df["eventID"], new_cards_df["card_link"]))
+    fight_frames = []
+    event_details = {}
+    for card_fights_df, event_details_df in scrape_event_pages(driver, new_cards_df):
+        if card_fights_df.empty:
+            continue
+        fight_frames.append(card_fights_df)
+        event_details[card_links[card_fights_df["eventID"].iloc[0]]] = event_details_df
+    if not fight_frames:
+        return new_cards_df.iloc[0:0]
+    fights_df = pd.concat(fight_frames, ignore_index=True)
+
+    # Cards whose event page failed are left out so the next run retries them
+    new_cards_df = new_cards_df[new_cards_df["eventID"].isin(fights_df["eventID"])]
+    with engine.begin() as conn:
+        new_cards_df.assign(details_scraped=False).to_sql(
+            "All_Cards", conn, if_exists="append", index=False
         )
-        event_title_element = driver.find_element(
-            By.CSS_SELECTOR, "body > section > div > h2 > a"
+        # Each fight keeps the link of its card, the target of its foreign key
+        fights_df = fights_df.drop_duplicates("fight_link").merge(
+            new_cards_df[["eventID", "card_link"]], on="eventID", how="left"
         )
-        EVENT_TITLE = event_title_element.text.strip()
-        # Initialize data structure
-        data = {
-            "FIGHTER": [],
-            "SIG_STR": [],
-            "SIG_STR_PCT": [],
-            "HEAD": [],
-            "BODY": [],
-            "LEG": [],
-            "DISTANCE": [],
-            "CLINCH": [],
-            "GROUND": [],
-            "EVENT_TITLE": [],
-        }
-
-        # Define selectors for each data point for both fighters
-        selectors = {
-            "FIGHTER": [
-                "body > section > div > div > table > tbody > tr > td.b-fight-details__table-col.l-page_align_left > p:nth-child(1) > a",
-                "body > section > div > div > table > tbody > tr > td.b-fight-details__table-col.l-page_align_left > p:nth-child(2) > a",
-            ],
-            "SIG_STR": [
-                "body > section > div > div > table > tbody > tr > td:nth-child(2) > p:nth-child(1)",
-                "body > section > div > div > table > tbody > tr > td:nth-child(2) > p:nth-child(2)",
-            ],
-            "SIG_STR_PCT": [
-                "body > section > div > div > table > tbody > tr > td:nth-child(3) > p:nth-child(1)",
-                "body > section > div > div > table > tbody > tr > td:nth-child(3) > p:nth-child(2)",
-            ],
-            "HEAD": [
-                "body > section > div > div > table > tbody > tr > td:nth-child(4) > p:nth-child(1)",
-                "body > section > div > div > table > tbody > tr > td:nth-child(4) > p:nth-child(2)",
-            ],
-            "BODY": [
-                "body > section > div > div > table > tbody > tr > td:nth-child(5) > p:nth-child(1)",
-                "body > section > div > div > table > tbody > tr > td:nth-child(5) > p:nth-child(2)",
-            ],
-            "LEG": [
-                "body > section > div > div > table > tbody > tr > td:nth-child(6) > p:nth-child(1)",
-                "body > section > div > div > table > tbody > tr > td:nth-child(6) > p:nth-child(2)",
-            ],
-            "DISTANCE": [
-                "body > section > div > div > table > tbody > tr > td:nth-child(7) > p:nth-child(1)",
-                "body > section > div > div > table > tbody > tr > td:nth-child(7) > p:nth-child(2)",
-            ],
-            "CLINCH": [
-                "body > section > div > div > table > tbody > tr > td:nth-child(8) > p:nth-child(1)",
-                "body > section > div > div > table > tbody > tr > td:nth-child(8) > p:nth-child(2)",
-            ],
-            "GROUND": [
-                "body > section > div > div > table > tbody > tr > td:nth-child(9) > p:nth-child(1)",
-                "body > section > div > div > table > tbody > tr > td:nth-child(9) > p:nth-child(2)",
-            ],
-        }
-
-        # Extract data for both fighters across all categories
-        for category, sel_pair in selectors.items():
-            element1_text = driver.find_element(By.CSS_SELECTOR, sel_pair[0]).text
-            element2_text = driver.find_element(By.CSS_SELECTOR, sel_pair[1]).text
-            data[category].append(element1_text)
-            data[category].append(element2_text)
-
-        data["EVENT_TITLE"].extend([EVENT_TITLE] * 2)
-        # Create DataFrame
-        Significant_Strikes = pd.DataFrame(data)
-
-        return Significant_Strikes
-
-    except Exception as e:
-        print(f"An error occurred while scraping significant strikes: {e}")
-        return pd.DataFrame()
+        fights_df.assign(details_scraped=False).to_sql(
+            "All_Fights", conn, if_exists="append", index=False
+        )
+
+    # The event pages are already parsed, so the cards go in marked as scraped
+    # and the event crawl has nothing left to fetch for them
+    with db_writer.BufferedWriter(engine) as writer:
+        for card_link in new_cards_df["card_link"]:
+            writer.add_event_details(card_link, event_details[card_link])
+
+    print(f"Found {len(new_cards_df)} new events with {len(fights_df)} fights.")
+    return new_cards_df
 
 
-def update_event_scraped_status(engine, event_link):
-    with engine.connect() as conn:
-        statement = text(
-            """
-            UPDATE All_Cards
-            SET details_scraped = TRUE
-            WHERE card_link = :event_link
-        """
+def crawl_unprocessed(
+    engine,
+    concurrency=crawler.DEFAULT_CONCURRENCY,
+    cache=None,
+    batch_size=db_writer.DEFAULT_BATCH_SIZE,
+    max_rate=rate_limit.DEFAULT_MAX_RATE,
+    rescrape=False,
+):
+    """
+    Crawls every event and fight page not yet marked as scraped, then the
+    profile of every fighter those pages turned up.
+
+    Parameters:
+    engine: SQLAlchemy engine connected to the SQLite database.
+    concurrency: Maximum number of pages fetched at once.
+    cache: Optional page_cache.PageCache used for every fetch.
+    batch_size: Number of pages written per database transaction.
+    max_rate: Ceiling in requests per second for the adaptive rate limiter.
+    rescrape: Crawl every fight page, not only unprocessed ones. Pages whose
+        content hash is unchanged are not rewritten.
+    """
+    # One limiter for both stages so the fight crawl starts at the rate the
+    # event crawl settled on
+    limiter = rate_limit.AdaptiveRateLimiter(
+        max_rate=max_rate, max_concurrency=concurrency
+    )
+    with db_writer.BufferedWriter(engine, batch_size) as writer:
+        event_links = get_unprocessed_event_links(engine)
+        crawler.crawl_event_pages(
+            event_links,
+            writer.add_event_details,
+            concurrency,
+            cache=cache,
+            rate_limiter=limiter,
+            handle_failure=functools.partial(writer.add_failure, "event"),
         )
-        conn.execute(statement, {"event_link": event_link})
 
+        fight_links = fight_links_to_scrape(engine, rescrape)
+        crawler.crawl_fight_pages(
+            fight_links,
+            writer.add_fight_page,
+            concurrency,
+            cache=cache,
+            rate_limiter=limiter,
+            handle_failure=functools.partial(writer.add_failure, "fight"),
+        )
 
-def update_fight_scraped_status(engine, fight_link):
-    with engine.connect() as conn:
-        statement = text(
-            """
-            UPDATE All_Fights
-            SET details_scraped = TRUE
-            WHERE fight_link = :fight_link
-        """
+        # Fighters are registered when their rows are written
+        writer.flush()
+        crawler.crawl_fighter_profiles(
+            get_unprofiled_fighter_links(engine),
+            writer.add_fighter_profile,
+            concurrency,
+            cache=cache,
+            rate_limiter=limiter,
+            handle_failure=functools.partial(writer.add_failure, "fighter"),
         )
-        conn.execute(statement, {"fight_link": fight_link})
 
 
-def process_fight_links_batch(driver, fight_links, engine):
-    for fight_link in fight_links:
-        try:
-            # Scrape fight details
-            fight_details_df = scrape_fight_details(driver, fight_link)
-            fight_details_df.to_sql(
-                "Fight_Details", con=engine, if_exists="append", index=False
-            )
+def get_failed_links(engine, page_type):
+    """
+    Fetches the dead-letter links of one page type.
 
-            # Scrape significant strikes
-            sig_strike_df = scrape_significant_strikes(driver, fight_link)
-            sig_strike_df.to_sql(
-                "Significant_Strikes", con=engine, if_exists="append", index=False
-            )
+    Parameters:
+    engine: SQLAlchemy engine connected to the SQLite database.
+    page_type: "event", "fight" or "fighter".
 
-            # Mark the fight as scraped
-            engine.execute(
-                "UPDATE All_Fights SET details_scraped = TRUE WHERE fight_link = ?",
-                (fight_link,),
+    Returns:
+    list: Links recorded in Failed_Links, oldest failure first.
+    """
+    with engine.begin() as conn:
+        conn.execute(db_writer.CREATE_FAILED_LINKS)
+    query = text(
+        "SELECT link FROM Failed_Links WHERE page_type = :page_type ORDER BY failed_at"
+    )
+    df = pd.read_sql_query(query, engine, params={"page_type": page_type})
+    return df["link"].tolist()
+
+
+def process_links(
+    page_type,
+    links,
+    handle_result,
+    handle_failure,
+    backend="http",
+    concurrency=crawler.DEFAULT_CONCURRENCY,
+    workers=1,
+    cache=None,
+    rate_limiter=None,
+    driver_profile=driver_profiles.DEFAULT_PROFILE,
+):
+    """
+    Scrapes a list of event, fight or fighter pages on either backend.
+
+    Parameters:
+    page_type: "event", "fight" or "fighter".
+    links: URLs to scrape.
+    handle_result: Called as handle_result(link, page) for every scraped page.
+    handle_failure: Called as handle_failure(link, retry.ScrapeFailure) for every
+        page given up on.
+    backend: "http" (concurrent crawler) or "selenium" (driver pool for fights,
+        one driver for events and fighters).
+    driver_profile: Key of driver_profiles.PROFILES used on the Selenium backend.
+    """
+    if not links:
+        return
+
+    if backend == "http":
+        crawl = {
+            "event": crawler.crawl_event_pages,
+            "fight": crawler.crawl_fight_pages,
+            "fighter": crawler.crawl_fighter_profiles,
+        }[page_type]
+        crawl(
+            links,
+            handle_result,
+            concurrency,
+            cache=cache,
+            rate_limiter=rate_limiter,
+            handle_failure=handle_failure,
+        )
+        return
+
+    if page_type == "fight":
+        driver_pool.run_driver_pool(
+            links,
+            handle_result,
+            workers=workers,
+            handle_failure=handle_failure,
+            driver_profile=driver_profile,
+        )
+        return
+
+    fetch_page = fetch_event_details if page_type == "event" else fetch_fighter_profile
+    driver = init_driver(headless=True, profile=driver_profile)
+    try:
+        for link in links:
+            try:
+                page = retry.call_with_retry(lambda: fetch_page(driver, link), link)
+            except retry.ScrapeFailure as failure:
+                print(f"Error processing {link}: {failure}")
+                handle_failure(link, failure)
+                continue
+            retry.deliver_result(link, page, handle_result, handle_failure)
+    finally:
+        close_backend(driver)
+
+
+def retry_failed_links(
+    engine,
+    backend="http",
+    concurrency=crawler.DEFAULT_CONCURRENCY,
+    workers=1,
+    cache=None,
+    batch_size=db_writer.DEFAULT_BATCH_SIZE,
+    max_rate=rate_limit.DEFAULT_MAX_RATE,
+    driver_profile=driver_profiles.DEFAULT_PROFILE,
+):
+    """
+    Re-processes only the links in Failed_Links. Pages that now succeed are
+    written and cleared from the table; the rest have their attempts added up.
+    """
+    event_links = get_failed_links(engine, "event")
+    fight_links = get_failed_links(engine, "fight")
+    fighter_links = get_failed_links(engine, "fighter")
+    print(
+        f"Retrying {len(event_links)} event, {len(fight_links)} fight and "
+        f"{len(fighter_links)} fighter links"
+    )
+
+    limiter = rate_limit.AdaptiveRateLimiter(
+        max_rate=max_rate, max_concurrency=concurrency
+    )
+    with db_writer.BufferedWriter(engine, batch_size) as writer:
+        for page_type, links, add_page in (
+            ("event", event_links, writer.add_event_details),
+            ("fight", fight_links, writer.add_fight_page),
+            ("fighter", fighter_links, writer.add_fighter_profile),
+        ):
+            process_links(
+                page_type,
+                links,
+                add_page,
+                functools.partial(writer.add_failure, page_type),
+                backend=backend,
+                concurrency=concurrency,
+                workers=workers,
+                cache=cache,
+                rate_limiter=limiter,
+                driver_profile=driver_profile,
             )
 
-        except Exception as e:
-            print(f"Error processing {fight_link}: {e}")
+
+def drain_work_queue(
+    engine,
+    backend="http",
+    concurrency=crawler.DEFAULT_CONCURRENCY,
+    workers=1,
+    cache=None,
+    batch_size=db_writer.DEFAULT_BATCH_SIZE,
+    max_rate=rate_limit.DEFAULT_MAX_RATE,
+    claim_size=work_queue.DEFAULT_CLAIM_SIZE,
+    driver_profile=driver_profiles.DEFAULT_PROFILE,
+):
+    """
+    Cooperatively scrapes every unprocessed event, fight and fighter through the
+    leased Work_Queue table. Run it in several processes on one host against
+    the same SQLite database file; each link is leased to one worker at a time.
+
+    Parameters:
+    engine: SQLAlchemy engine of the shared database.
+    claim_size: Number of links leased per claim.
+    """
+    queue = work_queue.WorkQueue(engine)
+    print(f"Queued {queue.enqueue_unprocessed()} new links as {queue.owner}")
+
+    limiter = rate_limit.AdaptiveRateLimiter(
+        max_rate=max_rate, max_concurrency=concurrency
+    )
+    with db_writer.BufferedWriter(engine, batch_size) as writer, queue.keep_alive():
+        for page_type, add_page in (
+            ("event", writer.add_event_details),
+            ("fight", writer.add_fight_page),
+            ("fighter", writer.add_fighter_profile),
+        ):
+            if page_type == "fighter":
+                # Queue the fighters the fight pages above registered
+                queue.enqueue_unprocessed()
+            while True:
+                links = queue.claim(page_type, claim_size)
+                if not links:
+                    break
+
+                done, failed = [], []
+
+                def handle_result(link, page):
+                    add_page(link, page)
+                    done.append(link)
+
+                def handle_failure(link, error):
+                    writer.add_failure(page_type, link, error)
+                    failed.append(link)
+
+                process_links(
+                    page_type,
+                    links,
+                    handle_result,
+                    handle_failure,
+                    backend=backend,
+                    concurrency=concurrency,
+                    workers=workers,
+                    cache=cache,
+                    rate_limiter=limiter,
+                    driver_profile=driver_profile,
+                )
+
+                # Rows are committed before their links leave the queue, so a
+                # crash in between only means the lease expires and they are
+                # scraped again
+                writer.flush()
+                queue.complete(done)
+                queue.fail(failed)
+                queue.release(set(links) - set(done) - set(failed))
 
 
 def get_all_fight_links(engine):
@@ -458,44 +626,310 @@ def get_all_fight_links(engine):
     Returns:
     list: A list of all fight links to be processed.
     """
-    query = "SELECT fight_link FROM All_Fights"
+    query = "SELECT fight_link AS fight_link FROM All_Fights"
     df = pd.read_sql_query(query, engine)
     return df["fight_link"].tolist()
 
 
-def main():
-    engine = create_engine("sqlite:///UFC_Data.db")
-    driver = init_driver()
+def get_event_dates(engine):
+    """
+    Maps every event and fight link to the date of its event, so the page
+    cache can tell settled events from recent ones.
 
-    # Fetch all fight links
-    fight_links = get_all_fight_links(engine)
+    Parameters:
+    engine: SQLAlchemy engine connected to the SQLite database.
 
-    # Process in batches of 20
-    batch_size = 20
-    for i in tqdm(range(0, len(fight_links), batch_size), desc="Processing fights"):
-        batch_links = fight_links[i : i + batch_size]
-        for fight_link in batch_links:
-            try:
-                # Scrape fight details and significant strikes for each fight link
-                fight_details_df = scrape_fight_details(driver, fight_link)
-                sig_strike_df = scrape_significant_strikes(driver, fight_link)
+    Returns:
+    dict: Link to pd.Timestamp, for links whose event has a date.
+    """
+    query = """
+    SELECT card_link AS link, date AS date FROM All_Cards
+    UNION ALL
+    SELECT f.fight_link AS link, c.date AS date
+    FROM All_Fights f
+    JOIN All_Cards c ON c.card_link = f.card_link
+    """
+    df = pd.read_sql_query(query, engine)
+    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    df = df.dropna(subset=["date"])
+    return dict(zip(df["link"], df["date"]))
 
-                # Append scraped data to the respective tables in the database
-                fight_details_df.to_sql(
-                    "Fight_Details", engine, if_exists="append", index=False
-                )
-                sig_strike_df.to_sql(
-                    "Significant_Strikes", engine, if_exists="append", index=False
-                )
 
-                # Optionally, update the details_scraped status for the processed fight
-                # This step can be skipped if processing all links regardless of their status
-            except Exception as e:
-                print(f"Error processing {fight_link}: {e}")
+def fight_links_to_scrape(engine, rescrape=False):
+    """
+    Returns every fight link when rescraping, otherwise only the unprocessed
+    ones. Both backends pick their fight pages through here.
+    """
+    if rescrape:
+        return get_all_fight_links(engine)
+    return get_unprocessed_fight_links(engine)
+
+
+def main(
+    backend="http",
+    concurrency=crawler.DEFAULT_CONCURRENCY,
+    workers=1,
+    cache_dir=page_cache.DEFAULT_CACHE_DIR,
+    replay_only=False,
+    incremental=False,
+    batch_size=db_writer.DEFAULT_BATCH_SIZE,
+    export_dir=None,
+    max_rate=rate_limit.DEFAULT_MAX_RATE,
+    retry_failed=False,
+    queue=False,
+    db_url=DEFAULT_DB_URL,
+    metrics_port=None,
+    metrics_json=None,
+    driver_profile=driver_profiles.DEFAULT_PROFILE,
+    rescrape=False,
+):
+    if metrics_port:
+        metrics.serve(metrics_port)
+    try:
+        run(
+            backend,
+            concurrency,
+            workers,
+            cache_dir,
+            replay_only,
+            incremental,
+            batch_size,
+            export_dir,
+            max_rate,
+            retry_failed,
+            queue,
+            db_url,
+            driver_profile,
+            rescrape,
+        )
+    finally:
+        # Where the time went, even if the run failed part-way
+        metrics.write_summary(metrics_json)
+
+
+def run(
+    backend,
+    concurrency,
+    workers,
+    cache_dir,
+    replay_only,
+    incremental,
+    batch_size,
+    export_dir,
+    max_rate,
+    retry_failed,
+    queue,
+    db_url,
+    driver_profile,
+    rescrape=False,
+):
+    # The migrations and the writer's upserts are SQLite-specific, so fail
+    # before anything is fetched rather than part-way through a migration
+    backend_name = make_url(db_url).get_backend_name()
+    if backend_name != "sqlite":
+        raise ValueError(
+            f"{db_url} is a {backend_name} database; the scraper only supports "
+            "SQLite"
+        )
+    if rescrape and (retry_failed or queue):
+        raise ValueError("--rescrape can't be combined with --retry-failed or --queue")
+    engine = db_writer.configure_sqlite(create_engine(db_url))
+    migrations.migrate(engine)
+    cache = None
+    if backend == "http" and cache_dir:
+        cache = page_cache.PageCache(
+            cache_dir, replay_only=replay_only, event_dates=get_event_dates(engine)
+        )
+
+    if retry_failed:
+        # Only the dead letters are fetched again, not the whole history
+        retry_failed_links(
+            engine,
+            backend,
+            concurrency,
+            workers,
+            cache=cache,
+            batch_size=batch_size,
+            max_rate=max_rate,
+            driver_profile=driver_profile,
+        )
+        return
+
+    if incremental:
+        # Only cards missing from All_Cards are fetched; everything already
+        # marked details_scraped is skipped below
+        if backend == "http":
+            driver = init_session(cache=cache)
+        else:
+            driver = init_driver(headless=True, profile=driver_profile)
+        try:
+            add_new_events(engine, driver)
+        finally:
+            close_backend(driver)
+
+    if queue:
+        # Cooperative mode: links are leased from Work_Queue, so any number of
+        # processes can run this against the same database
+        drain_work_queue(
+            engine,
+            backend,
+            concurrency,
+            workers,
+            cache=cache,
+            batch_size=batch_size,
+            max_rate=max_rate,
+            driver_profile=driver_profile,
+        )
+    elif backend == "http":
+        crawl_unprocessed(
+            engine,
+            concurrency,
+            cache=cache,
+            batch_size=batch_size,
+            max_rate=max_rate,
+            rescrape=rescrape,
+        )
+    else:
+        fight_links = fight_links_to_scrape(engine, rescrape)
+
+        # Shard the links across headless Chrome workers; this process is the
+        # only one writing to the database
+        with db_writer.BufferedWriter(engine, batch_size) as writer:
+            driver_pool.run_driver_pool(
+                fight_links,
+                writer.add_fight_page,
+                workers=workers,
+                handle_failure=functools.partial(writer.add_failure, "fight"),
+                driver_profile=driver_profile,
+            )
+
+            writer.flush()
+            process_links(
+                "fighter",
+                get_unprofiled_fighter_links(engine),
+                writer.add_fighter_profile,
+                functools.partial(writer.add_failure, "fighter"),
+                backend=backend,
+                driver_profile=driver_profile,
+            )
 
     print("Processing completed for all fight links.")
-    driver.quit()
+
+    if export_dir:
+        # pyarrow.dataset alone takes longer to import than a whole HTTP run's
+        # startup, so it is only loaded when exporting
+        import parquet_store
+
+        parquet_store.export_database(engine, export_dir)
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Scrape UFC fight details")
+    parser.add_argument(
+        "--backend",
+        choices=["http", "selenium"],
+        default="http",
+        help="Fetch pages with plain HTTP + lxml (default) or a Chrome driver",
+    )
+    parser.add_argument(
+        "--driver-profile",
+        choices=sorted(driver_profiles.PROFILES),
+        default=driver_profiles.DEFAULT_PROFILE,
+        help="Chrome profile on the Selenium backend: 'default' (plain Chrome) "
+        "or 'lean' (headless, eager loads, subresources blocked)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=crawler.DEFAULT_CONCURRENCY,
+        help="Maximum number of pages fetched at once on the HTTP backend",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of Chrome worker processes on the Selenium backend (0 = all cores)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=page_cache.DEFAULT_CACHE_DIR,
+        help="Directory of the on-disk page cache (empty string disables it)",
+    )
+    parser.add_argument(
+        "--replay-only",
+        action="store_true",
+        help="Serve every page from the cache and never touch the network",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Add new events from the events list and scrape only unprocessed pages",
+    )
+    parser.add_argument(
+        "--rescrape",
+        action="store_true",
+        help="Fetch every fight page again, not only unprocessed ones; pages "
+        "whose content is unchanged are not rewritten",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=db_writer.DEFAULT_BATCH_SIZE,
+        help="Number of scraped pages written per database transaction",
+    )
+    parser.add_argument(
+        "--max-rate",
+        type=float,
+        default=rate_limit.DEFAULT_MAX_RATE,
+        help="Upper bound in requests per second; the HTTP backend adapts below it",
+    )
+    parser.add_argument(
+        "--retry-failed",
+        action="store_true",
+        help="Only re-process the links recorded in Failed_Links",
+    )
+    parser.add_argument(
+        "--queue",
+        action="store_true",
+        help="Drain unprocessed pages through the leased Work_Queue table so "
+        "several processes on this host can share one SQLite database",
+    )
+    parser.add_argument(
+        "--db-url",
+        default=DEFAULT_DB_URL,
+        help="SQLAlchemy URL of the SQLite database (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        help="Serve Prometheus metrics on this port at /metrics while scraping",
+    )
+    parser.add_argument(
+        "--metrics-json",
+        metavar="PATH",
+        help="Write the end-of-run metrics summary here instead of printing it",
+    )
+    parser.add_argument(
+        "--export",
+        metavar="DIR",
+        help="Export the database to Parquet datasets in DIR after scraping",
+    )
+    args = parser.parse_args()
+    main(
+        backend=args.backend,
+        concurrency=args.concurrency,
+        workers=args.workers,
+        cache_dir=args.cache_dir,
+        replay_only=args.replay_only,
+        incremental=args.incremental,
+        batch_size=args.batch_size,
+        export_dir=args.export,
+        max_rate=args.max_rate,
+        retry_failed=args.retry_failed,
+        queue=args.queue,
+        db_url=args.db_url,
+        metrics_port=args.metrics_port,
+        metrics_json=args.metrics_json,
+        driver_profile=args.driver_profile,
+        rescrape=args.rescrape,
+    )
@@ -0,0 +1,130 @@
+import argparse
+import json
+import os
+import shutil
+import stat
+
+import driver_profiles
+
+
+# Set to a chromedriver binary to skip resolution entirely
+DRIVER_ENV = "UFC_CHROMEDRIVER"
+CACHE_DIR = os.environ.get(
+    "UFC_DRIVER_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "ufc-scraper")
+)
+PIN_FILE = "chromedriver.json"
+
+
+def read_pin(cache_dir=CACHE_DIR):
+    try:
+        with open(os.path.join(cache_dir, PIN_FILE), encoding="utf-8") as f:
+            path = json.load(f)["path"]
+    except (OSError, ValueError, KeyError):
+        return None
+    return path if os.path.isfile(path) else None
+
+
+def download_driver(cache_dir=CACHE_DIR):
+    """
+    Downloads the chromedriver matching the installed Chrome, copies it into
+    cache_dir and pins it there. This is the only step that needs a network.
+
+    Returns:
+    str: Path of the pinned binary.
+    """
+    # webdriver_manager is slow to import and only needed here
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    try:
+        downloaded = ChromeDriverManager().install()
+    except Exception as e:
+        raise RuntimeError(
+            f"No chromedriver is pinned and none could be downloaded ({e}). "
+            f"Put chromedriver on PATH or set {DRIVER_ENV} to its path."
+        ) from e
+
+    # Our own copy, so clearing webdriver_manager's cache can't break the pin
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, os.path.basename(downloaded))
+    shutil.copy2(downloaded, path)
+    os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR)
+
+    pin_path = os.path.join(cache_dir, PIN_FILE)
+    with open(pin_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump({"path": path, "source": downloaded}, f)
+    os.replace(pin_path + ".tmp", pin_path)
+    return path
+
+
+def driver_path(refresh=False, cache_dir=CACHE_DIR):
+    """
+    Finds the chromedriver binary without touching the network once one has
+    been pinned: the DRIVER_ENV override, then the pinned copy, then a
+    chromedriver on PATH, and only then a one-off download.
+
+    Parameters:
+    refresh: Ignore the pin and PATH and download again, e.g. after Chrome
+        updated past the pinned driver.
+
+    Returns:
+    str: Path of the chromedriver binary.
+    """
+    if os.environ.get(DRIVER_ENV):
+        return os.environ[DRIVER_ENV]
+    if not refresh:
+        path = read_pin(cache_dir) or shutil.which("chromedriver")
+        if path:
+            return path
+    return download_driver(cache_dir)
+
+
+def start_chrome(options=None):
+    """
+    Starts Chrome on the pinned chromedriver. If Chrome has updated past it,
+    the session fails to start, so the driver is refreshed once and retried.
+
+    Returns:
+    webdriver.Chrome: The started driver.
+    """
+    from selenium import webdriver
+    from selenium.common.exceptions import SessionNotCreatedException
+    from selenium.webdriver.chrome.service import Service
+
+    try:
+        return webdriver.Chrome(service=Service(driver_path()), options=options)
+    except SessionNotCreatedException as e:
+        if os.environ.get(DRIVER_ENV):
+            raise
+        print(f"Pinned chromedriver failed to start Chrome, refreshing it: {e.msg}")
+        return webdriver.Chrome(
+            service=Service(driver_path(refresh=True)), options=options
+        )
+
+
+def init_driver(headless=False, profile=driver_profiles.DEFAULT_PROFILE):
+    """
+    Starts Chrome with a driver profile applied. Every Selenium script starts
+    its driver through here.
+
+    Parameters:
+    headless: Run headless even if the profile doesn't.
+    profile: Key of driver_profiles.PROFILES.
+
+    Returns:
+    webdriver.Chrome: The started driver.
+    """
+    options = driver_profiles.chrome_options(profile, headless)
+    driver = start_chrome(options)
+    driver_profiles.apply_profile(driver, profile)
+    return driver
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Show or refresh the pinned chromedriver"
+    )
+    parser.add_argument(
+        "--refresh", action="store_true", help="Download and pin a new chromedriver"
+    )
+    args = parser.parse_args()
+    print(driver_path(refresh=args.refresh))
@@ -0,0 +1,174 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from tqdm import tqdm
+
+import rate_limit
+import retry
+import ufc_parsers
+from ufc_http import init_session, fetch_html
+
+
+DEFAULT_CONCURRENCY = 16
+
+
+async def fetch_worker(loop, executor, session, parse, links, results):
+    # Pull links until the queue is drained; fetch + parse (and any retry
+    # backoff) run in the thread pool so the pooled connections are used in
+    # parallel
+    while True:
+        link = await links.get()
+        try:
+            result = await loop.run_in_executor(
+                executor,
+                lambda: retry.call_with_retry(
+                    lambda: parse(fetch_html(session, link), base_url=link), link
+                ),
+            )
+            await results.put((link, result, None))
+        except Exception as e:
+            await results.put((link, None, e))
+        finally:
+            links.task_done()
+
+
+async def crawl_async(
+    links, parse, handle_result, concurrency, desc, cache, rate_limiter, handle_failure
+):
+    loop = asyncio.get_running_loop()
+    if rate_limiter is None:
+        # Start slow and let AIMD find the rate the site tolerates; the
+        # thread pool size is only the upper bound on requests in flight
+        rate_limiter = rate_limit.AdaptiveRateLimiter(max_concurrency=concurrency)
+    session = init_session(
+        pool_size=concurrency, cache=cache, rate_limiter=rate_limiter
+    )
+    link_queue = asyncio.Queue()
+    results = asyncio.Queue(maxsize=concurrency * 2)
+    for link in links:
+        link_queue.put_nowait(link)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        workers = [
+            asyncio.create_task(
+                fetch_worker(loop, executor, session, parse, link_queue, results)
+            )
+            for _ in range(min(concurrency, len(links)))
+        ]
+        try:
+            # Results are handed to the writer in completion order, one at a
+            # time, so database writes stay on a single connection
+            for _ in tqdm(range(len(links)), desc=desc):
+                link, result, error = await results.get()
+                if error is not None:
+                    print(f"Error processing {link}: {error}")
+                    if handle_failure is not None:
+                        handle_failure(link, error)
+                    continue
+                retry.deliver_result(link, result, handle_result, handle_failure)
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            session.close()
+
+
+def crawl(
+    links,
+    parse,
+    handle_result,
+    concurrency=DEFAULT_CONCURRENCY,
+    desc="Crawling",
+    cache=None,
+    rate_limiter=None,
+    handle_failure=None,
+):
+    """
+    Fetches and parses pages concurrently over one pooled HTTP session.
+
+    Parameters:
+    links: URLs to fetch.
+    parse: Function taking (html, base_url=link) and returning the parsed page.
+    handle_result: Called as handle_result(link, result) for every page as it finishes.
+    concurrency: Maximum number of requests in flight.
+    cache: Optional page_cache.PageCache shared by every request.
+    rate_limiter: rate_limit.AdaptiveRateLimiter pacing network requests; a new
+        one starting at rate_limit.DEFAULT_INITIAL_RATE is used when omitted.
+    handle_failure: Optional, called as handle_failure(link, retry.ScrapeFailure) for
+        every page given up on after retries or whose handle_result raised.
+    """
+    if not links:
+        return
+    asyncio.run(
+        crawl_async(
+            list(links),
+            parse,
+            handle_result,
+            concurrency,
+            desc,
+            cache,
+            rate_limiter,
+            handle_failure,
+        )
+    )
+
+
+def crawl_event_pages(
+    event_links,
+    handle_result,
+    concurrency=DEFAULT_CONCURRENCY,
+    cache=None,
+    rate_limiter=None,
+    handle_failure=None,
+):
+    crawl(
+        event_links,
+        ufc_parsers.parse_event_details,
+        handle_result,
+        concurrency,
+        desc="Processing events",
+        cache=cache,
+        rate_limiter=rate_limiter,
+        handle_failure=handle_failure,
+    )
+
+
+def crawl_fight_pages(
+    fight_links,
+    handle_result,
+    concurrency=DEFAULT_CONCURRENCY,
+    cache=None,
+    rate_limiter=None,
+    handle_failure=None,
+):
+    crawl(
+        fight_links,
+        ufc_parsers.parse_fight_page,
+        handle_result,
+        concurrency,
+        desc="Processing fights",
+        cache=cache,
+        rate_limiter=rate_limiter,
+        handle_failure=handle_failure,
+    )
+
+
+def crawl_fighter_profiles(
+    fighter_links,
+    handle_result,
+    concurrency=DEFAULT_CONCURRENCY,
+    cache=None,
+    rate_limiter=None,
+    handle_failure=None,
+):
+    # A fighter appears in many fights but each profile is fetched once
+    crawl(
+        list(dict.fromkeys(fighter_links)),
+        ufc_parsers.parse_fighter_profile,
+        handle_result,
+        concurrency,
+        desc="Processing fighters",
+        cache=cache,
+        rate_limiter=rate_limiter,
+        handle_failure=handle_failure,
+    )
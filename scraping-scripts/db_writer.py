@@ -0,0 +1,471 @@
+import atexit
+import hashlib
+
+import pandas as pd
+from sqlalchemy import bindparam, event, inspect, text
+
+import fighter_career
+import metrics
+import ufc_schema
+from retry import ScrapeFailure
+
+
+DEFAULT_BATCH_SIZE = 50
+
+# Event_Details was created with database-style column names
+EVENT_DETAILS_DB_COLUMNS = {
+    "W/L": "WIN",
+    "Fighter": "FIGHTER",
+    "Weight Class": "WEIGHT_CLASS",
+    "Method": "METHOD",
+    "Round": "ROUND",
+    "Time_SECONDS": "TIME_SECONDS",
+    "Event Title": "EVENT_TITLE",
+}
+
+# Detail tables whose rows carry the link of the fight page they came from
+FIGHT_LINK_TABLES = ["Fight_Details", "Significant_Strikes"]
+
+# Tables upserted on (FIGHT_LINK, FIGHTER); Event_Details rows take the link
+# from their row of the event table
+UPSERT_TABLES = ["Event_Details"] + FIGHT_LINK_TABLES
+
+# Tables whose rows refer to their fighter by Fighters.fighter_id
+FIGHTER_ID_TABLES = ["Event_Details", "Fight_Details", "Significant_Strikes"]
+
+MARK_EVENT_SCRAPED = text(
+    """
+    UPDATE All_Cards
+    SET details_scraped = TRUE
+    WHERE card_link = :event_link
+"""
+)
+
+MARK_FIGHT_SCRAPED = text(
+    """
+    UPDATE All_Fights
+    SET details_scraped = TRUE, content_hash = :content_hash
+    WHERE fight_link = :fight_link
+"""
+)
+
+SELECT_FIGHT_HASHES = text(
+    """
+    SELECT fight_link AS fight_link, content_hash AS content_hash
+    FROM All_Fights
+    WHERE fight_link IN :fight_links
+"""
+).bindparams(bindparam("fight_links", expanding=True))
+
+# Fighters seen for the first time get the next fighter_id; the scraped name
+# stands in until their profile is fetched
+INSERT_FIGHTERS = text(
+    """
+    INSERT INTO Fighters (fighter_link, name)
+    VALUES (:fighter_link, :name)
+    ON CONFLICT (fighter_link) DO NOTHING
+"""
+)
+
+SELECT_FIGHTER_IDS = text(
+    """
+    SELECT fighter_link AS fighter_link, fighter_id AS fighter_id
+    FROM Fighters
+    WHERE fighter_link IN :fighter_links
+"""
+).bindparams(bindparam("fighter_links", expanding=True))
+
+UPSERT_FIGHTER_PROFILE = text(
+    """
+    INSERT INTO Fighters
+        (fighter_link, name, height_inches, reach_inches, stance, dob,
+         profile_scraped)
+    VALUES
+        (:fighter_link, :name, :height_inches, :reach_inches, :stance, :dob, TRUE)
+    ON CONFLICT (fighter_link) DO UPDATE SET
+        name = excluded.name,
+        height_inches = excluded.height_inches,
+        reach_inches = excluded.reach_inches,
+        stance = excluded.stance,
+        dob = excluded.dob,
+        profile_scraped = TRUE
+"""
+)
+
+# Dead-letter table: pages given up on after retries, with why and how often.
+# Re-failing a link adds to its attempt count; scraping it clears the row.
+CREATE_FAILED_LINKS = text(
+    """
+    CREATE TABLE IF NOT EXISTS Failed_Links (
+        link TEXT PRIMARY KEY,
+        page_type TEXT,
+        error_class TEXT,
+        error_message TEXT,
+        attempts INTEGER,
+        transient BOOLEAN,
+        failed_at DATETIME
+    )
+"""
+)
+
+RECORD_FAILED_LINK = text(
+    """
+    INSERT INTO Failed_Links
+        (link, page_type, error_class, error_message, attempts, transient, failed_at)
+    VALUES
+        (:link, :page_type, :error_class, :error_message, :attempts, :transient,
+         CURRENT_TIMESTAMP)
+    ON CONFLICT (link) DO UPDATE SET
+        error_class = excluded.error_class,
+        error_message = excluded.error_message,
+        attempts = Failed_Links.attempts + excluded.attempts,
+        transient = excluded.transient,
+        failed_at = excluded.failed_at
+"""
+)
+
+CLEAR_FAILED_LINK = text("DELETE FROM Failed_Links WHERE link = :link")
+
+SQLITE_PRAGMAS = [
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000",
+    "PRAGMA busy_timeout=30000",
+]
+
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for pragma in SQLITE_PRAGMAS:
+        cursor.execute(pragma)
+    cursor.close()
+
+
+def configure_sqlite(engine):
+    """
+    Applies WAL mode and write-friendly pragmas to every new SQLite connection.
+    Other backends are left untouched.
+    """
+    if engine.dialect.name == "sqlite" and not event.contains(
+        engine, "connect", set_sqlite_pragmas
+    ):
+        event.listen(engine, "connect", set_sqlite_pragmas)
+    return engine
+
+
+def table_columns(table):
+    """
+    Returns {column: SQL type} for a table, from the shared parse-time schema.
+    """
+    columns = ufc_schema.sql_columns(ufc_schema.TABLE_SCHEMAS[table])
+    if table == "Event_Details":
+        columns = {EVENT_DETAILS_DB_COLUMNS.get(c, c): t for c, t in columns.items()}
+    if table in UPSERT_TABLES:
+        columns = {"FIGHT_LINK": "TEXT", **columns}
+    if table in FIGHTER_ID_TABLES:
+        columns["FIGHTER_ID"] = "INTEGER"
+    return columns
+
+
+def frame_rows(df):
+    # DB drivers can't bind numpy scalars, so hand them plain Python objects
+    df = df.astype(object).where(df.notna(), None)
+    return [
+        {f"p{i}": value for i, value in enumerate(row)}
+        for row in df.itertuples(index=False, name=None)
+    ]
+
+
+def upsert_statement(table, columns):
+    # Column names like "W/L" aren't valid bind names, so bind by position
+    column_list = ", ".join(f'"{column}"' for column in columns)
+    placeholders = ", ".join(f":p{i}" for i in range(len(columns)))
+    # Fight rows are keyed on (FIGHT_LINK, FIGHTER): a re-scraped fight
+    # overwrites its rows instead of appending another copy
+    updates = ", ".join(
+        f'"{column}" = excluded."{column}"'
+        for column in columns
+        if column not in ("FIGHT_LINK", "FIGHTER")
+    )
+    return text(
+        f'INSERT INTO "{table}" ({column_list}) VALUES ({placeholders}) '
+        f'ON CONFLICT ("FIGHT_LINK", "FIGHTER") DO UPDATE SET {updates}'
+    )
+
+
+def with_fighter_ids(df, fighter_ids):
+    # The link is stored once in Fighters; detail rows keep its integer key
+    if "FIGHTER_LINK" not in df:
+        return df
+    ids = [fighter_ids.get(link) for link in df["FIGHTER_LINK"]]
+    return df.drop(columns="FIGHTER_LINK").assign(
+        FIGHTER_ID=pd.array(ids, dtype="Int64")
+    )
+
+
+def content_hash(frames):
+    """
+    Returns a digest of a page's extracted tables. It only depends on the
+    values, so the same page hashes the same on every run and backend.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for df in frames:
+        digest.update("\x1f".join(map(str, df.columns)).encode())
+        digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return digest.hexdigest()
+
+
+class BufferedWriter:
+    """
+    Buffers scraped pages and writes them with one multi-row INSERT per
+    table and one transaction per batch of pages.
+
+    Use it as a context manager (or call close()) so the last partial batch
+    is flushed on shutdown.
+    """
+
+    def __init__(self, engine, batch_size=DEFAULT_BATCH_SIZE):
+        # Imported here because migrations builds tables from this module
+        import migrations
+
+        self.engine = configure_sqlite(engine)
+        # Upserts need the keys the migrations add
+        migrations.migrate(self.engine)
+        self.batch_size = batch_size
+        self.frames = {}
+        self.scraped_fights = []
+        self.scraped_events = []
+        self.scraped_fighters = []
+        self.failures = []
+        self.pending_pages = 0
+        # fighter link -> fighter_id, for fighters already in Fighters
+        self.known_fighters = {}
+        self.closed = False
+        atexit.register(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def add_frame(self, table, df):
+        if not df.empty:
+            self.frames.setdefault(table, []).append(df)
+
+    def page_added(self):
+        self.pending_pages += 1
+        if self.pending_pages >= self.batch_size:
+            self.flush()
+
+    def add_fight_page(self, fight_link, fight_page):
+        fight_details_df, sig_strike_df = fight_page
+        page_hash = content_hash(fight_page)
+        self.add_frame("Fight_Details", fight_details_df.assign(FIGHT_LINK=fight_link))
+        self.add_frame(
+            "Significant_Strikes", sig_strike_df.assign(FIGHT_LINK=fight_link)
+        )
+        self.scraped_fights.append(
+            {"fight_link": fight_link, "content_hash": page_hash}
+        )
+        metrics.inc("pages_total", page_type="fight")
+        self.page_added()
+
+    def add_event_details(self, event_link, event_details_df):
+        self.add_frame(
+            "Event_Details", event_details_df.rename(columns=EVENT_DETAILS_DB_COLUMNS)
+        )
+        self.scraped_events.append({"event_link": event_link})
+        metrics.inc("pages_total", page_type="event")
+        self.page_added()
+
+    def add_fighter_profile(self, fighter_link, profile):
+        self.scraped_fighters.append({**profile, "fighter_link": fighter_link})
+        metrics.inc("pages_total", page_type="fighter")
+        self.page_added()
+
+    def add_failure(self, page_type, link, error):
+        """
+        Records a page that couldn't be scraped in Failed_Links.
+
+        Parameters:
+        page_type: "event", "fight" or "fighter".
+        link: URL of the page.
+        error: retry.ScrapeFailure, or any exception (counted as one attempt).
+        """
+        failure = ScrapeFailure.from_error(link, error, 1)
+        self.failures.append(
+            {
+                "link": link,
+                "page_type": page_type,
+                "error_class": failure.error_class,
+                "error_message": failure.message[:500],
+                "attempts": failure.attempts,
+                "transient": failure.transient,
+            }
+        )
+        metrics.inc("failures_total", page_type=page_type)
+        self.page_added()
+
+    def ensure_tables(self, conn):
+        # Create missing tables and add any typed columns older tables lack
+        inspector = inspect(conn)
+        existing = set(inspector.get_table_names())
+        for table in self.frames:
+            columns = table_columns(table)
+            if table not in existing:
+                column_defs = ", ".join(f'"{c}" {t}' for c, t in columns.items())
+                conn.execute(text(f'CREATE TABLE "{table}" ({column_defs})'))
+                continue
+
+            present = {c["name"].upper() for c in inspector.get_columns(table)}
+            for column, sql_type in columns.items():
+                if column.upper() not in present:
+                    conn.execute(
+                        text(f'ALTER TABLE "{table}" ADD COLUMN "{column}" {sql_type}')
+                    )
+
+    def stored_hashes(self, conn):
+        # Content hashes already stored for the fights in this batch
+        links = [row["fight_link"] for row in self.scraped_fights]
+        if not links:
+            return {}
+        rows = conn.execute(SELECT_FIGHT_HASHES, {"fight_links": links})
+        return {row.fight_link: row.content_hash for row in rows if row.content_hash}
+
+    def fighter_ids(self, conn):
+        """
+        Returns {fighter link: fighter_id} for every fighter in the batch,
+        adding the ones seen for the first time to Fighters.
+        """
+        names = {}
+        for frames in self.frames.values():
+            for df in frames:
+                if "FIGHTER_LINK" in df:
+                    names.update(zip(df["FIGHTER_LINK"], df["FIGHTER"]))
+
+        ids = {}
+        new_fighters = []
+        for link, name in names.items():
+            if not isinstance(link, str):
+                continue
+            if link in self.known_fighters:
+                ids[link] = self.known_fighters[link]
+            else:
+                new_fighters.append({"fighter_link": link, "name": name})
+
+        if new_fighters:
+            conn.execute(INSERT_FIGHTERS, new_fighters)
+            rows = conn.execute(
+                SELECT_FIGHTER_IDS,
+                {"fighter_links": [row["fighter_link"] for row in new_fighters]},
+            )
+            ids.update({row.fighter_link: row.fighter_id for row in rows})
+        return ids
+
+    def delete_stale_rows(self, conn, table, df, rescraped):
+        # Copies of these fighters saved before rows were linked to fights
+        first_seen = df[df["FIGHT_LINK"].notna() & ~df["FIGHT_LINK"].isin(rescraped)]
+        if not first_seen.empty:
+            conn.execute(
+                text(
+                    f'DELETE FROM "{table}" WHERE "FIGHT_LINK" IS NULL '
+                    'AND "EVENT_TITLE" = :event_title AND "FIGHTER" = :fighter'
+                ),
+                [
+                    {"event_title": str(title), "fighter": fighter}
+                    for title, fighter in zip(
+                        first_seen["EVENT_TITLE"], first_seen["FIGHTER"]
+                    )
+                ],
+            )
+        # Fighters a re-scraped page no longer lists, e.g. a corrected name
+        for link, fighters in df.groupby("FIGHT_LINK")["FIGHTER"]:
+            if link in rescraped:
+                conn.execute(
+                    text(
+                        f'DELETE FROM "{table}" WHERE "FIGHT_LINK" = :link '
+                        'AND "FIGHTER" NOT IN :fighters'
+                    ).bindparams(bindparam("fighters", expanding=True)),
+                    {"link": link, "fighters": list(fighters)},
+                )
+
+    def flush(self):
+        if self.pending_pages == 0:
+            return
+
+        with metrics.timed("write"), self.engine.begin() as conn:
+            self.ensure_tables(conn)
+            stored_hashes = self.stored_hashes(conn)
+            # Pages identical to what is stored cost no row writes at all
+            unchanged = {
+                row["fight_link"]
+                for row in self.scraped_fights
+                if stored_hashes.get(row["fight_link"]) == row["content_hash"]
+            }
+            # Only fights stored before can have rows a correction made stale
+            rescraped = set(stored_hashes) - unchanged
+            if unchanged:
+                metrics.inc("unchanged_total", len(unchanged))
+            fighter_ids = self.fighter_ids(conn)
+            changed_fighters = set()
+
+            for table, frames in self.frames.items():
+                df = with_fighter_ids(pd.concat(frames, ignore_index=True), fighter_ids)
+                if table in FIGHT_LINK_TABLES:
+                    df = df[~df["FIGHT_LINK"].isin(unchanged)]
+                    if df.empty:
+                        continue
+                if "FIGHTER_ID" in df:
+                    changed_fighters.update(df["FIGHTER_ID"].dropna())
+                conn.execute(upsert_statement(table, df.columns), frame_rows(df))
+                # Event pages carry no content hash, so none of their fights
+                # count as re-scraped
+                self.delete_stale_rows(
+                    conn, table, df, rescraped if table in FIGHT_LINK_TABLES else ()
+                )
+
+            # Only the fighters whose rows were written are re-aggregated
+            if changed_fighters:
+                fighter_career.refresh(conn, changed_fighters)
+                fighter_career.mark_changed(conn)
+
+            # Pages are marked scraped in the same transaction as their rows
+            if self.scraped_fights:
+                conn.execute(MARK_FIGHT_SCRAPED, self.scraped_fights)
+            if self.scraped_events:
+                conn.execute(MARK_EVENT_SCRAPED, self.scraped_events)
+            if self.scraped_fighters:
+                conn.execute(UPSERT_FIGHTER_PROFILE, self.scraped_fighters)
+
+            conn.execute(CREATE_FAILED_LINKS)
+            scraped = [{"link": row["fight_link"]} for row in self.scraped_fights]
+            scraped += [{"link": row["event_link"]} for row in self.scraped_events]
+            scraped += [{"link": row["fighter_link"]} for row in self.scraped_fighters]
+            if scraped:
+                conn.execute(CLEAR_FAILED_LINK, scraped)
+            # A page whose write raised is still buffered when the flush that
+            # failed is retried; once it is written it is no longer a failure
+            scraped_links = {row["link"] for row in scraped}
+            failures = [
+                row for row in self.failures if row["link"] not in scraped_links
+            ]
+            if failures:
+                conn.execute(RECORD_FAILED_LINK, failures)
+
+        # Only ids that were committed are remembered
+        self.known_fighters.update(fighter_ids)
+        self.frames = {}
+        self.scraped_fights = []
+        self.scraped_events = []
+        self.scraped_fighters = []
+        self.failures = []
+        self.pending_pages = 0
+
+    def close(self):
+        if self.closed:
+            return
+        self.flush()
+        self.closed = True
+        atexit.unregister(self.close)
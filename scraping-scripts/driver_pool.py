@@ -0,0 +1,175 @@
+import multiprocessing
+import os
+import queue
+
+from tqdm import tqdm
+
+import driver_profiles
+import metrics
+import retry
+
+
+# Chrome's memory grows over a long crawl, so each worker recycles its driver
+MAX_PAGES_PER_DRIVER = 500
+
+# How long the parent waits for a result before checking for dead workers
+WORKER_POLL_SECONDS = 5
+
+
+def driver_is_alive(driver):
+    try:
+        driver.title
+        return True
+    except Exception:
+        return False
+
+
+def worker_main(worker_id, fight_links, results, driver_profile):
+    # Imported here so every worker process builds its own driver
+    import UFC_main_pull
+
+    def new_driver():
+        return UFC_main_pull.init_driver(headless=True, profile=driver_profile)
+
+    driver = None
+    pages_on_driver = 0
+    error = None
+
+    def restart_if_crashed():
+        # A crashed Chrome fails every later attempt, so replace it before
+        # retrying
+        nonlocal driver, pages_on_driver
+        if not driver_is_alive(driver):
+            print(f"Worker {worker_id}: restarting crashed driver")
+            driver = new_driver()
+            pages_on_driver = 0
+
+    try:
+        driver = new_driver()
+        for fight_link in fight_links:
+            if pages_on_driver >= MAX_PAGES_PER_DRIVER:
+                driver.quit()
+                driver = new_driver()
+                pages_on_driver = 0
+
+            try:
+                page = retry.call_with_retry(
+                    lambda: UFC_main_pull.fetch_fight_page(driver, fight_link),
+                    fight_link,
+                    before_retry=restart_if_crashed,
+                )
+                failure = None
+            except retry.ScrapeFailure as e:
+                page, failure = None, e
+                restart_if_crashed()
+            # Stage timings recorded in this process travel with each page
+            # and are merged into the parent's registry
+            worker_metrics = metrics.REGISTRY.snapshot(reset=True)
+            results.put((fight_link, page, failure, worker_metrics))
+            pages_on_driver += 1
+    except Exception as e:
+        # Sent with the end signal; the parent dead-letters the links this
+        # worker never got to
+        error = f"{type(e).__name__}: {e}"
+    finally:
+        if driver is not None:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        # The end signal is always sent, even if Chrome never started
+        worker_metrics = metrics.REGISTRY.snapshot(reset=True)
+        results.put((None, worker_id, error, worker_metrics))
+
+
+def run_driver_pool(
+    fight_links,
+    handle_result,
+    workers=None,
+    handle_failure=None,
+    driver_profile=driver_profiles.DEFAULT_PROFILE,
+):
+    """
+    Scrapes fight pages with one headless Chrome per worker process.
+
+    Parameters:
+    fight_links: Fight URLs to scrape; they are sharded round-robin across workers.
+    handle_result: Called as handle_result(link, (fight_details_df, sig_strike_df))
+        in the parent process, which acts as the single database writer.
+    workers: Number of worker processes, defaults to the number of CPU cores.
+    handle_failure: Optional, called as handle_failure(link, retry.ScrapeFailure) for
+        every page given up on after retries or whose handle_result raised, and
+        for the pages of a worker that failed or died before scraping them.
+    driver_profile: Key of driver_profiles.PROFILES each worker starts Chrome with.
+    """
+    workers = workers or os.cpu_count() or 1
+    workers = min(workers, len(fight_links))
+    if workers == 0:
+        return
+
+    results = multiprocessing.Queue(maxsize=workers * 4)
+    processes = [
+        multiprocessing.Process(
+            target=worker_main,
+            args=(i, fight_links[i::workers], results, driver_profile),
+        )
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    running = dict(enumerate(processes))
+    delivered = set()
+    progress = tqdm(total=len(fight_links), desc="Processing fights")
+
+    def fail_unscraped(worker_id, reason):
+        for fight_link in fight_links[worker_id::workers]:
+            if fight_link in delivered:
+                continue
+            delivered.add(fight_link)
+            progress.update(1)
+            failure = retry.ScrapeFailure(
+                fight_link,
+                "WorkerExited",
+                f"Driver pool worker {worker_id} {reason} before scraping this page",
+                1,
+                True,
+            )
+            print(f"Error processing {fight_link}: {failure}")
+            if handle_failure is not None:
+                handle_failure(fight_link, failure)
+
+    try:
+        while running:
+            try:
+                fight_link, page, failure, worker_metrics = results.get(
+                    timeout=WORKER_POLL_SECONDS
+                )
+            except queue.Empty:
+                # A worker killed outright (out of memory, a crash in Chrome's
+                # process) never sends its end signal
+                for worker_id, process in list(running.items()):
+                    if not process.is_alive():
+                        del running[worker_id]
+                        fail_unscraped(
+                            worker_id, f"exited with code {process.exitcode}"
+                        )
+                continue
+            metrics.REGISTRY.merge(worker_metrics)
+            if fight_link is None:
+                # End signal: (None, worker_id, error, metrics)
+                running.pop(page, None)
+                fail_unscraped(page, f"failed ({failure})" if failure else "stopped")
+                continue
+            delivered.add(fight_link)
+            progress.update(1)
+            if failure is not None:
+                print(f"Error processing {fight_link}: {failure}")
+                if handle_failure is not None:
+                    handle_failure(fight_link, failure)
+                continue
+            retry.deliver_result(fight_link, page, handle_result, handle_failure)
+    finally:
+        progress.close()
+        for process in processes:
+            process.join()
@@ -0,0 +1,129 @@
+import os
+
+
+# "default" is the plain Chrome the scrapers always started; "lean" is tuned
+# for scraping the server-rendered ufcstats pages. Lean stays opt-in
+# (--driver-profile lean) until it has been measured against real Chrome.
+DEFAULT_PROFILE = "default"
+
+PROFILES = {
+    "default": {
+        "headless": False,
+        "page_load_strategy": "normal",
+        "block_resources": False,
+        "arguments": [],
+        "prefs": {},
+    },
+    "lean": {
+        "headless": True,
+        # Return from driver.get() at DOMContentLoaded instead of the load
+        # event; the WebDriverWait calls already wait for the tables we read
+        "page_load_strategy": "eager",
+        "block_resources": True,
+        "arguments": [
+            "--disable-extensions",
+            "--disable-background-networking",
+            "--disable-component-update",
+            "--disable-default-apps",
+            "--disable-sync",
+            "--disable-notifications",
+            "--disable-features=Translate,MediaRouter,OptimizationHints",
+            "--disable-dev-shm-usage",
+            "--no-first-run",
+            "--mute-audio",
+            "--blink-settings=imagesEnabled=false",
+            # Only documents are ever cached, so a small cache is plenty
+            "--disk-cache-size=33554432",
+            "--window-size=1280,800",
+        ],
+        "prefs": {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.default_content_setting_values.notifications": 2,
+            "profile.default_content_setting_values.popups": 2,
+        },
+    },
+}
+
+# Everything but the HTML document. JavaScript stays enabled because the
+# extractors run through execute_script, but the page's own scripts are
+# never needed for the server-rendered tables
+BLOCKED_URLS = [
+    "*.css*",
+    "*.js*",
+    "*.png*",
+    "*.jpg*",
+    "*.jpeg*",
+    "*.gif*",
+    "*.svg*",
+    "*.webp*",
+    "*.ico*",
+    "*.woff*",
+    "*.ttf*",
+    "*.otf*",
+    "*.eot*",
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*doubleclick.net*",
+    "*facebook.net*",
+]
+
+DISK_CACHE_DIR = os.path.join(".driver_cache", "disk-cache")
+
+
+def disk_cache_dir():
+    # Chrome locks its cache directory, so every process (each driver pool
+    # worker included) gets its own
+    return os.path.abspath(os.path.join(DISK_CACHE_DIR, str(os.getpid())))
+
+
+def chrome_options(profile=DEFAULT_PROFILE, headless=False):
+    """
+    Builds ChromeOptions for a named profile.
+
+    Parameters:
+    profile: Key of PROFILES.
+    headless: Run headless even if the profile doesn't.
+
+    Returns:
+    ChromeOptions: Options to start webdriver.Chrome with.
+    """
+    from selenium import webdriver
+
+    settings = PROFILES[profile]
+    options = webdriver.ChromeOptions()
+    if headless or settings["headless"]:
+        options.add_argument("--headless=new")
+    options.page_load_strategy = settings["page_load_strategy"]
+    for argument in settings["arguments"]:
+        options.add_argument(argument)
+    if settings["block_resources"]:
+        # Revalidated pages are reused for the rest of the process's run
+        options.add_argument(f"--disk-cache-dir={disk_cache_dir()}")
+    if settings["prefs"]:
+        options.add_experimental_option("prefs", settings["prefs"])
+    return options
+
+
+def apply_profile(driver, profile=DEFAULT_PROFILE):
+    """
+    Applies the parts of a profile that need a running driver: blocking
+    non-document requests through the Chrome DevTools Protocol.
+    """
+    if not PROFILES[profile]["block_resources"]:
+        return
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URLS})
+
+
+def transferred_bytes(driver):
+    """
+    Returns the bytes the current page and its subresources took over the
+    network, from the browser's Resource Timing entries.
+    """
+    return driver.execute_script(
+        """
+        return performance.getEntriesByType('navigation')
+            .concat(performance.getEntriesByType('resource'))
+            .reduce((total, entry) => total + (entry.transferSize || 0), 0);
+        """
+    )
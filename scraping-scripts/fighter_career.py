@@ -0,0 +1,356 @@
+import argparse
+
+import pandas as pd
+from sqlalchemy import bindparam, create_engine, text
+
+
+# Rolling averages cover each fighter's most recent fights
+RECENT_FIGHTS = 5
+ROUND_SECONDS = 300
+# Fighters refreshed per query when rebuilding everything
+REFRESH_CHUNK_SIZE = 500
+
+# ufcstats method labels, grouped into the finish types that are counted
+METHOD_GROUPS = {
+    "KO/TKO": "ko_tko",
+    "SUB": "submission",
+    "U-DEC": "decision",
+    "S-DEC": "decision",
+    "M-DEC": "decision",
+}
+
+# One row per fighter; fighter_id is the primary key, so a lookup reads a
+# single row however many fights have been stored. The table itself is
+# created by migrations; changing these columns needs a new migration
+CAREER_COLUMNS = {
+    "fighter_id": "INTEGER PRIMARY KEY REFERENCES Fighters (fighter_id)",
+    "fights": "SMALLINT",
+    "wins": "SMALLINT",
+    "losses": "SMALLINT",
+    "other_results": "SMALLINT",
+    "wins_ko_tko": "SMALLINT",
+    "wins_submission": "SMALLINT",
+    "wins_decision": "SMALLINT",
+    "losses_ko_tko": "SMALLINT",
+    "losses_submission": "SMALLINT",
+    "losses_decision": "SMALLINT",
+    "fight_seconds": "INTEGER",
+    "knockdowns": "SMALLINT",
+    "sig_strikes_landed": "INTEGER",
+    "sig_strikes_attempted": "INTEGER",
+    "sig_strikes_absorbed": "INTEGER",
+    "sig_strikes_faced": "INTEGER",
+    "total_strikes_landed": "INTEGER",
+    "total_strikes_attempted": "INTEGER",
+    "takedowns_landed": "SMALLINT",
+    "takedowns_attempted": "SMALLINT",
+    "takedowns_allowed": "SMALLINT",
+    "takedowns_faced": "SMALLINT",
+    "submission_attempts": "SMALLINT",
+    "reversals": "SMALLINT",
+    "control_seconds": "INTEGER",
+    "head_landed": "INTEGER",
+    "body_landed": "INTEGER",
+    "leg_landed": "INTEGER",
+    "distance_landed": "INTEGER",
+    "clinch_landed": "INTEGER",
+    "ground_landed": "INTEGER",
+    "sig_strikes_landed_per_min": "REAL",
+    "sig_strikes_absorbed_per_min": "REAL",
+    "takedowns_per_15_min": "REAL",
+    "submission_attempts_per_15_min": "REAL",
+    "sig_strike_accuracy": "REAL",
+    "takedown_accuracy": "REAL",
+    "sig_strike_defense": "REAL",
+    "takedown_defense": "REAL",
+    "recent_fights": "SMALLINT",
+    "recent_win_rate": "REAL",
+    "recent_avg_knockdowns": "REAL",
+    "recent_avg_sig_strikes_landed": "REAL",
+    "recent_avg_sig_strikes_absorbed": "REAL",
+    "recent_avg_takedowns_landed": "REAL",
+    "recent_avg_control_seconds": "REAL",
+    "recent_sig_strikes_landed_per_min": "REAL",
+    "recent_sig_strikes_absorbed_per_min": "REAL",
+    "recent_sig_strike_accuracy": "REAL",
+    "last_fight_date": "DATE",
+    "updated_at": "DATETIME DEFAULT CURRENT_TIMESTAMP",
+}
+
+# Per-fight stats summed into the career totals
+TOTAL_COLUMNS = [
+    "fight_seconds",
+    "knockdowns",
+    "sig_strikes_landed",
+    "sig_strikes_attempted",
+    "sig_strikes_absorbed",
+    "sig_strikes_faced",
+    "total_strikes_landed",
+    "total_strikes_attempted",
+    "takedowns_landed",
+    "takedowns_attempted",
+    "takedowns_allowed",
+    "takedowns_faced",
+    "submission_attempts",
+    "reversals",
+    "control_seconds",
+    "head_landed",
+    "body_landed",
+    "leg_landed",
+    "distance_landed",
+    "clinch_landed",
+    "ground_landed",
+]
+
+# One row per stored fight of the requested fighters. Rates need the
+# opponent's row (for strikes absorbed and defense) and the event row (for
+# result, method and fight length), which is keyed on the same fight link
+FIGHTER_FIGHTS = text(
+    """
+    SELECT
+        d.FIGHTER_ID AS fighter_id,
+        d.FIGHT_LINK AS fight_link,
+        o.FIGHTER_ID AS opponent_id,
+        c.date AS date,
+        d.KD AS knockdowns,
+        d.SIG_STR_SUCCESSFUL AS sig_strikes_landed,
+        d.SIG_STR_ATTEMPTS AS sig_strikes_attempted,
+        d.TOTAL_STR_SUCCESSFUL AS total_strikes_landed,
+        d.TOTAL_STR_ATTEMPTS AS total_strikes_attempted,
+        d.TD_SUCCESSFUL AS takedowns_landed,
+        d.TD_ATTEMPTS AS takedowns_attempted,
+        d.SUB_ATT AS submission_attempts,
+        d.REV AS reversals,
+        d.CTRL_SECONDS AS control_seconds,
+        s.HEAD_SUCCESSFUL AS head_landed,
+        s.BODY_SUCCESSFUL AS body_landed,
+        s.LEG_SUCCESSFUL AS leg_landed,
+        s.DISTANCE_SUCCESSFUL AS distance_landed,
+        s.CLINCH_SUCCESSFUL AS clinch_landed,
+        s.GROUND_SUCCESSFUL AS ground_landed,
+        o.SIG_STR_SUCCESSFUL AS sig_strikes_absorbed,
+        o.SIG_STR_ATTEMPTS AS sig_strikes_faced,
+        o.TD_SUCCESSFUL AS takedowns_allowed,
+        o.TD_ATTEMPTS AS takedowns_faced,
+        e.WIN AS result,
+        e.METHOD AS method,
+        e.ROUND AS round,
+        e.TIME_SECONDS AS time_seconds
+    FROM Fight_Details d
+    LEFT JOIN Significant_Strikes s
+        ON s.FIGHT_LINK = d.FIGHT_LINK AND s.FIGHTER_ID = d.FIGHTER_ID
+    LEFT JOIN Fight_Details o
+        ON o.FIGHT_LINK = d.FIGHT_LINK AND o.FIGHTER_ID <> d.FIGHTER_ID
+    LEFT JOIN All_Fights f ON f.fight_link = d.FIGHT_LINK
+    LEFT JOIN All_Cards c ON c.card_link = f.card_link
+    LEFT JOIN Event_Details e
+        ON e.FIGHT_LINK = d.FIGHT_LINK AND e.FIGHTER_ID = d.FIGHTER_ID
+    WHERE d.FIGHTER_ID IN :fighter_ids
+"""
+).bindparams(bindparam("fighter_ids", expanding=True))
+
+DELETE_CAREERS = text(
+    "DELETE FROM Fighter_Career WHERE fighter_id IN :fighter_ids"
+).bindparams(bindparam("fighter_ids", expanding=True))
+
+# Bumped whenever careers change, so readers holding a copy know to reload
+BUMP_VERSION = text(
+    "UPDATE Data_Version SET version = version + 1 WHERE name = 'Fighter_Career'"
+)
+
+SELECT_VERSION = text(
+    "SELECT version AS version FROM Data_Version WHERE name = 'Fighter_Career'"
+)
+
+SELECT_CAREER = text("SELECT * FROM Fighter_Career WHERE fighter_id = :fighter_id")
+
+SELECT_FIGHTER_IDS = text(
+    """
+    SELECT DISTINCT FIGHTER_ID AS fighter_id FROM Fight_Details
+    WHERE FIGHTER_ID IS NOT NULL
+"""
+)
+
+
+def ratio(numerator, denominator):
+    # NaN (stored as NULL) when there is nothing to divide by
+    return numerator / denominator.where(denominator > 0)
+
+
+def per_minute(totals, column, minutes=1):
+    return ratio(totals[column], totals["fight_seconds"] / (60 * minutes))
+
+
+def prepare_fights(fights):
+    # Older rows hold their stats as text; everything is numeric from here
+    fights = fights.copy()
+    for column in TOTAL_COLUMNS[1:] + ["round", "time_seconds"]:
+        fights[column] = pd.to_numeric(fights[column], errors="coerce")
+    # ufcstats gives the final round and the time into it
+    fights["fight_seconds"] = (fights["round"] - 1) * ROUND_SECONDS + fights[
+        "time_seconds"
+    ]
+    fights["date"] = pd.to_datetime(fights["date"], errors="coerce")
+    # Draws and no contests are neither, and count towards other_results
+    fights["win"] = fights["result"] == "WIN"
+    fights["loss"] = fights["result"] == "LOSS"
+
+    method = fights["method"].map(METHOD_GROUPS)
+    for group in sorted(set(METHOD_GROUPS.values())):
+        fights[f"wins_{group}"] = fights["win"] & (method == group)
+        fights[f"losses_{group}"] = fights["loss"] & (method == group)
+    return fights.sort_values(["fighter_id", "date"], na_position="first")
+
+
+def rate_totals(fights):
+    # Per-minute rates only use fights whose length is known
+    timed = fights[fights["fight_seconds"] > 0]
+    return timed.groupby("fighter_id")[TOTAL_COLUMNS].sum()
+
+
+def career_frame(fights):
+    """
+    Aggregates per-fight rows into one Fighter_Career row per fighter.
+
+    Parameters:
+    fights: Rows of FIGHTER_FIGHTS.
+
+    Returns:
+    pd.DataFrame: The Fighter_Career columns, without updated_at.
+    """
+    fights = prepare_fights(fights)
+    grouped = fights.groupby("fighter_id")
+    finish_columns = [c for c in fights.columns if c.startswith(("wins_", "losses_"))]
+
+    careers = grouped[TOTAL_COLUMNS + finish_columns].sum()
+    careers["fights"] = grouped.size()
+    careers["wins"] = grouped["win"].sum()
+    careers["losses"] = grouped["loss"].sum()
+    careers["other_results"] = careers["fights"] - careers["wins"] - careers["losses"]
+    careers["last_fight_date"] = grouped["date"].max().dt.strftime("%Y-%m-%d")
+
+    timed = rate_totals(fights).reindex(careers.index)
+    careers["sig_strikes_landed_per_min"] = per_minute(timed, "sig_strikes_landed")
+    careers["sig_strikes_absorbed_per_min"] = per_minute(timed, "sig_strikes_absorbed")
+    careers["takedowns_per_15_min"] = per_minute(timed, "takedowns_landed", 15)
+    careers["submission_attempts_per_15_min"] = per_minute(
+        timed, "submission_attempts", 15
+    )
+    careers["sig_strike_accuracy"] = ratio(
+        careers["sig_strikes_landed"], careers["sig_strikes_attempted"]
+    )
+    careers["takedown_accuracy"] = ratio(
+        careers["takedowns_landed"], careers["takedowns_attempted"]
+    )
+    careers["sig_strike_defense"] = 1 - ratio(
+        careers["sig_strikes_absorbed"], careers["sig_strikes_faced"]
+    )
+    careers["takedown_defense"] = 1 - ratio(
+        careers["takedowns_allowed"], careers["takedowns_faced"]
+    )
+
+    # Fights are in date order, so the tail of each group is the most recent
+    recent = fights.groupby("fighter_id").tail(RECENT_FIGHTS)
+    recent_grouped = recent.groupby("fighter_id")
+    recent_means = recent_grouped[
+        [
+            "knockdowns",
+            "sig_strikes_landed",
+            "sig_strikes_absorbed",
+            "takedowns_landed",
+            "control_seconds",
+        ]
+    ].mean()
+    recent_totals = recent_grouped[TOTAL_COLUMNS].sum()
+    recent_timed = rate_totals(recent).reindex(careers.index)
+    careers["recent_fights"] = recent_grouped.size()
+    careers["recent_win_rate"] = recent_grouped["win"].mean()
+    for column in recent_means.columns:
+        careers[f"recent_avg_{column}"] = recent_means[column]
+    careers["recent_sig_strikes_landed_per_min"] = per_minute(
+        recent_timed, "sig_strikes_landed"
+    )
+    careers["recent_sig_strikes_absorbed_per_min"] = per_minute(
+        recent_timed, "sig_strikes_absorbed"
+    )
+    careers["recent_sig_strike_accuracy"] = ratio(
+        recent_totals["sig_strikes_landed"], recent_totals["sig_strikes_attempted"]
+    )
+
+    columns = [c for c in CAREER_COLUMNS if c not in ("fighter_id", "updated_at")]
+    return careers[columns].reset_index()
+
+
+def refresh(conn, fighter_ids=None):
+    """
+    Recomputes the Fighter_Career rows of the given fighters from their
+    stored fights; every other fighter's row is left alone.
+
+    Parameters:
+    conn: Connection inside the caller's transaction.
+    fighter_ids: Fighters whose fights changed; None rebuilds every fighter.
+
+    Returns:
+    int: Number of fighters refreshed.
+    """
+    if fighter_ids is None:
+        fighter_ids = [row.fighter_id for row in conn.execute(SELECT_FIGHTER_IDS)]
+    fighter_ids = sorted({int(fighter_id) for fighter_id in fighter_ids})
+
+    for start in range(0, len(fighter_ids), REFRESH_CHUNK_SIZE):
+        chunk = fighter_ids[start : start + REFRESH_CHUNK_SIZE]
+        fights = pd.read_sql_query(FIGHTER_FIGHTS, conn, params={"fighter_ids": chunk})
+        conn.execute(DELETE_CAREERS, {"fighter_ids": chunk})
+        if fights.empty:
+            continue
+
+        careers = career_frame(fights)
+        # DB drivers can't bind numpy scalars, so hand them plain Python objects
+        careers = careers.astype(object).where(careers.notna(), None)
+        column_list = ", ".join(careers.columns)
+        placeholders = ", ".join(f":{column}" for column in careers.columns)
+        conn.execute(
+            text(f"INSERT INTO Fighter_Career ({column_list}) VALUES ({placeholders})"),
+            careers.to_dict(orient="records"),
+        )
+    return len(fighter_ids)
+
+
+def mark_changed(conn):
+    conn.execute(BUMP_VERSION)
+
+
+def data_version(conn):
+    return conn.execute(SELECT_VERSION).scalar()
+
+
+def get_career(engine, fighter_id):
+    """
+    Returns the Fighter_Career row of one fighter as a dict, or None.
+    """
+    with engine.connect() as conn:
+        row = conn.execute(SELECT_CAREER, {"fighter_id": fighter_id}).mappings().first()
+    return dict(row) if row else None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Rebuild or show the Fighter_Career aggregates"
+    )
+    parser.add_argument("--db-url", default="sqlite:///UFC_Data.db")
+    parser.add_argument(
+        "--fighter-id", type=int, help="Print this fighter's row instead of rebuilding"
+    )
+    args = parser.parse_args()
+
+    import db_writer
+    import migrations
+
+    engine = db_writer.configure_sqlite(create_engine(args.db_url))
+    migrations.migrate(engine)
+    if args.fighter_id is not None:
+        print(get_career(engine, args.fighter_id))
+    else:
+        with engine.begin() as conn:
+            print(f"Refreshed {refresh(conn)} fighters")
+            mark_changed(conn)
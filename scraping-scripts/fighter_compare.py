@@ -0,0 +1,454 @@
+import argparse
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+import fighter_career
+
+
+DEFAULT_CACHE_SIZE = 4096
+# How often, at most, the database is asked whether new fights arrived
+DEFAULT_CHECK_INTERVAL = 1.0
+DEFAULT_PORT = 8050
+
+SELECT_FIGHTERS = text(
+    """
+    SELECT fighter_id AS fighter_id, fighter_link AS fighter_link, name AS name,
+           height_inches AS height_inches, reach_inches AS reach_inches,
+           stance AS stance, dob AS dob
+    FROM Fighters
+"""
+)
+
+SELECT_CAREERS = text("SELECT * FROM Fighter_Career")
+
+# Per-fight columns kept in memory for "last N fights"
+FIGHT_COLUMNS = [
+    "date",
+    "fight_link",
+    "opponent_id",
+    "result",
+    "method",
+    "round",
+    "fight_seconds",
+    "knockdowns",
+    "sig_strikes_landed",
+    "sig_strikes_attempted",
+    "sig_strikes_absorbed",
+    "takedowns_landed",
+    "takedowns_attempted",
+    "submission_attempts",
+    "control_seconds",
+]
+
+# Career metrics set side by side in a comparison, with the difference
+COMPARED_COLUMNS = [
+    "wins",
+    "losses",
+    "sig_strikes_landed_per_min",
+    "sig_strikes_absorbed_per_min",
+    "takedowns_per_15_min",
+    "submission_attempts_per_15_min",
+    "sig_strike_accuracy",
+    "sig_strike_defense",
+    "takedown_accuracy",
+    "takedown_defense",
+    "recent_win_rate",
+    "recent_sig_strikes_landed_per_min",
+    "recent_sig_strikes_absorbed_per_min",
+    "recent_sig_strike_accuracy",
+]
+
+
+def plain(value):
+    # numpy scalars and NaN don't survive json.dumps
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if value is pd.NaT or value is pd.NA:
+        return None
+    return value
+
+
+class FighterIndex:
+    """
+    In-memory, column-per-array copy of Fighters, Fighter_Career and every
+    stored fight, keyed by fighter_id.
+
+    A fighter's career is one row position per column, and their fights are
+    one contiguous slice of the fight arrays (sorted by fighter, then date),
+    so neither lookup touches the database or scans other fighters.
+    """
+
+    def __init__(self, fighters, careers, fights):
+        fighters = fighters.merge(careers, on="fighter_id", how="left")
+        # Fighters without stored fights have no career row; keep counts whole
+        for column, sql_type in fighter_career.CAREER_COLUMNS.items():
+            if column in fighters and "INT" in sql_type:
+                fighters[column] = fighters[column].astype("Int64")
+        self.columns = {column: fighters[column].to_numpy() for column in fighters}
+        self.positions = {
+            int(fighter_id): i for i, fighter_id in enumerate(fighters["fighter_id"])
+        }
+        self.by_link = dict(zip(fighters["fighter_link"], fighters["fighter_id"]))
+        self.by_name = {}
+        for fighter_id, name in zip(fighters["fighter_id"], fighters["name"]):
+            if isinstance(name, str):
+                self.by_name.setdefault(name.lower(), []).append(int(fighter_id))
+
+        fights = fights.sort_values(["fighter_id", "date"], kind="stable")
+        fighter_ids = fights["fighter_id"].to_numpy()
+        self.fights = {column: fights[column].to_numpy() for column in FIGHT_COLUMNS}
+        self.fights["date"] = fights["date"].dt.strftime("%Y-%m-%d").to_numpy()
+        # [start, end) of each fighter's fights in the fight arrays
+        ids, starts = np.unique(fighter_ids, return_index=True)
+        ends = np.append(starts[1:], len(fighter_ids))
+        self.fight_ranges = {
+            int(fighter_id): (int(start), int(end))
+            for fighter_id, start, end in zip(ids, starts, ends)
+        }
+
+    @classmethod
+    def load(cls, engine):
+        with engine.connect() as conn:
+            fighters = pd.read_sql_query(SELECT_FIGHTERS, conn)
+            careers = pd.read_sql_query(SELECT_CAREERS, conn).drop(
+                columns="updated_at"
+            )
+            fighter_ids = [
+                row.fighter_id
+                for row in conn.execute(fighter_career.SELECT_FIGHTER_IDS)
+            ]
+            size = fighter_career.REFRESH_CHUNK_SIZE
+            chunks = [
+                fighter_ids[start : start + size]
+                for start in range(0, len(fighter_ids), size)
+            ]
+            fights = pd.concat(
+                [
+                    pd.read_sql_query(
+                        fighter_career.FIGHTER_FIGHTS,
+                        conn,
+                        params={"fighter_ids": chunk},
+                    )
+                    for chunk in chunks or [[]]
+                ],
+                ignore_index=True,
+            )
+        return cls(fighters, careers, fighter_career.prepare_fights(fights))
+
+    def resolve(self, fighter):
+        """
+        Finds a fighter's id from an id, a fighter-details link or a name.
+        Raises KeyError if nobody matches and ValueError if a name is shared.
+        """
+        if isinstance(fighter, (int, np.integer)) or str(fighter).isdigit():
+            fighter_id = int(fighter)
+            if fighter_id in self.positions:
+                return fighter_id
+        elif fighter in self.by_link:
+            return int(self.by_link[fighter])
+        else:
+            matches = self.by_name.get(str(fighter).strip().lower(), [])
+            if len(matches) > 1:
+                raise ValueError(
+                    f"{fighter!r} matches fighters {matches}; use an id or link"
+                )
+            if matches:
+                return matches[0]
+        raise KeyError(f"Unknown fighter {fighter!r}")
+
+    def name(self, fighter_id):
+        position = self.positions.get(fighter_id)
+        return None if position is None else plain(self.columns["name"][position])
+
+    def career(self, fighter_id):
+        position = self.positions[fighter_id]
+        return {
+            column: plain(values[position]) for column, values in self.columns.items()
+        }
+
+    def last_fights(self, fighter_id, n):
+        start, end = self.fight_ranges.get(fighter_id, (0, 0))
+        start = max(start, end - n)
+        fights = []
+        # Most recent first
+        for i in range(end - 1, start - 1, -1):
+            fight = {column: plain(self.fights[column][i]) for column in FIGHT_COLUMNS}
+            opponent_id = fight["opponent_id"]
+            fight["opponent_id"] = None if opponent_id is None else int(opponent_id)
+            fight["opponent"] = self.name(fight["opponent_id"])
+            fights.append(fight)
+        return fights
+
+    def head_to_head(self, fighter_id, opponent_id):
+        start, end = self.fight_ranges.get(fighter_id, (0, 0))
+        opponents = self.fights["opponent_id"][start:end]
+        return [
+            {
+                "date": plain(self.fights["date"][start + i]),
+                "fight_link": plain(self.fights["fight_link"][start + i]),
+                "result": plain(self.fights["result"][start + i]),
+                "method": plain(self.fights["method"][start + i]),
+            }
+            for i in np.flatnonzero(opponents == opponent_id)
+        ]
+
+
+class LRUCache:
+    def __init__(self, max_size=DEFAULT_CACHE_SIZE):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            if key not in self.entries:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+
+def copy_result(result):
+    # Callers get their own dicts and lists, so mutating a result can't change
+    # the cached entry every later caller is served. Every value is already a
+    # plain scalar, which makes this much cheaper than copy.deepcopy
+    return {
+        "fighters": [dict(career) for career in result["fighters"]],
+        "differences": dict(result["differences"]),
+        "head_to_head": [dict(fight) for fight in result["head_to_head"]],
+        "recent_fights": [
+            [dict(fight) for fight in fights] for fights in result["recent_fights"]
+        ],
+    }
+
+
+class ComparisonService:
+    """
+    Answers fighter comparisons from a FighterIndex, caching the results of
+    hot comparisons in an LRU.
+
+    BufferedWriter bumps Data_Version for Fighter_Career with every write;
+    the service checks that counter at most once per check_interval seconds.
+    When it has moved, a new index is built in the background while the old
+    one keeps answering, then the index and an empty cache are swapped in
+    together, so no request waits for a reload.
+    """
+
+    def __init__(
+        self,
+        engine,
+        cache_size=DEFAULT_CACHE_SIZE,
+        check_interval=DEFAULT_CHECK_INTERVAL,
+    ):
+        self.engine = engine
+        self.cache_size = cache_size
+        self.check_interval = check_interval
+        self.reload_lock = threading.Lock()
+        self.reloading = False
+        self.version = None
+        self.checked_at = 0.0
+        self.reload()
+
+    @property
+    def index(self):
+        return self.state[0]
+
+    @property
+    def cache(self):
+        return self.state[1]
+
+    def current_version(self):
+        with self.engine.connect() as conn:
+            return fighter_career.data_version(conn)
+
+    def reload(self):
+        with self.reload_lock:
+            try:
+                version = self.current_version()
+                index = FighterIndex.load(self.engine)
+                # One assignment, so a request never pairs the new index with
+                # results cached from the old one
+                self.state = (index, LRUCache(self.cache_size))
+                self.version = version
+                self.checked_at = time.monotonic()
+            finally:
+                self.reloading = False
+
+    def refresh_if_changed(self):
+        if self.reloading or time.monotonic() - self.checked_at < self.check_interval:
+            return
+        self.checked_at = time.monotonic()
+        if self.current_version() != self.version:
+            self.reloading = True
+            threading.Thread(target=self.reload, daemon=True).start()
+
+    def invalidate(self):
+        """
+        Reloads now, for callers that just wrote to the same database.
+        """
+        self.reload()
+
+    def compare(self, fighter_a, fighter_b, recent=5):
+        """
+        Compares two fighters' careers.
+
+        Parameters:
+        fighter_a, fighter_b: fighter_id, fighter-details link or name.
+        recent: Number of latest fights listed for each fighter.
+
+        Returns:
+        dict: Both careers, per-metric differences (a - b), head-to-head
+            fights and each fighter's latest fights.
+        """
+        self.refresh_if_changed()
+        index, cache = self.state
+        a, b = index.resolve(fighter_a), index.resolve(fighter_b)
+        key = (a, b, recent)
+        result = cache.get(key)
+        if result is not None:
+            return copy_result(result)
+
+        career_a, career_b = index.career(a), index.career(b)
+        differences = {}
+        for column in COMPARED_COLUMNS:
+            value_a, value_b = career_a.get(column), career_b.get(column)
+            differences[column] = (
+                None if value_a is None or value_b is None else value_a - value_b
+            )
+        result = {
+            "fighters": [career_a, career_b],
+            "differences": differences,
+            "head_to_head": index.head_to_head(a, b),
+            "recent_fights": [
+                index.last_fights(a, recent),
+                index.last_fights(b, recent),
+            ],
+        }
+        cache.put(key, result)
+        return copy_result(result)
+
+    def last_fights(self, fighter, n=5):
+        """
+        Returns a fighter's latest n fights, most recent first.
+        """
+        self.refresh_if_changed()
+        index = self.index
+        fighter_id = index.resolve(fighter)
+        return {
+            "fighter_id": fighter_id,
+            "name": index.name(fighter_id),
+            "fights": index.last_fights(fighter_id, n),
+        }
+
+
+# Query parameters each endpoint needs
+REQUIRED_PARAMS = {"/compare": ["a", "b"], "/fights": ["fighter"]}
+
+
+class ComparisonHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        service = self.server.service
+        if url.path not in REQUIRED_PARAMS:
+            self.send_json(404, {"error": "Not found"})
+            return
+        missing = [name for name in REQUIRED_PARAMS[url.path] if name not in params]
+        if missing:
+            self.send_json(400, {"error": f"Missing parameters: {', '.join(missing)}"})
+            return
+
+        try:
+            if url.path == "/compare":
+                body = service.compare(
+                    params["a"], params["b"], int(params.get("recent", 5))
+                )
+            else:
+                body = service.last_fights(params["fighter"], int(params.get("n", 5)))
+        except KeyError as e:
+            self.send_json(404, {"error": e.args[0]})
+            return
+        except ValueError as e:
+            self.send_json(400, {"error": str(e)})
+            return
+        self.send_json(200, body)
+
+    def send_json(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(service, port=DEFAULT_PORT, host="127.0.0.1"):
+    """
+    Serves GET /compare?a=...&b=...[&recent=5] and
+    GET /fights?fighter=...[&n=5] from a background thread.
+
+    Returns:
+    ThreadingHTTPServer: Call shutdown() when finished.
+    """
+    server = ThreadingHTTPServer((host, port), ComparisonHandler)
+    server.service = service
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Serving comparisons on http://{host}:{server.server_address[1]}")
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve fighter comparisons")
+    parser.add_argument("--db-url", default="sqlite:///UFC_Data.db")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_SIZE)
+    parser.add_argument(
+        "--compare",
+        nargs=2,
+        metavar=("A", "B"),
+        help="Print one comparison (ids, links or names) instead of serving",
+    )
+    args = parser.parse_args()
+
+    import db_writer
+    import migrations
+
+    engine = db_writer.configure_sqlite(create_engine(args.db_url))
+    migrations.migrate(engine)
+    service = ComparisonService(engine, cache_size=args.cache_size)
+    if args.compare:
+        print(json.dumps(service.compare(*args.compare), indent=2))
+    else:
+        server = serve(service, args.port, args.host)
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            server.shutdown()
@@ -1,7 +1,4 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
-from webdriver_manager.chrome import ChromeDriverManager
 import pandas as pd
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
@@ -20,41 +17,54 @@ def scrape_fights(driver, card_link):
 
 ### actual main###
 if __name__ == "__main__":
-    driver = init_driver()
-    link = "http://ufcstats.com/statistics/events/completed?page=all"
-
-    # Scrape cards to get a dataframe of events
-    cards_df = scrape_cards(driver, link)
+    import argparse
 
-    # Scrape fights for each event to get a dataframe of fights with eventIDs
-    fights_df = scrape_fights(driver, cards_df)
-
-    # Initialize empty DataFrames for event details and fight details
-    all_event_details_df = pd.DataFrame()
-    all_fight_details_df = pd.DataFrame()
-    all_significant_strikes_df = pd.DataFrame()
+    import record_sinks
+    from UFC_main_pull import (
+        init_backend,
+        close_backend,
+        iter_fight_pages,
+        scrape_event_pages,
+    )
+    from UFC_main_pull import scrape_cards as scrape_all_cards
 
-    # Iterate over each event link to scrape event details
-    for event_link in cards_df['card_link'].unique():
-        event_details_df = scrape_event_details(driver, [event_link])
-        all_event_details_df = pd.concat([all_event_details_df, event_details_df], ignore_index=True)
+    parser = argparse.ArgumentParser(description="Scrape every UFC event and fight")
+    parser.add_argument("--backend", choices=["http", "selenium"], default="http")
+    parser.add_argument(
+        "--sink", choices=list(record_sinks.SINKS), default="parquet"
+    )
+    parser.add_argument(
+        "--out",
+        default="ufc_export",
+        help="Output directory (parquet, ndjson) or database file (sqlite)",
+    )
+    parser.add_argument(
+        "--chunk-size", type=int, default=record_sinks.DEFAULT_CHUNK_SIZE
+    )
+    args = parser.parse_args()
 
-    # Iterate over each fight link to scrape fight details and significant strikes
-    for fight_link in fights_df['fight_link'].unique():
-        fight_details_df = scrape_fight_details(driver, fight_link)
-        significant_strikes_df = scrape_significant_strikes(driver, fight_link)
-        all_fight_details_df = pd.concat([all_fight_details_df, fight_details_df], ignore_index=True)
-        all_significant_strikes_df = pd.concat([all_significant_strikes_df, significant_strikes_df], ignore_index=True)
+    driver = init_backend(args.backend)
+    link = "http://ufcstats.com/statistics/events/completed?page=all"
 
-    # Here, you might want to merge/join DataFrames based on common columns (e.g., eventID, fight_link)
-    # to create a unified dataset for analysis or database insertion.
+    try:
+        # Scrape cards to get a dataframe of events
+        cards_df = scrape_all_cards(driver, link)
 
-    driver.quit()
+        # Stream every scraped page straight to the sink; rows are written in
+        # fixed-size chunks instead of being concatenated onto a growing
+        # DataFrame, so memory stays flat and time stays linear
+        with record_sinks.open_sink(args.sink, args.out, args.chunk_size) as sink:
+            sink.write("All_Cards", cards_df)
 
-    # Optional: Save the DataFrames to files or insert them into a database
-    # cards_df.to_csv('cards.csv', index=False)
-    # all_event_details_df.to_csv('event_details.csv', index=False)
-    # all_fight_details_df.to_csv('fight_details.csv', index=False)
-    # all_significant_strikes_df.to_csv('significant_strikes.csv', index=False)
+            # Load each event page once for both its fights (with eventIDs)
+            # and its Event_Details rows, writing each card as it is parsed.
+            # Only the fight links are kept, for the fight page crawl
+            fight_links = {}
+            for fights_df, event_details_df in scrape_event_pages(driver, cards_df):
+                sink.write("All_Fights", fights_df)
+                sink.write("Event_Details", event_details_df)
+                fight_links.update(dict.fromkeys(fights_df.get("fight_link", [])))
 
-    # If saving to a database, you would use SQLAlchemy or another database connector here.
+            sink.write_all(iter_fight_pages(driver, list(fight_links)))
+    finally:
+        close_backend(driver)
@@ -1,17 +1,9 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
-from webdriver_manager.chrome import ChromeDriverManager
 import pandas as pd
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import NoSuchElementException
 
-
-def init_driver():
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service)
-    return driver
+from chromedriver import init_driver
 
 
 def scrape_cards(driver, link):
@@ -187,32 +179,22 @@ def scrape_event_details(driver, event_links):
     return pd.DataFrame(all_event_details)
 
 
-# Remember to replace the placeholders with actual Selenium WebDriver setup and usage as needed.
-
-
-# The rest of your script remains unchanged
-
-# Setting up the WebDriver
-driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()))
-
-# Example usage
-link = "http://ufcstats.com/statistics/events/completed?page=all"
-df = scrape_cards(driver, link)  # Assign the result to df
-print(df)
-
-# Pass the df to scrape_fights
-df_fights = scrape_fights(driver, df)
-
-# Extract event links from the DataFrame
-event_links = df["card_link"].tolist()[:2]  # Limit to the first two event links
-
-# Scrape event details for the selected event links
-event_details_df = scrape_event_details(driver, event_links)
-print(event_details_df)
-
-
 if __name__ == "__main__":
+    # One driver for the whole example
     driver = init_driver()
-    link = "http://www.ufcstats.com/statistics/events/completed"
-    cards_df = scrape_cards(driver, link)
-    driver.quit()
\ No newline at end of file
+    try:
+        link = "http://ufcstats.com/statistics/events/completed?page=all"
+        df = scrape_cards(driver, link)
+        print(df)
+
+        # Pass the df to scrape_fights
+        df_fights = scrape_fights(driver, df)
+
+        # Extract event links from the DataFrame
+        event_links = df["card_link"].tolist()[:2]  # Limit to the first two events
+
+        # Scrape event details for the selected event links
+        event_details_df = scrape_event_details(driver, event_links)
+        print(event_details_df)
+    finally:
+        driver.quit()
@@ -0,0 +1,144 @@
+import metrics
+import ufc_parsers
+import ufc_schema
+
+
+# Each script runs in the page and returns plain JSON-able lists, so a whole
+# table costs one execute_script round-trip instead of one per cell.
+CELL_VALUES_JS = """
+function textOf(el) {
+    return el ? el.innerText.replace(/\\s+/g, " ").trim() : "";
+}
+function cellValues(td) {
+    return Array.from(td.querySelectorAll("p")).map(textOf);
+}
+function rowCells(tr) {
+    return Array.from(tr.children)
+        .filter(function (el) { return el.tagName === "TD"; })
+        .map(cellValues);
+}
+function fighterLinks(tr) {
+    return Array.from(tr.querySelectorAll('a[href*="fighter-details"]')).map(
+        function (a) { return a.href; }
+    );
+}
+function fightLinks(tr) {
+    return Array.from(tr.querySelectorAll('a[href*="fight-details"]')).map(
+        function (a) { return a.href; }
+    );
+}
+"""
+
+CARDS_JS = CELL_VALUES_JS + """
+var rows = document.querySelectorAll(
+    "body > section > div > div > div > div.b-statistics__sub-inner > div > table > tbody > tr"
+);
+return Array.from(rows).map(function (tr) {
+    var link = tr.querySelector("a.b-link.b-link_style_black");
+    var cells = tr.querySelectorAll("td");
+    return {
+        card_link: link ? link.href : "",
+        title: textOf(link),
+        date: textOf(tr.querySelector("span.b-statistics__date")),
+        location: cells.length > 1 ? textOf(cells[1]) : ""
+    };
+});
+"""
+
+EVENT_DETAILS_JS = CELL_VALUES_JS + """
+var rows = Array.from(
+    document.querySelectorAll("tbody > tr.b-fight-details__table-row")
+);
+return {
+    title: textOf(document.querySelector("body > section > div > h2 > span")),
+    rows: rows.map(rowCells),
+    links: rows.map(fighterLinks),
+    fightLinks: rows.map(fightLinks)
+};
+"""
+
+FIGHT_PAGE_JS = CELL_VALUES_JS + """
+var totals = document.querySelector(
+    "body > section > div > div > section:nth-child(4) > table > tbody > tr"
+);
+var sig = document.querySelector("body > section > div > div > table > tbody > tr");
+return {
+    title: textOf(document.querySelector("body > section > div > h2 > a")),
+    totals: totals ? rowCells(totals) : [],
+    totalsLinks: totals ? fighterLinks(totals) : [],
+    sig: sig ? rowCells(sig) : [],
+    sigLinks: sig ? fighterLinks(sig) : []
+};
+"""
+
+FIGHTER_PROFILE_JS = CELL_VALUES_JS + """
+var name = document.querySelector("span.b-content__title-highlight");
+return {
+    name: name ? textOf(name) : null,
+    info: Array.from(document.querySelectorAll("li.b-list__box-list-item")).map(
+        function (li) {
+            var text = textOf(li);
+            var colon = text.indexOf(":");
+            return colon < 0 ? [text] : [text.slice(0, colon), text.slice(colon + 1)];
+        }
+    )
+};
+"""
+
+
+@metrics.stage("extract")
+def extract_cards(driver):
+    cards = [card for card in driver.execute_script(CARDS_JS) if card["title"]]
+    return ufc_parsers.build_cards_frame(cards)
+
+
+@metrics.stage("extract")
+def extract_event_details(driver):
+    page = driver.execute_script(EVENT_DETAILS_JS)
+    return ufc_parsers.build_event_details_frame(
+        page["rows"], page["title"], page["links"], page["fightLinks"]
+    )
+
+
+@metrics.stage("extract")
+def extract_event_page(driver, eventID):
+    # The fight links come back with the event table, so a card needs one
+    # page load and one round-trip
+    page = driver.execute_script(EVENT_DETAILS_JS)
+    return (
+        ufc_parsers.build_fight_links(
+            [href for row_links in page["fightLinks"] for href in row_links], eventID
+        ),
+        ufc_parsers.build_event_details_frame(
+            page["rows"], page["title"], page["links"], page["fightLinks"]
+        ),
+    )
+
+
+@metrics.stage("extract")
+def extract_fight_page(driver):
+    page = driver.execute_script(FIGHT_PAGE_JS)
+    if not page["totals"] or not page["sig"]:
+        raise ValueError("Fight stats tables not found on page")
+
+    fight_details = ufc_parsers.build_stats_frame(
+        page["totals"],
+        ufc_schema.FIGHT_DETAILS_SCHEMA,
+        page["title"],
+        page["totalsLinks"],
+    )
+    significant_strikes = ufc_parsers.build_stats_frame(
+        page["sig"],
+        ufc_schema.SIGNIFICANT_STRIKES_SCHEMA,
+        page["title"],
+        page["sigLinks"],
+    )
+    return fight_details, significant_strikes
+
+
+@metrics.stage("extract")
+def extract_fighter_profile(driver):
+    page = driver.execute_script(FIGHTER_PROFILE_JS)
+    if not page["name"]:
+        raise ValueError("Fighter name not found on page")
+    return ufc_parsers.build_fighter_profile(page["name"], page["info"])
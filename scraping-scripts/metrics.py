@@ -0,0 +1,302 @@
+import functools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# Pipeline stages, in page order
+STAGES = ["fetch", "wait", "extract", "transform", "write"]
+
+# Upper bounds in seconds; the last bucket (+Inf) is implicit
+BUCKETS = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30]
+
+COUNTER_HELP = {
+    "pages_total": "Pages scraped and handed to the writer.",
+    "retries_total": "Fetch attempts retried after a transient error.",
+    "failures_total": "Pages given up on and dead-lettered.",
+    "unchanged_total": "Fight pages not rewritten because their content hash matched.",
+}
+
+PREFIX = "ufc_scrape_"
+
+
+def empty_histogram():
+    return {"buckets": [0] * (len(BUCKETS) + 1), "sum": 0.0, "count": 0}
+
+
+class Registry:
+    """
+    Thread-safe store of per-stage latency histograms, counters and
+    in-flight gauges for one process.
+
+    Stage timings are exclusive: when stages nest (a parse that builds a
+    DataFrame), the outer stage records only its own time, so the stage
+    totals add up to the wall time spent in the pipeline.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.started = time.time()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.histograms = {}
+            self.counters = {}
+            self.in_flight = {}
+
+    def observe(self, stage, seconds):
+        with self.lock:
+            histogram = self.histograms.setdefault(stage, empty_histogram())
+            index = next(
+                (i for i, bound in enumerate(BUCKETS) if seconds <= bound), len(BUCKETS)
+            )
+            histogram["buckets"][index] += 1
+            histogram["sum"] += seconds
+            histogram["count"] += 1
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def add_in_flight(self, stage, delta):
+        with self.lock:
+            self.in_flight[stage] = self.in_flight.get(stage, 0) + delta
+
+    def timed(self, stage):
+        return StageTimer(self, stage)
+
+    def snapshot(self, reset=False):
+        """
+        Returns the histograms and counters as plain values, e.g. to send
+        from a worker process to the parent's registry.
+        """
+        with self.lock:
+            state = {
+                "histograms": {
+                    stage: {
+                        "buckets": list(h["buckets"]),
+                        "sum": h["sum"],
+                        "count": h["count"],
+                    }
+                    for stage, h in self.histograms.items()
+                },
+                "counters": list(self.counters.items()),
+            }
+            if reset:
+                self.histograms = {}
+                self.counters = {}
+        return state
+
+    def merge(self, state):
+        with self.lock:
+            for stage, other in state["histograms"].items():
+                histogram = self.histograms.setdefault(stage, empty_histogram())
+                histogram["buckets"] = [
+                    a + b for a, b in zip(histogram["buckets"], other["buckets"])
+                ]
+                histogram["sum"] += other["sum"]
+                histogram["count"] += other["count"]
+            for key, value in state["counters"]:
+                key = (key[0], tuple(tuple(label) for label in key[1]))
+                self.counters[key] = self.counters.get(key, 0) + value
+
+    def prometheus_text(self):
+        """
+        Renders every metric in the Prometheus text exposition format.
+        """
+        state = self.snapshot()
+        with self.lock:
+            in_flight = dict(self.in_flight)
+
+        lines = [
+            f"# HELP {PREFIX}stage_seconds Time spent in each pipeline stage, "
+            "excluding nested stages.",
+            f"# TYPE {PREFIX}stage_seconds histogram",
+        ]
+        for stage, histogram in sorted(state["histograms"].items()):
+            cumulative = 0
+            for bound, count in zip(BUCKETS + ["+Inf"], histogram["buckets"]):
+                cumulative += count
+                lines.append(
+                    f'{PREFIX}stage_seconds_bucket{{stage="{stage}",le="{bound}"}} '
+                    f"{cumulative}"
+                )
+            lines.append(
+                f'{PREFIX}stage_seconds_sum{{stage="{stage}"}} {histogram["sum"]:.6f}'
+            )
+            lines.append(
+                f'{PREFIX}stage_seconds_count{{stage="{stage}"}} {histogram["count"]}'
+            )
+
+        for name, help_text in COUNTER_HELP.items():
+            lines.append(f"# HELP {PREFIX}{name} {help_text}")
+            lines.append(f"# TYPE {PREFIX}{name} counter")
+            for (counter, labels), value in sorted(state["counters"]):
+                if counter == name:
+                    lines.append(f"{PREFIX}{name}{format_labels(labels)} {value}")
+
+        lines.append(f"# HELP {PREFIX}in_flight Operations currently in each stage.")
+        lines.append(f"# TYPE {PREFIX}in_flight gauge")
+        for stage in STAGES:
+            count = in_flight.get(stage, 0)
+            lines.append(f'{PREFIX}in_flight{{stage="{stage}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        """
+        Returns an end-of-run summary: per-stage totals and percentiles plus
+        every counter.
+        """
+        state = self.snapshot()
+        total = sum(h["sum"] for h in state["histograms"].values()) or 1.0
+        stages = {}
+        for stage in STAGES + sorted(set(state["histograms"]) - set(STAGES)):
+            histogram = state["histograms"].get(stage)
+            if histogram is None or histogram["count"] == 0:
+                continue
+            stages[stage] = {
+                "count": histogram["count"],
+                "total_seconds": round(histogram["sum"], 3),
+                "share_of_time": round(histogram["sum"] / total, 3),
+                "mean_ms": round(1000 * histogram["sum"] / histogram["count"], 3),
+                "p50_ms": round(1000 * bucket_quantile(histogram, 0.5), 3),
+                "p99_ms": round(1000 * bucket_quantile(histogram, 0.99), 3),
+            }
+        return {
+            "elapsed_seconds": round(time.time() - self.started, 3),
+            "stages": stages,
+            "counters": {
+                name + format_labels(labels): value
+                for (name, labels), value in sorted(state["counters"])
+            },
+        }
+
+
+class StageTimer:
+    def __init__(self, registry, stage):
+        self.registry = registry
+        self.stage = stage
+
+    def __enter__(self):
+        stack = getattr(self.registry.local, "stack", None)
+        if stack is None:
+            stack = self.registry.local.stack = []
+        # [start, time spent in nested stages]
+        self.frame = [time.perf_counter(), 0.0]
+        stack.append(self.frame)
+        self.registry.add_in_flight(self.stage, 1)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        stack = self.registry.local.stack
+        stack.pop()
+        elapsed = time.perf_counter() - self.frame[0]
+        if stack:
+            stack[-1][1] += elapsed
+        self.registry.add_in_flight(self.stage, -1)
+        self.registry.observe(self.stage, elapsed - self.frame[1])
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+
+def bucket_quantile(histogram, q):
+    # Linear interpolation inside the bucket holding the quantile, the same
+    # estimate Prometheus' histogram_quantile() makes
+    rank = q * histogram["count"]
+    cumulative = 0
+    lower = 0.0
+    for bound, count in zip(BUCKETS + [None], histogram["buckets"]):
+        if count and cumulative + count >= rank:
+            if bound is None:
+                return lower
+            return lower + (bound - lower) * (rank - cumulative) / count
+        cumulative += count
+        lower = bound if bound is not None else lower
+    return lower
+
+
+REGISTRY = Registry()
+
+
+def timed(stage):
+    """
+    Context manager timing a block as one pipeline stage.
+    """
+    return REGISTRY.timed(stage)
+
+
+def stage(name):
+    """
+    Decorator timing every call of a function as one pipeline stage.
+    """
+
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with REGISTRY.timed(name):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def inc(name, value=1, **labels):
+    REGISTRY.inc(name, value, **labels)
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        if path == "/metrics":
+            body = REGISTRY.prometheus_text().encode()
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+        elif path == "/summary":
+            body = json.dumps(REGISTRY.summary(), indent=2).encode()
+            content_type = "application/json"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(port, host="0.0.0.0"):
+    """
+    Serves /metrics (Prometheus text format) and /summary (JSON) from a
+    background thread.
+
+    Returns:
+    ThreadingHTTPServer: Call shutdown() when finished.
+    """
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Serving metrics on http://{host}:{server.server_address[1]}/metrics")
+    return server
+
+
+def write_summary(path=None):
+    """
+    Writes the end-of-run JSON summary to path, or prints it.
+    """
+    summary = json.dumps(REGISTRY.summary(), indent=2)
+    if path:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(summary + "\n")
+        print(f"Wrote metrics summary to {path}")
+    else:
+        print(summary)
@@ -0,0 +1,700 @@
+import argparse
+
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.exc import IntegrityError
+
+import db_writer
+import fighter_career
+
+
+# Applied versions are recorded here; each migration runs exactly once
+CREATE_SCHEMA_VERSION = text(
+    """
+    CREATE TABLE IF NOT EXISTS Schema_Version (
+        version INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+)
+
+RECORD_VERSION = text(
+    "INSERT INTO Schema_Version (version, name) VALUES (:version, :name)"
+)
+
+CREATE_ALL_CARDS = """
+    CREATE TABLE {table} (
+        card_link TEXT PRIMARY KEY,
+        title TEXT,
+        date DATETIME,
+        location TEXT,
+        eventID INTEGER,
+        details_scraped BOOLEAN DEFAULT FALSE
+    )
+"""
+
+CREATE_ALL_FIGHTS = """
+    CREATE TABLE {table} (
+        fight_link TEXT PRIMARY KEY,
+        card_link TEXT REFERENCES All_Cards (card_link),
+        eventID INTEGER,
+        details_scraped BOOLEAN DEFAULT FALSE
+    )
+"""
+
+# Duplicate links collapse into one row, which counts as scraped if any
+# copy was
+COPY_ALL_CARDS = """
+    INSERT INTO {table} (card_link, title, date, location, eventID, details_scraped)
+    SELECT card_link, MAX(title), MAX(date), MAX(location), MAX(eventID),
+           COALESCE(MAX({details_scraped}), FALSE)
+    FROM All_Cards
+    WHERE card_link IS NOT NULL
+    GROUP BY card_link
+"""
+
+# Fights only stored their eventID; the card link is looked up from it
+COPY_ALL_FIGHTS = """
+    INSERT INTO {table} (fight_link, card_link, eventID, details_scraped)
+    SELECT f.fight_link, MAX(c.card_link), MAX(f.eventID),
+           COALESCE(MAX(f.{details_scraped}), FALSE)
+    FROM All_Fights f
+    LEFT JOIN All_Cards c ON c.eventID = f.eventID
+    WHERE f.fight_link IS NOT NULL
+    GROUP BY f.fight_link
+"""
+
+# Fight detail rows point back at their fight page
+FIGHT_LINK_REFERENCE = "REFERENCES All_Fights (fight_link)"
+
+# The typed detail-table columns as migration 2 created them. Migrations keep
+# their own copy of every definition, so what an old migration builds never
+# changes with later code
+DETAIL_COLUMNS_V2 = {
+    "Event_Details": {
+        "WIN": "TEXT",
+        "FIGHTER": "TEXT",
+        "KD": "SMALLINT",
+        "STR": "SMALLINT",
+        "TD": "SMALLINT",
+        "SUB": "SMALLINT",
+        "WEIGHT_CLASS": "TEXT",
+        "METHOD": "TEXT",
+        "ROUND": "SMALLINT",
+        "TIME_SECONDS": "SMALLINT",
+        "EVENT_TITLE": "TEXT",
+    },
+    "Fight_Details": {
+        "FIGHT_LINK": "TEXT",
+        "FIGHTER": "TEXT",
+        "KD": "SMALLINT",
+        "SIG_STR_SUCCESSFUL": "SMALLINT",
+        "SIG_STR_ATTEMPTS": "SMALLINT",
+        "SIG_STR_PCT": "REAL",
+        "TOTAL_STR_SUCCESSFUL": "SMALLINT",
+        "TOTAL_STR_ATTEMPTS": "SMALLINT",
+        "TD_SUCCESSFUL": "SMALLINT",
+        "TD_ATTEMPTS": "SMALLINT",
+        "TD_PCT": "REAL",
+        "SUB_ATT": "SMALLINT",
+        "REV": "SMALLINT",
+        "CTRL_SECONDS": "SMALLINT",
+        "EVENT_TITLE": "TEXT",
+    },
+    "Significant_Strikes": {
+        "FIGHT_LINK": "TEXT",
+        "FIGHTER": "TEXT",
+        "SIG_STR_SUCCESSFUL": "SMALLINT",
+        "SIG_STR_ATTEMPTS": "SMALLINT",
+        "SIG_STR_PCT": "REAL",
+        "HEAD_SUCCESSFUL": "SMALLINT",
+        "HEAD_ATTEMPTS": "SMALLINT",
+        "BODY_SUCCESSFUL": "SMALLINT",
+        "BODY_ATTEMPTS": "SMALLINT",
+        "LEG_SUCCESSFUL": "SMALLINT",
+        "LEG_ATTEMPTS": "SMALLINT",
+        "DISTANCE_SUCCESSFUL": "SMALLINT",
+        "DISTANCE_ATTEMPTS": "SMALLINT",
+        "CLINCH_SUCCESSFUL": "SMALLINT",
+        "CLINCH_ATTEMPTS": "SMALLINT",
+        "GROUND_SUCCESSFUL": "SMALLINT",
+        "GROUND_ATTEMPTS": "SMALLINT",
+        "EVENT_TITLE": "TEXT",
+    },
+}
+
+# Tables that had a FIGHT_LINK column as of migration 2
+FIGHT_LINK_TABLES_V2 = ["Fight_Details", "Significant_Strikes"]
+
+# Tables given a FIGHTER_ID column by migration 5
+FIGHTER_ID_TABLES_V5 = ["Event_Details", "Fight_Details", "Significant_Strikes"]
+
+# One row per ufcstats fighter-details page. fighter_id is SQLite's rowid
+# (INTEGER PRIMARY KEY), so detail rows refer to a fighter by a small integer
+# instead of a name and new fighters are numbered without a sequence
+CREATE_FIGHTERS = """
+    CREATE TABLE IF NOT EXISTS Fighters (
+        fighter_id INTEGER PRIMARY KEY,
+        fighter_link TEXT NOT NULL UNIQUE,
+        name TEXT,
+        height_inches REAL,
+        reach_inches REAL,
+        stance TEXT,
+        dob DATE,
+        profile_scraped BOOLEAN DEFAULT FALSE
+    )
+"""
+
+CREATE_FIGHTER_CAREER_V6 = """
+    CREATE TABLE IF NOT EXISTS Fighter_Career (
+        fighter_id INTEGER PRIMARY KEY REFERENCES Fighters (fighter_id),
+        fights SMALLINT,
+        wins SMALLINT,
+        losses SMALLINT,
+        other_results SMALLINT,
+        wins_ko_tko SMALLINT,
+        wins_submission SMALLINT,
+        wins_decision SMALLINT,
+        losses_ko_tko SMALLINT,
+        losses_submission SMALLINT,
+        losses_decision SMALLINT,
+        fight_seconds INTEGER,
+        knockdowns SMALLINT,
+        sig_strikes_landed INTEGER,
+        sig_strikes_attempted INTEGER,
+        sig_strikes_absorbed INTEGER,
+        sig_strikes_faced INTEGER,
+        total_strikes_landed INTEGER,
+        total_strikes_attempted INTEGER,
+        takedowns_landed SMALLINT,
+        takedowns_attempted SMALLINT,
+        takedowns_allowed SMALLINT,
+        takedowns_faced SMALLINT,
+        submission_attempts SMALLINT,
+        reversals SMALLINT,
+        control_seconds INTEGER,
+        head_landed INTEGER,
+        body_landed INTEGER,
+        leg_landed INTEGER,
+        distance_landed INTEGER,
+        clinch_landed INTEGER,
+        ground_landed INTEGER,
+        sig_strikes_landed_per_min REAL,
+        sig_strikes_absorbed_per_min REAL,
+        takedowns_per_15_min REAL,
+        submission_attempts_per_15_min REAL,
+        sig_strike_accuracy REAL,
+        takedown_accuracy REAL,
+        sig_strike_defense REAL,
+        takedown_defense REAL,
+        recent_fights SMALLINT,
+        recent_win_rate REAL,
+        recent_avg_knockdowns REAL,
+        recent_avg_sig_strikes_landed REAL,
+        recent_avg_sig_strikes_absorbed REAL,
+        recent_avg_takedowns_landed REAL,
+        recent_avg_control_seconds REAL,
+        recent_sig_strikes_landed_per_min REAL,
+        recent_sig_strikes_absorbed_per_min REAL,
+        recent_sig_strike_accuracy REAL,
+        last_fight_date DATE,
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+INDEXES = [
+    # Partial indexes hold only the pages still to scrape, so the
+    # "details_scraped IS NOT TRUE" lookups read a few rows, not the table
+    "CREATE INDEX IF NOT EXISTS ix_all_cards_unscraped ON All_Cards (card_link) "
+    "WHERE details_scraped IS NOT TRUE",
+    "CREATE INDEX IF NOT EXISTS ix_all_fights_unscraped ON All_Fights (fight_link) "
+    "WHERE details_scraped IS NOT TRUE",
+    "CREATE INDEX IF NOT EXISTS ix_all_cards_event_id ON All_Cards (eventID)",
+    "CREATE INDEX IF NOT EXISTS ix_all_cards_title ON All_Cards (title)",
+    "CREATE INDEX IF NOT EXISTS ix_all_cards_date ON All_Cards (date)",
+    "CREATE INDEX IF NOT EXISTS ix_all_fights_card_link ON All_Fights (card_link)",
+    "CREATE INDEX IF NOT EXISTS ix_all_fights_event_id ON All_Fights (eventID)",
+    "CREATE INDEX IF NOT EXISTS ix_fight_details_fight_link "
+    'ON Fight_Details ("FIGHT_LINK")',
+    'CREATE INDEX IF NOT EXISTS ix_fight_details_fighter ON Fight_Details ("FIGHTER")',
+    "CREATE INDEX IF NOT EXISTS ix_significant_strikes_fight_link "
+    'ON Significant_Strikes ("FIGHT_LINK")',
+    "CREATE INDEX IF NOT EXISTS ix_significant_strikes_fighter "
+    'ON Significant_Strikes ("FIGHTER")',
+    'CREATE INDEX IF NOT EXISTS ix_event_details_fighter ON Event_Details ("FIGHTER")',
+    "CREATE INDEX IF NOT EXISTS ix_event_details_event_title "
+    'ON Event_Details ("EVENT_TITLE")',
+]
+
+
+def column_names(conn, table):
+    return {c["name"].upper() for c in inspect(conn).get_columns(table)}
+
+
+def rebuild_table(conn, table, create_sql, copy_sql):
+    """
+    Recreates a table with a new definition and copies its rows across,
+    since SQLite can't add keys or constraints to an existing table.
+
+    The new table is built under a temporary name and renamed into place, so
+    foreign keys elsewhere that name this table keep pointing at it.
+    """
+    if table not in inspect(conn).get_table_names():
+        conn.execute(text(create_sql.format(table=table)))
+        return
+
+    new_table = f"{table}__new"
+    details_scraped = (
+        "details_scraped" if "DETAILS_SCRAPED" in column_names(conn, table) else "NULL"
+    )
+    conn.execute(text(create_sql.format(table=new_table)))
+    conn.execute(
+        text(copy_sql.format(table=new_table, details_scraped=details_scraped))
+    )
+    conn.execute(text(f"DROP TABLE {table}"))
+    conn.execute(text(f"ALTER TABLE {new_table} RENAME TO {table}"))
+
+
+def link_primary_keys(conn):
+    # All_Cards first: All_Fights' new foreign key refers to it
+    rebuild_table(conn, "All_Cards", CREATE_ALL_CARDS, COPY_ALL_CARDS)
+    rebuild_table(conn, "All_Fights", CREATE_ALL_FIGHTS, COPY_ALL_FIGHTS)
+
+
+def detail_fight_links(conn):
+    # Rows written before this migration can't be traced to a fight and keep
+    # a NULL FIGHT_LINK; BufferedWriter fills it in for every new page
+    existing = set(inspect(conn).get_table_names())
+    for table, columns in DETAIL_COLUMNS_V2.items():
+        if table not in existing:
+            columns = {
+                column: f"{sql_type} {FIGHT_LINK_REFERENCE}"
+                if column == "FIGHT_LINK"
+                else sql_type
+                for column, sql_type in columns.items()
+            }
+            column_defs = ", ".join(f'"{c}" {t}' for c, t in columns.items())
+            conn.execute(text(f'CREATE TABLE "{table}" ({column_defs})'))
+        elif table in FIGHT_LINK_TABLES_V2:
+            if "FIGHT_LINK" not in column_names(conn, table):
+                conn.execute(
+                    text(
+                        f'ALTER TABLE "{table}" ADD COLUMN "FIGHT_LINK" TEXT '
+                        f"{FIGHT_LINK_REFERENCE}"
+                    )
+                )
+
+
+def lookup_indexes(conn):
+    for statement in INDEXES:
+        conn.execute(text(statement))
+
+
+def fight_upsert_keys(conn):
+    if "CONTENT_HASH" not in column_names(conn, "All_Fights"):
+        conn.execute(text("ALTER TABLE All_Fights ADD COLUMN content_hash TEXT"))
+
+    for table in FIGHT_LINK_TABLES_V2:
+        # Every earlier run appended another copy of each fight; keep the
+        # newest row per fight and fighter. SQLite's rowid orders the copies
+        # by insertion
+        conn.execute(
+            text(
+                f"""
+                DELETE FROM "{table}" WHERE "FIGHT_LINK" IS NOT NULL
+                AND rowid NOT IN (
+                    SELECT MAX(rowid) FROM "{table}"
+                    WHERE "FIGHT_LINK" IS NOT NULL
+                    GROUP BY "FIGHT_LINK", "FIGHTER"
+                )
+                """
+            )
+        )
+        # Rows from before FIGHT_LINK existed only know their event, and in
+        # the early tournaments a fighter fought several times on one card, so
+        # only exact copies of those go
+        columns = ", ".join(f'"{c["name"]}"' for c in inspect(conn).get_columns(table))
+        conn.execute(
+            text(
+                f"""
+                DELETE FROM "{table}" WHERE "FIGHT_LINK" IS NULL
+                AND rowid NOT IN (
+                    SELECT MAX(rowid) FROM "{table}"
+                    WHERE "FIGHT_LINK" IS NULL
+                    GROUP BY {columns}
+                )
+                """
+            )
+        )
+        index = table.lower()
+        conn.execute(
+            text(
+                f"CREATE UNIQUE INDEX IF NOT EXISTS ux_{index}_fight_fighter "
+                f'ON "{table}" ("FIGHT_LINK", "FIGHTER")'
+            )
+        )
+        # Covered by the leading column of the unique index
+        conn.execute(text(f"DROP INDEX IF EXISTS ix_{index}_fight_link"))
+
+
+def fighter_ids(conn):
+    conn.execute(text(CREATE_FIGHTERS))
+    conn.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_fighters_unscraped ON Fighters "
+            "(fighter_link) WHERE profile_scraped IS NOT TRUE"
+        )
+    )
+    # Rows stored before this only know the fighter's name and keep a NULL
+    # FIGHTER_ID until their fight is scraped again
+    for table in FIGHTER_ID_TABLES_V5:
+        if "FIGHTER_ID" not in column_names(conn, table):
+            conn.execute(
+                text(
+                    f'ALTER TABLE "{table}" ADD COLUMN "FIGHTER_ID" INTEGER '
+                    "REFERENCES Fighters (fighter_id)"
+                )
+            )
+        conn.execute(
+            text(
+                f"CREATE INDEX IF NOT EXISTS ix_{table.lower()}_fighter_id "
+                f'ON "{table}" ("FIGHTER_ID")'
+            )
+        )
+
+
+def fighter_career_table(conn):
+    # The aggregates read the typed stat columns, which tables created before
+    # typed parsing only get on their next write
+    existing = set(inspect(conn).get_table_names())
+    for table, columns in DETAIL_COLUMNS_V2.items():
+        if table not in existing:
+            continue
+        present = column_names(conn, table)
+        for column, sql_type in columns.items():
+            if column.upper() not in present:
+                conn.execute(
+                    text(f'ALTER TABLE "{table}" ADD COLUMN "{column}" {sql_type}')
+                )
+    # Filled by migrate() once the whole schema is current
+    conn.execute(text(CREATE_FIGHTER_CAREER_V6))
+
+
+def data_version(conn):
+    conn.execute(
+        text(
+            """
+            CREATE TABLE IF NOT EXISTS Data_Version (
+                name TEXT PRIMARY KEY,
+                version INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+    )
+    conn.execute(
+        text(
+            "INSERT INTO Data_Version (name, version) VALUES ('Fighter_Career', 0) "
+            "ON CONFLICT (name) DO NOTHING"
+        )
+    )
+
+
+def event_detail_upsert_keys(conn):
+    # Migration 2 created Event_Details without a fight link
+    if "FIGHT_LINK" not in column_names(conn, "Event_Details"):
+        conn.execute(
+            text(
+                'ALTER TABLE "Event_Details" ADD COLUMN "FIGHT_LINK" TEXT '
+                f"{FIGHT_LINK_REFERENCE}"
+            )
+        )
+
+    # Every crawl of an event appended another copy of its rows. Only exact
+    # copies go: in the early tournaments a fighter fought several times on
+    # one card, so (EVENT_TITLE, FIGHTER) is not unique
+    columns = ", ".join(
+        f'"{c["name"]}"' for c in inspect(conn).get_columns("Event_Details")
+    )
+    conn.execute(
+        text(
+            f"""
+            DELETE FROM "Event_Details" WHERE rowid NOT IN (
+                SELECT MAX(rowid) FROM "Event_Details" GROUP BY {columns}
+            )
+            """
+        )
+    )
+    # Older rows take the link of their fight where that is unambiguous: the
+    # fighter has one row on the event and one scraped fight page for it
+    conn.execute(
+        text(
+            """
+            UPDATE "Event_Details" SET "FIGHT_LINK" = (
+                SELECT MAX(f."FIGHT_LINK") FROM "Fight_Details" f
+                WHERE f."EVENT_TITLE" = "Event_Details"."EVENT_TITLE"
+                AND f."FIGHTER" = "Event_Details"."FIGHTER"
+                HAVING COUNT(DISTINCT f."FIGHT_LINK") = 1
+            )
+            WHERE "FIGHT_LINK" IS NULL AND (
+                SELECT COUNT(*) FROM "Event_Details" e
+                WHERE e."EVENT_TITLE" = "Event_Details"."EVENT_TITLE"
+                AND e."FIGHTER" = "Event_Details"."FIGHTER"
+            ) = 1
+            """
+        )
+    )
+    conn.execute(
+        text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS ux_event_details_fight_fighter "
+            'ON "Event_Details" ("FIGHT_LINK", "FIGHTER")'
+        )
+    )
+
+
+def rescrape_event_results(conn):
+    # Draws used to be stored as a WIN and a LOSS, and the stored rows can't
+    # tell them apart from real results. Every event page is crawled again on
+    # the next run; its rows are upserted with the corrected result and the
+    # careers of its fighters re-aggregated
+    conn.execute(text("UPDATE All_Cards SET details_scraped = FALSE"))
+    if "Work_Queue" in inspect(conn).get_table_names():
+        conn.execute(text("DELETE FROM Work_Queue WHERE page_type = 'event'"))
+
+
+# Columns the legacy tables and the typed writer share a name for. They were
+# created as TEXT/VARCHAR, so SQLite kept the writer's numbers as strings
+# next to the legacy "51%"; migration 10 gives them these types
+NUMERIC_COLUMNS_V10 = {
+    "Event_Details": {
+        "KD": "SMALLINT",
+        "STR": "SMALLINT",
+        "TD": "SMALLINT",
+        "SUB": "SMALLINT",
+        "ROUND": "SMALLINT",
+    },
+    "Fight_Details": {
+        "KD": "SMALLINT",
+        "SIG_STR_PCT": "REAL",
+        "TD_PCT": "REAL",
+        "SUB_ATT": "SMALLINT",
+        "REV": "SMALLINT",
+    },
+    "Significant_Strikes": {"SIG_STR_PCT": "REAL"},
+}
+
+# Legacy raw text columns and the typed columns parsed out of them
+RAW_COLUMNS_V10 = {
+    "Event_Details": {"TIME": "seconds"},
+    "Fight_Details": {
+        "SIG_STR": "landed_of_attempted",
+        "TOTAL_STR": "landed_of_attempted",
+        "TD": "landed_of_attempted",
+        "CTRL": "seconds",
+    },
+    "Significant_Strikes": {
+        "SIG_STR": "landed_of_attempted",
+        "HEAD": "landed_of_attempted",
+        "BODY": "landed_of_attempted",
+        "LEG": "landed_of_attempted",
+        "DISTANCE": "landed_of_attempted",
+        "CLINCH": "landed_of_attempted",
+        "GROUND": "landed_of_attempted",
+    },
+}
+
+COLUMN_REFERENCES_V10 = {
+    "FIGHT_LINK": FIGHT_LINK_REFERENCE,
+    "FIGHTER_ID": "REFERENCES Fighters (fighter_id)",
+}
+
+
+def count_sql(column):
+    # Whole numbers only; "---" and empty cells become NULL
+    value = f'trim("{column}")'
+    return (
+        f"CASE WHEN {value} <> '' AND {value} NOT GLOB '*[^0-9]*' "
+        f"THEN CAST({value} AS INTEGER) END"
+    )
+
+
+def percent_sql(column):
+    # "51%" from the legacy scrape and "51.0" from the writer are both 51.0
+    value = f"""rtrim(trim("{column}"), '%')"""
+    return (
+        f"CASE WHEN {value} <> '' AND {value} NOT GLOB '*[^0-9.]*' "
+        f"THEN CAST({value} AS REAL) END"
+    )
+
+
+def raw_value_sql(column, kind):
+    """
+    Returns {typed column: SQL expression} parsing a legacy raw text column,
+    the same way ufc_schema types it at parse time.
+    """
+    if kind == "seconds":
+        colon = f"""instr("{column}", ':')"""
+        return {
+            f"{column}_SECONDS": (
+                f"CASE WHEN {colon} > 0 "
+                f'THEN CAST(substr("{column}", 1, {colon} - 1) AS INTEGER) * 60 '
+                f'+ CAST(substr("{column}", {colon} + 1) AS INTEGER) END'
+            )
+        }
+    sep = f"""instr(upper("{column}"), ' OF ')"""
+    return {
+        f"{column}_SUCCESSFUL": (
+            f"CASE WHEN {sep} > 0 "
+            f'THEN CAST(trim(substr("{column}", 1, {sep} - 1)) AS INTEGER) END'
+        ),
+        f"{column}_ATTEMPTS": (
+            f"CASE WHEN {sep} > 0 "
+            f'THEN CAST(trim(substr("{column}", {sep} + 4)) AS INTEGER) END'
+        ),
+    }
+
+
+def numeric_detail_columns(conn):
+    for table, numeric_types in NUMERIC_COLUMNS_V10.items():
+        existing = inspect(conn).get_columns(table)
+        columns = [c["name"] for c in existing]
+        types = {c["name"]: str(c["type"]) for c in existing}
+
+        values = {}
+        for column, sql_type in numeric_types.items():
+            types[column] = sql_type
+            if sql_type == "REAL":
+                values[column] = percent_sql(column)
+            else:
+                values[column] = count_sql(column)
+        # Rows with raw text are legacy rows; their typed columns are parsed
+        # from it again, replacing the zeros earlier splits stored. Rows from
+        # the writer have no raw text and keep their typed values
+        for raw, kind in RAW_COLUMNS_V10[table].items():
+            if raw not in types:
+                continue
+            for typed, expression in raw_value_sql(raw, kind).items():
+                if typed in types:
+                    values[typed] = (
+                        f'CASE WHEN "{raw}" IS NOT NULL THEN {expression} '
+                        f'ELSE "{typed}" END'
+                    )
+
+        # SQLite can't change a column's type, so the table is rebuilt and
+        # its indexes created again
+        index_sql = [
+            row.sql
+            for row in conn.execute(
+                text(
+                    "SELECT sql FROM sqlite_master WHERE type = 'index' "
+                    "AND tbl_name = :table AND sql IS NOT NULL"
+                ),
+                {"table": table},
+            )
+        ]
+        column_defs = ", ".join(
+            " ".join(
+                [f'"{column}"', types[column], COLUMN_REFERENCES_V10.get(column, "")]
+            ).strip()
+            for column in columns
+        )
+        select_list = ", ".join(values.get(column, f'"{column}"') for column in columns)
+        column_list = ", ".join(f'"{column}"' for column in columns)
+        new_table = f"{table}__new"
+        conn.execute(text(f'CREATE TABLE "{new_table}" ({column_defs})'))
+        conn.execute(
+            text(
+                f'INSERT INTO "{new_table}" ({column_list}) '
+                f'SELECT {select_list} FROM "{table}"'
+            )
+        )
+        conn.execute(text(f'DROP TABLE "{table}"'))
+        conn.execute(text(f'ALTER TABLE "{new_table}" RENAME TO "{table}"'))
+        for statement in index_sql:
+            conn.execute(text(statement))
+
+
+# (version, name, function); append new migrations, never reorder or edit
+MIGRATIONS = [
+    (1, "link_primary_keys", link_primary_keys),
+    (2, "detail_fight_links", detail_fight_links),
+    (3, "lookup_indexes", lookup_indexes),
+    (4, "fight_upsert_keys", fight_upsert_keys),
+    (5, "fighter_ids", fighter_ids),
+    (6, "fighter_career", fighter_career_table),
+    (7, "data_version", data_version),
+    (8, "event_detail_upsert_keys", event_detail_upsert_keys),
+    (9, "rescrape_event_results", rescrape_event_results),
+    (10, "numeric_detail_columns", numeric_detail_columns),
+]
+
+# Migrations after which Fighter_Career is rebuilt from the stored fights.
+# The rebuild runs the current aggregation code, so it waits until every
+# migration has been applied
+CAREER_REBUILD_VERSIONS = {6, 9, 10}
+
+
+def applied_versions(engine):
+    with engine.begin() as conn:
+        conn.execute(CREATE_SCHEMA_VERSION)
+        rows = conn.execute(text("SELECT version AS version FROM Schema_Version"))
+        return {row.version for row in rows}
+
+
+def migrate(engine, target=None):
+    """
+    Brings the database schema up to date.
+
+    The migrations are written for SQLite: they rely on rowid, on INTEGER
+    PRIMARY KEY numbering rows, and on rebuilding tables to add keys.
+
+    Each migration runs in its own transaction together with the row that
+    records it, so a failed migration leaves no trace and is retried on the
+    next run. Several scrapers starting at once are safe: the version row is
+    written first, so only one of them applies each migration.
+
+    Parameters:
+    engine: SQLAlchemy engine of the database.
+    target: Last version to apply, defaults to the newest.
+
+    Returns:
+    list: Versions applied by this call.
+    """
+    done = applied_versions(engine)
+    applied = []
+    for version, name, function in MIGRATIONS:
+        if version in done or (target is not None and version > target):
+            continue
+        with engine.begin() as conn:
+            try:
+                conn.execute(RECORD_VERSION, {"version": version, "name": name})
+            except IntegrityError:
+                # Another process applied it first
+                continue
+            function(conn)
+        print(f"Applied migration {version}: {name}")
+        applied.append(version)
+
+    if target is None and CAREER_REBUILD_VERSIONS.intersection(applied):
+        with engine.begin() as conn:
+            print(f"Rebuilt careers of {fighter_career.refresh(conn)} fighters")
+            fighter_career.mark_changed(conn)
+    return applied
+
+
+def current_version(engine):
+    return max(applied_versions(engine), default=0)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Upgrade the UFC database schema")
+    parser.add_argument("--db-url", default="sqlite:///UFC_Data.db")
+    parser.add_argument("--target", type=int, help="Stop after this version")
+    parser.add_argument(
+        "--status", action="store_true", help="Only print the current version"
+    )
+    args = parser.parse_args()
+
+    engine = db_writer.configure_sqlite(create_engine(args.db_url))
+    if not args.status:
+        migrate(engine, args.target)
+    print(f"Schema version {current_version(engine)} of {MIGRATIONS[-1][0]}")
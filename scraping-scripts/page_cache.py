@@ -0,0 +1,155 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+import zlib
+
+from ufc_http import http_get
+
+
+DEFAULT_CACHE_DIR = ".page_cache"
+
+# Seconds a cached page is served without revalidation, matched in order.
+# None means the page never expires.
+TTL_RULES = [
+    (re.compile(r"/fighter-details/"), 7 * 24 * 3600),
+    (re.compile(r"/statistics/events"), 3600),
+]
+DEFAULT_TTL = 3600
+
+# ufcstats corrects fight stats after the fact, on the same page; a stale copy
+# would hash the same and hide the correction from the upsert. Corrections come
+# in the weeks after an event, so only recent events' pages are revalidated and
+# older ones are served from the cache for good.
+EVENT_PAGE = re.compile(r"/(fight|event)-details/")
+RECENT_EVENT_TTL = 24 * 3600
+SETTLED_AFTER_DAYS = 30
+
+
+class CacheMissError(Exception):
+    pass
+
+
+def ttl_for(url, event_date=None):
+    """
+    Returns the seconds a page is fresh for, or None if it never expires.
+
+    Parameters:
+    url: Page URL.
+    event_date: Date of the event a fight or event page belongs to, if known.
+        Pages with no known date are treated as recent.
+    """
+    if EVENT_PAGE.search(url):
+        settled = event_date is not None and (
+            time.time() - event_date.timestamp() > SETTLED_AFTER_DAYS * 24 * 3600
+        )
+        return None if settled else RECENT_EVENT_TTL
+    for pattern, ttl in TTL_RULES:
+        if pattern.search(url):
+            return ttl
+    return DEFAULT_TTL
+
+
+def sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def atomic_write(path, data):
+    # Crawler threads share the cache, so never expose a half-written file
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class PageCache:
+    """
+    Compressed on-disk page cache keyed by URL.
+
+    Page bodies are stored once under the hash of their content, and a small
+    JSON entry per URL points at the body along with its ETag/Last-Modified
+    validators and fetch time.
+
+    event_dates maps fight and event page URLs to their event's date (a
+    datetime), which decides how long those pages stay fresh.
+    """
+
+    def __init__(
+        self, directory=DEFAULT_CACHE_DIR, replay_only=False, event_dates=None
+    ):
+        self.directory = directory
+        self.replay_only = replay_only
+        self.event_dates = event_dates or {}
+
+    def entry_path(self, url):
+        key = sha256(url.encode("utf-8"))
+        return os.path.join(self.directory, "urls", key[:2], f"{key}.json")
+
+    def body_path(self, content_hash):
+        return os.path.join(
+            self.directory, "bodies", content_hash[:2], f"{content_hash}.z"
+        )
+
+    def get_entry(self, url):
+        try:
+            with open(self.entry_path(url)) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def read_body(self, entry):
+        with open(self.body_path(entry["content_hash"]), "rb") as f:
+            return zlib.decompress(f.read())
+
+    def is_fresh(self, url, entry):
+        ttl = ttl_for(url, self.event_dates.get(url))
+        return ttl is None or time.time() - entry["fetched_at"] < ttl
+
+    def store(self, url, body, headers):
+        content_hash = sha256(body)
+        body_path = self.body_path(content_hash)
+        if not os.path.exists(body_path):
+            atomic_write(body_path, zlib.compress(body))
+
+        entry = {
+            "url": url,
+            "content_hash": content_hash,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "fetched_at": time.time(),
+        }
+        atomic_write(self.entry_path(url), json.dumps(entry).encode("utf-8"))
+
+    def touch(self, entry):
+        entry["fetched_at"] = time.time()
+        atomic_write(self.entry_path(entry["url"]), json.dumps(entry).encode("utf-8"))
+
+    def fetch(self, session, url, timeout=10):
+        """
+        Returns the page body, going to the network only when the cached copy
+        is missing or stale. Stale pages are revalidated with a conditional GET.
+        """
+        entry = self.get_entry(url)
+        if entry is not None and (self.replay_only or self.is_fresh(url, entry)):
+            return self.read_body(entry)
+        if self.replay_only:
+            raise CacheMissError(f"{url} is not in the page cache")
+
+        headers = {}
+        if entry is not None:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = http_get(session, url, timeout=timeout, headers=headers)
+        if response.status_code == 304 and entry is not None:
+            self.touch(entry)
+            return self.read_body(entry)
+
+        response.raise_for_status()
+        self.store(url, response.content, response.headers)
+        return response.content
@@ -0,0 +1,150 @@
+import argparse
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+from pyarrow import fs
+from sqlalchemy import create_engine
+
+
+DEFAULT_EXPORT_DIR = "parquet"
+PARTITION_COLUMNS = ["year", "month"]
+# Small enough that a month's file has several row groups whose min/max
+# statistics let readers skip the ones a filter can't match
+ROW_GROUP_SIZE = 10_000
+
+# One dataset per table, each carrying the date of the event it came from.
+# Detail tables only know their event by title, which is unique in All_Cards.
+EXPORT_QUERIES = {
+    "cards": """
+        SELECT card_link AS card_link, title AS title, date AS date,
+               location AS location, eventID AS eventID
+        FROM All_Cards
+    """,
+    "fights": """
+        SELECT f.fight_link AS fight_link, f.eventID AS eventID, c.date AS date
+        FROM All_Fights f
+        LEFT JOIN All_Cards c ON c.eventID = f.eventID
+    """,
+    "fight_details": """
+        SELECT d.*, c.date AS date
+        FROM Fight_Details d
+        LEFT JOIN All_Cards c ON c.title = d.EVENT_TITLE
+    """,
+    "significant_strikes": """
+        SELECT s.*, c.date AS date
+        FROM Significant_Strikes s
+        LEFT JOIN All_Cards c ON c.title = s.EVENT_TITLE
+    """,
+}
+
+
+def add_partition_columns(df, date_column="date"):
+    df = df.copy()
+    dates = pd.to_datetime(df[date_column])
+    df[date_column] = dates
+    df["year"] = dates.dt.year.astype("int16")
+    df["month"] = dates.dt.month.astype("int16")
+    return df
+
+
+def to_arrow(df):
+    # Old rows hold text where newer rows hold numbers; Arrow needs one type
+    # per column, so untyped object columns are written as strings
+    df = df.copy()
+    for column in df.columns:
+        if df[column].dtype == object:
+            df[column] = df[column].astype("string")
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def write_table(df, name, root=DEFAULT_EXPORT_DIR, date_column="date"):
+    """
+    Writes a frame as a Parquet dataset partitioned by event year/month.
+
+    Parameters:
+    df: Frame to write; it needs a column holding the event date.
+    name: Dataset name, written to <root>/<name>/year=YYYY/month=M/.
+    root: Export directory.
+    date_column: Column the partitions are derived from.
+
+    Returns:
+    int: Number of rows written.
+    """
+    df = df[df[date_column].notna()]
+    if df.empty:
+        return 0
+
+    df = add_partition_columns(df, date_column).sort_values(date_column)
+    ds.write_dataset(
+        to_arrow(df),
+        os.path.join(root, name),
+        format="parquet",
+        partitioning=PARTITION_COLUMNS,
+        partitioning_flavor="hive",
+        basename_template="part-{i}.parquet",
+        # Re-exporting replaces the months being written and keeps the rest
+        existing_data_behavior="delete_matching",
+        max_rows_per_group=ROW_GROUP_SIZE,
+        file_options=ds.ParquetFileFormat().make_write_options(
+            compression="zstd", write_statistics=True
+        ),
+    )
+    return len(df)
+
+
+def open_dataset(name, root=DEFAULT_EXPORT_DIR):
+    return ds.dataset(
+        os.path.join(root, name),
+        format="parquet",
+        partitioning="hive",
+        filesystem=fs.LocalFileSystem(use_mmap=True),
+    )
+
+
+def read_table(name, root=DEFAULT_EXPORT_DIR, columns=None, year=None, month=None):
+    """
+    Reads an exported dataset through memory-mapped files, loading only the
+    requested columns and partitions.
+
+    Parameters:
+    name: Dataset name, e.g. "significant_strikes".
+    root: Export directory.
+    columns: Columns to load; None loads every column.
+    year: Only load events from this year (one season).
+    month: Only load events from this month.
+
+    Returns:
+    pd.DataFrame: The matching rows.
+    """
+    expression = None
+    for field, value in (("year", year), ("month", month)):
+        if value is not None:
+            condition = ds.field(field) == value
+            expression = condition if expression is None else expression & condition
+
+    dataset = open_dataset(name, root)
+    return dataset.to_table(columns=columns, filter=expression).to_pandas()
+
+
+def export_database(engine, root=DEFAULT_EXPORT_DIR):
+    """
+    Exports cards, fights, fight details and significant strikes from the
+    database to Parquet datasets partitioned by event date.
+    """
+    for name, query in EXPORT_QUERIES.items():
+        df = pd.read_sql_query(query, engine)
+        written = write_table(df, name, root)
+        skipped = len(df) - written
+        print(f"Exported {written} rows to {os.path.join(root, name)}")
+        if skipped:
+            print(f"Skipped {skipped} {name} rows with no matching event date")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export UFC data to Parquet")
+    parser.add_argument("--db", default="UFC_Data.db")
+    parser.add_argument("--out", default=DEFAULT_EXPORT_DIR)
+    args = parser.parse_args()
+    export_database(create_engine(f"sqlite:///{args.db}"), args.out)
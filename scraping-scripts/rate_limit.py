@@ -0,0 +1,178 @@
+import collections
+import threading
+import time
+
+
+DEFAULT_INITIAL_RATE = 4.0  # requests per second
+DEFAULT_MIN_RATE = 0.5
+DEFAULT_MAX_RATE = 100.0
+DEFAULT_MAX_CONCURRENCY = 16
+
+# Until the first back-off the rate grows by 1 req/s per healthy response
+# (doubling about once a second, like TCP slow start). After that it grows
+# additively, by ~RATE_STEP req/s per second, and concurrency by one slot
+# per window of successes
+RATE_STEP = 4.0
+# Multiplicative decrease on 429s, timeouts, latency spikes and sustained 5xx
+BACKOFF_FACTOR = 0.5
+# Isolated 5xx responses are noise; back off only once they make up this
+# fraction of the last ERROR_WINDOW responses
+ERROR_TOLERANCE = 0.1
+ERROR_WINDOW = 20
+# A response slower than this multiple of the best observed latency (plus a
+# fixed slack, so millisecond jitter on fast links doesn't count) means the
+# site is starting to struggle
+LATENCY_TOLERANCE = 3.0
+LATENCY_SLACK = 0.1
+LATENCY_SMOOTHING = 0.2
+# Bucket capacity in seconds of the current rate; small, so requests are
+# spread evenly instead of arriving in bursts that trip per-second limits
+BURST_SECONDS = 0.25
+LOG_INTERVAL = 10.0
+
+SERVER_ERROR_STATUSES = {500, 502, 503, 504}
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket whose rate, together with the number of requests allowed in
+    flight, is tuned by additive-increase/multiplicative-decrease from what
+    the site returns: healthy responses raise both, while HTTP 429s, timeouts,
+    latency spikes or a run of 5xx errors halve them. The crawler settles
+    just under the highest rate the site tolerates.
+
+    Thread-safe; call acquire() before a request and record() after it.
+    """
+
+    def __init__(
+        self,
+        rate=DEFAULT_INITIAL_RATE,
+        min_rate=DEFAULT_MIN_RATE,
+        max_rate=DEFAULT_MAX_RATE,
+        max_concurrency=DEFAULT_MAX_CONCURRENCY,
+        log_interval=LOG_INTERVAL,
+    ):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.max_concurrency = max_concurrency
+        self.concurrency = min(max_concurrency, max(1.0, rate))
+        self.tokens = 1.0
+        self.in_flight = 0
+        self.last_refill = time.monotonic()
+        self.paused_until = 0.0
+        self.last_decrease = 0.0
+        self.slow_start = True
+        self.best_latency = None
+        self.smoothed_latency = None
+        self.log_interval = log_interval
+        self.last_log = time.monotonic()
+        self.requests = 0
+        self.throttled = 0
+        self.recent_errors = collections.deque(maxlen=ERROR_WINDOW)
+        self.condition = threading.Condition()
+
+    def refill(self, now):
+        elapsed = now - self.last_refill
+        capacity = max(1.0, self.rate * BURST_SECONDS)
+        self.tokens = min(capacity, self.tokens + elapsed * self.rate)
+        self.last_refill = now
+
+    def acquire(self):
+        with self.condition:
+            while True:
+                now = time.monotonic()
+                self.refill(now)
+                wait = 0.0
+                if now < self.paused_until:
+                    wait = self.paused_until - now
+                elif self.in_flight >= int(self.concurrency):
+                    wait = None  # woken by record()
+                elif self.tokens < 1.0:
+                    wait = (1.0 - self.tokens) / self.rate
+                else:
+                    self.tokens -= 1.0
+                    self.in_flight += 1
+                    return
+                self.condition.wait(wait)
+
+    def record(self, latency, status=None, retry_after=None):
+        """
+        Feeds back the outcome of one request.
+
+        Parameters:
+        latency: Seconds the request took.
+        status: HTTP status code, or None if the request timed out or failed to connect.
+        retry_after: Value of a Retry-After header, if the server sent one.
+        """
+        with self.condition:
+            self.in_flight -= 1
+            self.requests += 1
+            now = time.monotonic()
+
+            server_error = status in SERVER_ERROR_STATUSES
+            self.recent_errors.append(server_error)
+
+            if retry_after:
+                try:
+                    self.paused_until = max(self.paused_until, now + float(retry_after))
+                except ValueError:
+                    pass
+
+            if status is None or status == 429:
+                self.throttled += 1
+                self.decrease(now)
+            elif server_error:
+                self.throttled += 1
+                error_share = sum(self.recent_errors) / len(self.recent_errors)
+                if error_share > ERROR_TOLERANCE:
+                    self.decrease(now)
+            elif status < 400:
+                self.observe_latency(latency)
+                limit = self.best_latency * LATENCY_TOLERANCE + LATENCY_SLACK
+                if self.smoothed_latency > limit:
+                    self.decrease(now)
+                else:
+                    self.increase()
+
+            self.log(now)
+            self.condition.notify_all()
+
+    def observe_latency(self, latency):
+        if self.best_latency is None or latency < self.best_latency:
+            self.best_latency = max(latency, 0.001)
+        if self.smoothed_latency is None:
+            self.smoothed_latency = latency
+        else:
+            self.smoothed_latency += LATENCY_SMOOTHING * (latency - self.smoothed_latency)
+
+    def increase(self):
+        if self.slow_start:
+            self.rate = min(self.max_rate, self.rate + 1.0)
+            self.concurrency = min(self.max_concurrency, self.concurrency + 1.0)
+            return
+        self.rate = min(self.max_rate, self.rate + RATE_STEP / self.rate)
+        self.concurrency = min(
+            self.max_concurrency, self.concurrency + 1.0 / self.concurrency
+        )
+
+    def decrease(self, now):
+        # One back-off per round of in-flight requests, so a burst of errors
+        # from the same overload doesn't collapse the rate to the floor
+        cooldown = max(1.0, self.smoothed_latency or 0.0)
+        if now - self.last_decrease < cooldown:
+            return
+        self.last_decrease = now
+        self.slow_start = False
+        self.rate = max(self.min_rate, self.rate * BACKOFF_FACTOR)
+        self.concurrency = max(1.0, self.concurrency * BACKOFF_FACTOR)
+        self.tokens = min(self.tokens, 1.0)
+        self.smoothed_latency = self.best_latency
+
+    def log(self, now):
+        if self.log_interval and now - self.last_log >= self.log_interval:
+            self.last_log = now
+            print(
+                f"Rate limit: {self.rate:.1f} req/s, concurrency {int(self.concurrency)}, "
+                f"{self.requests} requests, {self.throttled} throttled"
+            )
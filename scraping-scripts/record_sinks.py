@@ -0,0 +1,213 @@
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import create_engine
+
+import db_writer
+import ufc_schema
+
+
+DEFAULT_CHUNK_SIZE = 1000
+
+# Parquet types of the typed ufc_schema columns
+ARROW_TYPES = {
+    ufc_schema.TEXT: pa.string(),
+    ufc_schema.CATEGORY: pa.dictionary(pa.int32(), pa.string()),
+    ufc_schema.COUNT: pa.int16(),
+    ufc_schema.LANDED_OF_ATTEMPTED: pa.int16(),
+    ufc_schema.PERCENT: pa.float32(),
+    ufc_schema.SECONDS: pa.int16(),
+}
+
+# Columns the scrapers add next to the ufc_schema columns of a detail table
+LINK_FIELDS = [
+    pa.field("FIGHTER_LINK", pa.string()),
+    pa.field("FIGHT_LINK", pa.string()),
+]
+
+
+def detail_schema(schema):
+    """
+    Builds the Parquet schema of a detail table from its ufc_schema schema.
+    """
+    fields = []
+    for column, kind in schema.items():
+        for name in ufc_schema.output_columns(column, kind):
+            fields.append(pa.field(name, ARROW_TYPES[kind]))
+    return pa.schema(fields + LINK_FIELDS)
+
+
+# Declared up front rather than inferred from a table's first chunk, where an
+# all-null column (FIGHTER_LINK on a page without fighter links) comes out
+# as type null and every later chunk fails to cast to it
+PARQUET_SCHEMAS = {
+    "All_Cards": pa.schema(
+        [
+            ("card_link", pa.string()),
+            ("title", pa.string()),
+            ("date", pa.timestamp("us")),
+            ("location", pa.string()),
+            ("eventID", pa.string()),
+        ]
+    ),
+    "All_Fights": pa.schema([("fight_link", pa.string()), ("eventID", pa.string())]),
+    **{
+        table: detail_schema(schema)
+        for table, schema in ufc_schema.TABLE_SCHEMAS.items()
+    },
+}
+
+
+class RecordSink:
+    """
+    Collects scraped rows per table and writes them out in fixed-size chunks,
+    so memory stays flat and every row is copied a constant number of times
+    no matter how many pages are scraped.
+
+    Subclasses implement write_chunk(table, df). Use a sink as a context
+    manager (or call close()) so the last partial chunk is written.
+    """
+
+    def __init__(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self.buffers = {}
+        self.buffered_rows = {}
+        self.rows_written = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def write(self, table, records):
+        """
+        Adds rows for a table; records is a DataFrame or a list of dicts.
+        """
+        df = records if isinstance(records, pd.DataFrame) else pd.DataFrame(records)
+        if df.empty:
+            return
+        self.buffers.setdefault(table, []).append(df)
+        self.buffered_rows[table] = self.buffered_rows.get(table, 0) + len(df)
+        if self.buffered_rows[table] >= self.chunk_size:
+            self.flush_table(table)
+
+    def write_all(self, records):
+        """
+        Drains an iterator of (table, records) pairs into the sink.
+        """
+        for table, rows in records:
+            self.write(table, rows)
+
+    def flush_table(self, table):
+        frames = self.buffers.pop(table, [])
+        self.buffered_rows.pop(table, None)
+        if not frames:
+            return
+        # Only one chunk is ever concatenated, never the whole history
+        chunk = pd.concat(frames, ignore_index=True)
+        self.write_chunk(table, chunk)
+        self.rows_written[table] = self.rows_written.get(table, 0) + len(chunk)
+
+    def flush(self):
+        for table in list(self.buffers):
+            self.flush_table(table)
+
+    def write_chunk(self, table, df):
+        raise NotImplementedError
+
+    def close(self):
+        self.flush()
+        for table, rows in self.rows_written.items():
+            print(f"Wrote {rows} rows to {table}")
+
+
+class ParquetSink(RecordSink):
+    """
+    Writes each table to <directory>/<table>.parquet, one row group per chunk.
+    """
+
+    def __init__(self, directory, chunk_size=DEFAULT_CHUNK_SIZE):
+        super().__init__(chunk_size)
+        self.directory = directory
+        self.writers = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def write_chunk(self, table, df):
+        schema = PARQUET_SCHEMAS.get(table)
+        if schema is None:
+            raise ValueError(f"No Parquet schema is declared for {table}")
+        unknown = [column for column in df.columns if column not in schema.names]
+        if unknown:
+            raise ValueError(f"{table} has columns missing from its schema: {unknown}")
+        # Columns a chunk doesn't have are written as nulls; object None
+        # converts to any Arrow type, where reindex's float NaN doesn't
+        df = df.reindex(columns=schema.names).astype(
+            {column: object for column in schema.names if column not in df.columns}
+        )
+        chunk = pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+        writer = self.writers.get(table)
+        if writer is None:
+            path = os.path.join(self.directory, f"{table}.parquet")
+            writer = pq.ParquetWriter(path, schema, compression="zstd")
+            self.writers[table] = writer
+        writer.write_table(chunk)
+
+    def close(self):
+        super().close()
+        for writer in self.writers.values():
+            writer.close()
+        self.writers = {}
+
+
+class SQLiteSink(RecordSink):
+    """
+    Appends each chunk to a table of a SQLite database in one transaction.
+    """
+
+    def __init__(self, db_path, chunk_size=DEFAULT_CHUNK_SIZE):
+        super().__init__(chunk_size)
+        self.engine = db_writer.configure_sqlite(create_engine(f"sqlite:///{db_path}"))
+
+    def write_chunk(self, table, df):
+        with self.engine.begin() as conn:
+            df.to_sql(table, conn, if_exists="append", index=False)
+
+
+class NDJSONSink(RecordSink):
+    """
+    Appends each table as newline-delimited JSON to <directory>/<table>.ndjson.
+    """
+
+    def __init__(self, directory, chunk_size=DEFAULT_CHUNK_SIZE):
+        super().__init__(chunk_size)
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def write_chunk(self, table, df):
+        path = os.path.join(self.directory, f"{table}.ndjson")
+        with open(path, "a", encoding="utf-8") as f:
+            lines = df.to_json(orient="records", lines=True, date_format="iso")
+            f.write(lines if lines.endswith("\n") else lines + "\n")
+
+
+SINKS = {
+    "parquet": ParquetSink,
+    "sqlite": SQLiteSink,
+    "ndjson": NDJSONSink,
+}
+
+
+def open_sink(kind, path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Parameters:
+    kind: "parquet" or "ndjson" (path is a directory) or "sqlite" (path is a database file).
+    path: Where the sink writes.
+    chunk_size: Rows buffered per table before a chunk is written.
+
+    Returns:
+    RecordSink: The opened sink.
+    """
+    return SINKS[kind](path, chunk_size=chunk_size)
@@ -0,0 +1,111 @@
+import random
+import time
+
+import requests
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+import metrics
+
+
+MAX_ATTEMPTS = 4
+BASE_DELAY = 1.0  # seconds
+MAX_DELAY = 30.0
+
+# Statuses worth trying again; anything else (404, parse errors, a page
+# missing its tables) fails the same way every time
+TRANSIENT_STATUSES = {408, 429, 500, 502, 503, 504}
+
+
+class ScrapeFailure(Exception):
+    """
+    Raised once a page is given up on, either because its error is permanent
+    or because every retry of a transient error failed. Only plain values
+    are kept so failures can cross process boundaries from the driver pool.
+    """
+
+    def __init__(self, link, error_class, message, attempts, transient):
+        super().__init__(link, error_class, message, attempts, transient)
+        self.link = link
+        self.error_class = error_class
+        self.message = message
+        self.attempts = attempts
+        self.transient = transient
+
+    def __str__(self):
+        return f"{self.error_class} after {self.attempts} attempt(s): {self.message}"
+
+    @classmethod
+    def from_error(cls, link, error, attempts):
+        if isinstance(error, ScrapeFailure):
+            return error
+        return cls(link, type(error).__name__, str(error), attempts, is_transient(error))
+
+
+def is_transient(error):
+    """
+    Returns True for failures that may succeed on another attempt: timeouts,
+    dropped connections, throttling/5xx responses and browser hiccups.
+    """
+    if isinstance(error, requests.HTTPError):
+        response = error.response
+        return response is None or response.status_code in TRANSIENT_STATUSES
+    if isinstance(error, (requests.Timeout, requests.ConnectionError)):
+        return True
+    return isinstance(error, (TimeoutException, WebDriverException))
+
+
+def backoff_delay(attempt):
+    # Full jitter keeps retries from many workers from arriving in lockstep
+    return random.uniform(0, min(MAX_DELAY, BASE_DELAY * 2**attempt))
+
+
+def call_with_retry(fetch, link, max_attempts=MAX_ATTEMPTS, before_retry=None):
+    """
+    Calls fetch() until it succeeds, retrying transient errors with jittered
+    exponential backoff.
+
+    Parameters:
+    fetch: Function taking no arguments that loads and parses one page.
+    link: URL being fetched, recorded on failure.
+    max_attempts: Total attempts before a transient error is given up on.
+    before_retry: Optional function called before every retry, e.g. to
+        replace a crashed browser.
+
+    Returns:
+    The value returned by fetch().
+
+    Raises:
+    ScrapeFailure: The error was permanent or every attempt failed.
+    """
+    for attempt in range(1, max_attempts + 1):
+        try:
+            return fetch()
+        except ScrapeFailure:
+            raise
+        except Exception as e:
+            if not is_transient(e) or attempt == max_attempts:
+                raise ScrapeFailure.from_error(link, e, attempt) from e
+            metrics.inc("retries_total")
+            time.sleep(backoff_delay(attempt - 1))
+            if before_retry is not None:
+                before_retry()
+
+
+def deliver_result(link, result, handle_result, handle_failure=None):
+    """
+    Hands a scraped page to handle_result. A page whose write raises is
+    dead-lettered through handle_failure like a page that failed to load,
+    instead of being lost.
+
+    Returns:
+    bool: True if handle_result accepted the page.
+    """
+    try:
+        handle_result(link, result)
+        return True
+    except Exception as e:
+        failure = ScrapeFailure.from_error(link, e, 1)
+        print(f"Error writing {link}: {failure}")
+        if handle_failure is not None:
+            handle_failure(link, failure)
+        return False
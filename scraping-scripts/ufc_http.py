@@ -0,0 +1,74 @@
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import metrics
+
+
+USER_AGENT = (
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+)
+
+
+def init_session(pool_size=10, cache=None, rate_limiter=None):
+    """
+    Creates a keep-alive HTTP session for the server-rendered ufcstats pages.
+
+    Parameters:
+    pool_size: Number of pooled connections kept open per host.
+    cache: Optional page_cache.PageCache consulted before every request.
+    rate_limiter: Optional rate_limit.AdaptiveRateLimiter pacing every network request.
+
+    Returns:
+    requests.Session: Session that can be passed anywhere a driver is expected.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"User-Agent": USER_AGENT, "Connection": "keep-alive"})
+    session.page_cache = cache
+    session.rate_limiter = rate_limiter
+    return session
+
+
+def is_http_session(driver):
+    return isinstance(driver, requests.Session)
+
+
+def http_get(session, url, timeout=10, headers=None):
+    """
+    session.get paced by the session's rate limiter, if it has one. Every
+    response, timeout or connection error is fed back so the limiter can
+    adapt its rate.
+    """
+    limiter = getattr(session, "rate_limiter", None)
+    if limiter is None:
+        return session.get(url, timeout=timeout, headers=headers)
+
+    limiter.acquire()
+    start = time.monotonic()
+    try:
+        response = session.get(url, timeout=timeout, headers=headers)
+    except requests.RequestException:
+        limiter.record(time.monotonic() - start)
+        raise
+    limiter.record(
+        time.monotonic() - start,
+        status=response.status_code,
+        retry_after=response.headers.get("Retry-After"),
+    )
+    return response
+
+
+@metrics.stage("fetch")
+def fetch_html(session, url, timeout=10):
+    cache = getattr(session, "page_cache", None)
+    if cache is not None:
+        return cache.fetch(session, url, timeout=timeout)
+
+    response = http_get(session, url, timeout=timeout)
+    response.raise_for_status()
+    return response.content
@@ -0,0 +1,298 @@
+import lxml.html
+from lxml.cssselect import CSSSelector
+import pandas as pd
+
+import metrics
+import ufc_schema
+
+
+# Selectors are compiled once at import time and reused for every page
+EVENT_ROWS = CSSSelector(
+    "body > section > div > div > div > div.b-statistics__sub-inner > div > table > tbody > tr"
+)
+CARD_LINK = CSSSelector("a.b-link.b-link_style_black")
+CARD_DATE = CSSSelector("span.b-statistics__date")
+EVENT_TITLE = CSSSelector("body > section > div > h2 > span")
+EVENT_DETAIL_ROWS = CSSSelector("tbody > tr.b-fight-details__table-row")
+FIGHT_EVENT_TITLE = CSSSelector("body > section > div > h2 > a")
+TOTALS_ROW = CSSSelector(
+    "body > section > div > div > section:nth-child(4) > table > tbody > tr"
+)
+SIG_STRIKES_ROW = CSSSelector("body > section > div > div > table > tbody > tr")
+CELL_TEXT = CSSSelector("p")
+FIGHTER_LINKS = CSSSelector('a[href*="fighter-details"]')
+PROFILE_NAME = CSSSelector("span.b-content__title-highlight")
+PROFILE_INFO = CSSSelector("li.b-list__box-list-item")
+
+
+def parse_document(html, base_url=None):
+    doc = lxml.html.fromstring(html)
+    if base_url:
+        # Selenium's get_attribute("href") always returns absolute URLs
+        doc.make_links_absolute(base_url)
+    return doc
+
+
+def element_text(element):
+    # Collapse whitespace the same way the browser renders element.text
+    return " ".join(element.text_content().split())
+
+
+def cell_values(cell):
+    return [element_text(p) for p in CELL_TEXT(cell)]
+
+
+def fighter_links(row):
+    # ufcstats fighter-details links, in the same order as the fighter names
+    return [a.get("href") for a in FIGHTER_LINKS(row)]
+
+
+def pad_links(links, count=2):
+    links = list(links or [])[:count]
+    return links + [None] * (count - len(links))
+
+
+@metrics.stage("extract")
+def parse_cards(html, base_url=None):
+    doc = parse_document(html, base_url)
+    cards = []
+
+    for row in EVENT_ROWS(doc):
+        card_link_elements = CARD_LINK(row)
+        if not card_link_elements:
+            continue
+        title = element_text(card_link_elements[0])
+        if not title:
+            continue
+
+        cells = row.findall("td")
+        date_elements = CARD_DATE(row)
+        date = element_text(date_elements[0]) if date_elements else ""
+        location = element_text(cells[1]) if len(cells) > 1 else ""
+
+        cards.append(
+            {
+                "card_link": card_link_elements[0].get("href"),
+                "title": title,
+                "date": date,
+                "location": location,
+            }
+        )
+
+    return build_cards_frame(cards)
+
+
+@metrics.stage("transform")
+def build_cards_frame(cards):
+    cards_df = pd.DataFrame(cards)
+    # Same ordering and eventID numbering as the Selenium scrape_cards
+    cards_df["date"] = pd.to_datetime(cards_df["date"])
+    cards_df = cards_df.sort_values(by="date", ascending=False).reset_index(drop=True)
+    total_events = len(cards_df)
+    cards_df["eventID"] = range(total_events, 0, -1)
+    cards_df["eventID"] = cards_df["eventID"].apply(lambda x: f"{x:04}")
+
+    return cards_df
+
+
+def build_fight_links(hrefs, eventID):
+    # Rows link to their fight more than once (result flag and matchup), so
+    # keep the first occurrence of each, in card order
+    return [
+        {"fight_link": href, "eventID": eventID}
+        for href in dict.fromkeys(hrefs)
+        if href
+    ]
+
+
+def event_table(doc):
+    """
+    Walks the fight table of an event page once.
+
+    Returns:
+    tuple: (cell texts per row, fighter-details links per row, fight-details
+    links per row).
+    """
+    rows, links, fight_links = [], [], []
+    for row in EVENT_DETAIL_ROWS(doc):
+        rows.append([cell_values(cell) for cell in row.findall("td")])
+        # Every link of the row sorted in one pass instead of a selector each
+        hrefs = [a.get("href") or "" for a in row.iter("a")]
+        links.append([href for href in hrefs if "fighter-details" in href])
+        fight_links.append([href for href in hrefs if "fight-details" in href])
+    return rows, links, fight_links
+
+
+@metrics.stage("extract")
+def parse_event_details(html, base_url=None):
+    doc = parse_document(html, base_url)
+    event_title = element_text(EVENT_TITLE(doc)[0])
+    rows, links, fight_links = event_table(doc)
+    return build_event_details_frame(rows, event_title, links, fight_links)
+
+
+@metrics.stage("extract")
+def parse_event_page(html, eventID, base_url=None):
+    """
+    Reads an event page once for both its All_Fights and Event_Details rows.
+
+    Parameters:
+    html: Source of the ufcstats event-details page.
+    eventID: eventID of the card, stored with every fight link.
+    base_url: URL of the page, used to make links absolute.
+
+    Returns:
+    tuple: (list of {"fight_link", "eventID"} dicts without duplicates,
+    Event_Details DataFrame).
+    """
+    doc = parse_document(html, base_url)
+    event_title = element_text(EVENT_TITLE(doc)[0])
+    rows, links, fight_links = event_table(doc)
+    return (
+        build_fight_links(
+            [href for row_links in fight_links for href in row_links], eventID
+        ),
+        build_event_details_frame(rows, event_title, links, fight_links),
+    )
+
+
+@metrics.stage("transform")
+def build_event_details_frame(rows, event_title, links=None, fight_links=None):
+    """
+    Maps event table rows onto the Event_Details columns.
+
+    Parameters:
+    rows: One list per table row, holding the <p> texts of each cell.
+    event_title: Title of the event the rows belong to.
+    links: Optional, one list of fighter-details links per table row; they
+        fill the FIGHTER_LINK column.
+    fight_links: Optional, one list of fight-details links per table row; the
+        first fills the FIGHT_LINK column.
+
+    Returns:
+    pd.DataFrame: Two rows per fight, one for each fighter.
+    """
+    event_details = []
+
+    for i, cells in enumerate(rows):
+        if len(cells) < 10:
+            continue
+
+        # ufcstats renders the result flag in lower case and upper-cases it with CSS.
+        # No contests and draws flag both fighters; otherwise the winner is first
+        is_nc = any("NC" in value.upper() for value in cells[0][:1])
+        is_draw = any("DRAW" in value.upper() for value in cells[0][:1])
+        weight_class = cells[6][0]
+        method = cells[7][0]
+        round = cells[8][0]
+        time = cells[9][0]
+
+        fighters = cells[1]
+        kds = cells[2]
+        strs = cells[3]
+        tds = cells[4]
+        subs = cells[5]
+        row_links = pad_links(links[i] if links else None)
+        fight_link = pad_links(fight_links[i] if fight_links else None, 1)[0]
+
+        for j in range(2):
+            if is_nc:
+                w_l = "NC"
+            elif is_draw:
+                w_l = "DRAW"
+            else:
+                w_l = "WIN" if j == 0 else "LOSS"
+            event_details.append(
+                {
+                    "W/L": w_l,
+                    "Fighter": fighters[j],
+                    "KD": kds[j],
+                    "STR": strs[j],
+                    "TD": tds[j],
+                    "SUB": subs[j],
+                    "Weight Class": weight_class,
+                    "Method": method,
+                    "Round": round,
+                    "Time": time,
+                    "Event Title": event_title,
+                    "FIGHTER_LINK": row_links[j],
+                    "FIGHT_LINK": fight_link,
+                }
+            )
+
+    data = {
+        column: [row[column] for row in event_details]
+        for column in list(ufc_schema.EVENT_DETAILS_SCHEMA)
+        + ["FIGHTER_LINK", "FIGHT_LINK"]
+    }
+    return ufc_schema.typed_frame(data, ufc_schema.EVENT_DETAILS_SCHEMA)
+
+
+def parse_stats_row(row, schema, event_title):
+    cells = [cell_values(cell) for cell in row.findall("td")]
+    return build_stats_frame(cells, schema, event_title, fighter_links(row))
+
+
+@metrics.stage("transform")
+def build_stats_frame(cells, schema, event_title, links=None):
+    # Each cell holds one <p> per fighter; the first two are the fight totals.
+    # The schema lists the table columns in page order, then EVENT_TITLE
+    columns = list(schema)[:-1]
+    data = {column: [] for column in columns}
+    for column, values in zip(columns, cells):
+        data[column].extend(values[:2])
+
+    data["EVENT_TITLE"] = [event_title] * 2
+    data["FIGHTER_LINK"] = pad_links(links)
+    return ufc_schema.typed_frame(data, schema)
+
+
+@metrics.stage("extract")
+def parse_fight_page(html, base_url=None):
+    # Both stats tables come from the same fight page, so parse the DOM once
+    doc = parse_document(html, base_url)
+    event_title = element_text(FIGHT_EVENT_TITLE(doc)[0])
+    fight_details = parse_stats_row(
+        TOTALS_ROW(doc)[0], ufc_schema.FIGHT_DETAILS_SCHEMA, event_title
+    )
+    significant_strikes = parse_stats_row(
+        SIG_STRIKES_ROW(doc)[0], ufc_schema.SIGNIFICANT_STRIKES_SCHEMA, event_title
+    )
+    return fight_details, significant_strikes
+
+
+@metrics.stage("extract")
+def parse_fighter_profile(html, base_url=None):
+    doc = parse_document(html, base_url)
+    name_elements = PROFILE_NAME(doc)
+    if not name_elements:
+        raise ValueError("Fighter name not found on page")
+    # Each info item reads "<label>: <value>"
+    info = [element_text(item).split(":", 1) for item in PROFILE_INFO(doc)]
+    return build_fighter_profile(element_text(name_elements[0]), info)
+
+
+@metrics.stage("transform")
+def build_fighter_profile(name, info):
+    """
+    Maps the info box of a fighter-details page onto the Fighters columns.
+
+    Parameters:
+    name: Fighter name from the page title.
+    info: [label, value] pairs of the info box items.
+
+    Returns:
+    dict: name, height_inches, reach_inches, stance and dob (ISO date).
+    """
+    values = {}
+    for item in info:
+        if len(item) == 2 and item[1].strip() not in ("", "--"):
+            values[item[0].strip().lower()] = item[1].strip()
+
+    return {
+        "name": name,
+        "height_inches": ufc_schema.to_inches(values.get("height")),
+        "reach_inches": ufc_schema.to_inches(values.get("reach")),
+        "stance": values.get("stance"),
+        "dob": ufc_schema.to_date(values.get("dob")),
+    }
@@ -0,0 +1,178 @@
+import re
+
+import pandas as pd
+
+
+# Column kinds. Every scraped stat arrives as text and is converted once, at
+# parse time, into one of these compact types.
+TEXT = "text"
+CATEGORY = "category"
+COUNT = "count"  # "3" -> 3
+LANDED_OF_ATTEMPTED = "landed_of_attempted"  # "45 of 102" -> _SUCCESSFUL, _ATTEMPTS
+PERCENT = "percent"  # "44%" -> 44.0, "---" -> NaN
+SECONDS = "seconds"  # "3:21" -> _SECONDS = 201
+
+FIGHT_DETAILS_SCHEMA = {
+    "FIGHTER": TEXT,
+    "KD": COUNT,
+    "SIG_STR": LANDED_OF_ATTEMPTED,
+    "SIG_STR_PCT": PERCENT,
+    "TOTAL_STR": LANDED_OF_ATTEMPTED,
+    "TD": LANDED_OF_ATTEMPTED,
+    "TD_PCT": PERCENT,
+    "SUB_ATT": COUNT,
+    "REV": COUNT,
+    "CTRL": SECONDS,
+    "EVENT_TITLE": CATEGORY,
+}
+
+SIGNIFICANT_STRIKES_SCHEMA = {
+    "FIGHTER": TEXT,
+    "SIG_STR": LANDED_OF_ATTEMPTED,
+    "SIG_STR_PCT": PERCENT,
+    "HEAD": LANDED_OF_ATTEMPTED,
+    "BODY": LANDED_OF_ATTEMPTED,
+    "LEG": LANDED_OF_ATTEMPTED,
+    "DISTANCE": LANDED_OF_ATTEMPTED,
+    "CLINCH": LANDED_OF_ATTEMPTED,
+    "GROUND": LANDED_OF_ATTEMPTED,
+    "EVENT_TITLE": CATEGORY,
+}
+
+EVENT_DETAILS_SCHEMA = {
+    "W/L": CATEGORY,
+    "Fighter": TEXT,
+    "KD": COUNT,
+    "STR": COUNT,
+    "TD": COUNT,
+    "SUB": COUNT,
+    "Weight Class": CATEGORY,
+    "Method": CATEGORY,
+    "Round": COUNT,
+    "Time": SECONDS,
+    "Event Title": CATEGORY,
+}
+
+# Schemas of the database tables the writer fills, by table name
+TABLE_SCHEMAS = {
+    "Fight_Details": FIGHT_DETAILS_SCHEMA,
+    "Significant_Strikes": SIGNIFICANT_STRIKES_SCHEMA,
+    "Event_Details": EVENT_DETAILS_SCHEMA,
+}
+
+SQL_TYPES = {
+    TEXT: "TEXT",
+    CATEGORY: "TEXT",
+    COUNT: "SMALLINT",
+    LANDED_OF_ATTEMPTED: "SMALLINT",
+    PERCENT: "REAL",
+    SECONDS: "SMALLINT",
+}
+
+LANDED_OF_ATTEMPTED_PATTERN = re.compile(r"^\s*(\d+)\s+of\s+(\d+)\s*$", re.IGNORECASE)
+SECONDS_PATTERN = re.compile(r"^\s*(\d+):(\d{2})\s*$")
+FEET_INCHES_PATTERN = re.compile(r"^\s*(\d+)'\s*(\d+)\"\s*$")
+
+
+def output_columns(column, kind):
+    """
+    Returns the typed column names a raw scraped column turns into.
+    """
+    if kind == LANDED_OF_ATTEMPTED:
+        return [f"{column}_SUCCESSFUL", f"{column}_ATTEMPTS"]
+    if kind == SECONDS:
+        return [f"{column}_SECONDS"]
+    return [column]
+
+
+def sql_columns(schema):
+    """
+    Maps every typed output column of a schema to its SQL type.
+    """
+    columns = {}
+    for column, kind in schema.items():
+        for name in output_columns(column, kind):
+            columns[name] = SQL_TYPES[kind]
+    return columns
+
+
+def to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def to_float(value):
+    try:
+        return float(str(value).rstrip("%"))
+    except ValueError:
+        return None
+
+
+def split_landed_of_attempted(value):
+    match = LANDED_OF_ATTEMPTED_PATTERN.match(str(value))
+    return (int(match[1]), int(match[2])) if match else (None, None)
+
+
+def to_seconds(value):
+    match = SECONDS_PATTERN.match(str(value))
+    return int(match[1]) * 60 + int(match[2]) if match else None
+
+
+def to_inches(value):
+    # Heights read 6' 1" and reaches 77"; ufcstats shows "--" when unknown
+    match = FEET_INCHES_PATTERN.match(str(value))
+    if match:
+        return float(int(match[1]) * 12 + int(match[2]))
+    try:
+        return float(str(value).strip().rstrip('"'))
+    except ValueError:
+        return None
+
+
+def to_date(value):
+    # "Jun 10, 1988" -> "1988-06-10"
+    date = pd.to_datetime(value, format="%b %d, %Y", errors="coerce")
+    return None if pd.isna(date) else date.date().isoformat()
+
+
+def typed_frame(data, schema):
+    """
+    Converts scraped text into the compact typed columns of schema.
+
+    Parameters:
+    data: Dict of column name to list of scraped strings.
+    schema: One of the *_SCHEMA dicts; columns it doesn't list pass through.
+
+    Returns:
+    pd.DataFrame: Frame with the typed output columns.
+    """
+    # Scraped pages are a few rows each, so plain Python conversion followed
+    # by one typed array per column beats vectorized string ops here
+    typed = {}
+    for column, values in data.items():
+        kind = schema.get(column, TEXT)
+
+        if kind == LANDED_OF_ATTEMPTED:
+            pairs = [split_landed_of_attempted(value) for value in values]
+            successful, attempts = output_columns(column, kind)
+            typed[successful] = pd.array([p[0] for p in pairs], dtype="Int16")
+            typed[attempts] = pd.array([p[1] for p in pairs], dtype="Int16")
+        elif kind == SECONDS:
+            typed[output_columns(column, kind)[0]] = pd.array(
+                [to_seconds(value) for value in values], dtype="Int16"
+            )
+        elif kind == PERCENT:
+            typed[column] = pd.array(
+                [to_float(value) for value in values], dtype="Float32"
+            )
+        elif kind == COUNT:
+            typed[column] = pd.array([to_int(value) for value in values], dtype="Int16")
+        elif kind == CATEGORY:
+            typed[column] = pd.Categorical(values)
+        else:
+            typed[column] = list(values)
+
+    return pd.DataFrame(typed)
+
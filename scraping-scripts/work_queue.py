@@ -0,0 +1,263 @@
+import os
+import random
+import socket
+import threading
+import time
+import uuid
+
+from sqlalchemy import (
+    Column,
+    Float,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    and_,
+    bindparam,
+    or_,
+    select,
+    text,
+    update,
+)
+from sqlalchemy.exc import IntegrityError
+
+
+DEFAULT_LEASE_SECONDS = 300
+DEFAULT_CLAIM_SIZE = 100
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+metadata = MetaData()
+
+# One row per page to scrape. Timestamps are epoch seconds so lease checks
+# are plain number comparisons.
+work_queue_table = Table(
+    "Work_Queue",
+    metadata,
+    Column("link", String(512), primary_key=True),
+    Column("page_type", String(16), nullable=False, index=True),
+    Column("status", String(16), nullable=False, default=PENDING, index=True),
+    Column("lease_owner", String(128)),
+    Column("lease_token", String(64), index=True),
+    Column("lease_expires", Float),
+    Column("attempts", Integer, nullable=False, default=0),
+)
+
+ENQUEUE_QUERIES = {
+    "event": """
+        SELECT card_link AS link FROM All_Cards c
+        WHERE details_scraped IS NOT TRUE
+        AND NOT EXISTS (SELECT 1 FROM Work_Queue q WHERE q.link = c.card_link)
+    """,
+    "fight": """
+        SELECT fight_link AS link FROM All_Fights f
+        WHERE details_scraped IS NOT TRUE
+        AND NOT EXISTS (SELECT 1 FROM Work_Queue q WHERE q.link = f.fight_link)
+    """,
+    "fighter": """
+        SELECT fighter_link AS link FROM Fighters p
+        WHERE profile_scraped IS NOT TRUE
+        AND NOT EXISTS (SELECT 1 FROM Work_Queue q WHERE q.link = p.fighter_link)
+    """,
+}
+
+
+def default_owner():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class WorkQueue:
+    """
+    Work queue with leases in the SQLite database, so several scraper
+    processes on one host can drain All_Cards, All_Fights and Fighters
+    without duplicating work.
+
+    A worker claims a batch of links, which leases them to it until
+    lease_expires. It keeps the lease alive with heartbeat() while working,
+    then marks the links complete() or fail(). Links whose lease runs out
+    (the worker crashed or lost its connection) become claimable again.
+
+    Workers are processes sharing one database file. The migrations that
+    create the tables it is filled from, and the writer's upserts, are
+    SQLite-specific, so the queue does not coordinate separate machines.
+    """
+
+    def __init__(self, engine, owner=None, lease_seconds=DEFAULT_LEASE_SECONDS):
+        self.engine = engine
+        self.owner = owner or default_owner()
+        self.lease_seconds = lease_seconds
+        metadata.create_all(engine, checkfirst=True)
+
+    def enqueue_unprocessed(self):
+        """
+        Adds every event, fight and fighter not yet scraped (and not already queued).
+
+        Returns:
+        int: Number of links added.
+        """
+        added = 0
+        for page_type, query in ENQUEUE_QUERIES.items():
+            with self.engine.begin() as conn:
+                links = [row.link for row in conn.execute(text(query))]
+            rows = [
+                {"link": link, "page_type": page_type, "status": PENDING, "attempts": 0}
+                for link in links
+            ]
+            if not rows:
+                continue
+            try:
+                with self.engine.begin() as conn:
+                    conn.execute(work_queue_table.insert(), rows)
+                added += len(rows)
+            except IntegrityError:
+                # Another node enqueued some of the same links first; add the
+                # rest one at a time
+                for row in rows:
+                    try:
+                        with self.engine.begin() as conn:
+                            conn.execute(work_queue_table.insert(), row)
+                        added += 1
+                    except IntegrityError:
+                        pass
+        return added
+
+    def claimable(self, now):
+        table = work_queue_table
+        return or_(
+            table.c.status == PENDING,
+            and_(table.c.status == LEASED, table.c.lease_expires < now),
+        )
+
+    def claim(self, page_type, limit=DEFAULT_CLAIM_SIZE):
+        """
+        Leases up to limit links of one page type to this worker.
+
+        Returns:
+        list: The claimed links; empty once the queue is drained.
+        """
+        table = work_queue_table
+        now = time.time()
+        with self.engine.begin() as conn:
+            candidates = [
+                row.link
+                for row in conn.execute(
+                    select(table.c.link)
+                    .where(table.c.page_type == page_type, self.claimable(now))
+                    .limit(limit * 4)
+                )
+            ]
+        if not candidates:
+            return []
+
+        # Workers pick different random subsets so they rarely contend; the
+        # conditional UPDATE decides who wins any row they do share
+        candidates = random.sample(candidates, min(limit, len(candidates)))
+        token = uuid.uuid4().hex
+        with self.engine.begin() as conn:
+            conn.execute(
+                update(table)
+                .where(
+                    table.c.link.in_(bindparam("links", expanding=True)),
+                    self.claimable(now),
+                )
+                .values(
+                    status=LEASED,
+                    lease_owner=self.owner,
+                    lease_token=token,
+                    lease_expires=now + self.lease_seconds,
+                    attempts=table.c.attempts + 1,
+                ),
+                {"links": candidates},
+            )
+            claimed = conn.execute(
+                select(table.c.link).where(table.c.lease_token == token)
+            )
+            return [row.link for row in claimed]
+
+    def heartbeat(self):
+        """
+        Extends the lease on every link this worker holds.
+        """
+        table = work_queue_table
+        with self.engine.begin() as conn:
+            conn.execute(
+                update(table)
+                .where(table.c.lease_owner == self.owner, table.c.status == LEASED)
+                .values(lease_expires=time.time() + self.lease_seconds)
+            )
+
+    def finish(self, links, status):
+        if not links:
+            return
+        table = work_queue_table
+        with self.engine.begin() as conn:
+            conn.execute(
+                update(table)
+                .where(
+                    table.c.link.in_(bindparam("links", expanding=True)),
+                    table.c.lease_owner == self.owner,
+                    table.c.status == LEASED,
+                )
+                .values(status=status, lease_token=None, lease_expires=None),
+                {"links": list(links)},
+            )
+
+    def complete(self, links):
+        self.finish(links, DONE)
+
+    def fail(self, links):
+        # Failures are dead-lettered in Failed_Links; --retry-failed owns them
+        self.finish(links, FAILED)
+
+    def release(self, links):
+        # Hands unfinished links straight back instead of waiting for expiry
+        self.finish(links, PENDING)
+
+    def requeue_expired(self):
+        """
+        Returns links whose lease ran out to pending.
+
+        Returns:
+        int: Number of links re-queued.
+        """
+        table = work_queue_table
+        with self.engine.begin() as conn:
+            result = conn.execute(
+                update(table)
+                .where(table.c.status == LEASED, table.c.lease_expires < time.time())
+                .values(status=PENDING, lease_owner=None, lease_token=None)
+            )
+            return result.rowcount
+
+    def keep_alive(self):
+        """
+        Context manager that heartbeats in a background thread, at a third of
+        the lease length, for as long as the block runs.
+        """
+        return Heartbeat(self, self.lease_seconds / 3)
+
+
+class Heartbeat:
+    def __init__(self, queue, interval):
+        self.queue = queue
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                self.queue.heartbeat()
+            except Exception as e:
+                print(f"Work queue heartbeat failed: {e}")
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stopped.set()
+        self.thread.join()
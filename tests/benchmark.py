@@ -0,0 +1,271 @@
+"""
+Offline benchmark of every scraper path against the saved fixture pages.
+
+Each path runs in a fresh process, so peak RSS belongs to that path alone,
+and fetches pages from tests/mock_server.py running in this process, so no
+network, ufcstats.com or (for the default http backend) Chrome is needed.
+
+    python tests/benchmark.py --json bench.json
+    python tests/benchmark.py --compare bench.json  # after changing code
+
+    # Selenium against the default http backend
+    python tests/benchmark.py --json http.json
+    python tests/benchmark.py --backend selenium --compare http.json
+
+    # Opt-in lean Chrome profile against the default plain one
+    python tests/benchmark.py --backend selenium --json plain.json
+    python tests/benchmark.py --backend selenium --driver-profile lean \
+        --compare plain.json
+
+Numbers are only comparable on the same machine with the same iterations.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TESTS_DIR, "..", "scraping-scripts"))
+
+from mock_server import start_server  # noqa: E402
+
+
+SCRAPER_PATHS = [
+    "scrape_cards",
+    "scrape_fights",
+    "scrape_event_details",
+    "scrape_event_pages",
+    "scrape_fight_details",
+    "scrape_significant_strikes",
+    "scrape_fight_page",
+]
+
+DEFAULT_ITERATIONS = {"http": 300, "selenium": 20}
+WARMUP_ITERATIONS = 5
+
+COMPARED_METRICS = ["pages_per_sec", "p50_ms", "p99_ms", "peak_rss_mb", "kb_per_page"]
+
+
+def page_link(base_url, kind, i):
+    # A different id for every request, so nothing can be served from a cache
+    return f"{base_url}/{kind}/{i:016x}"
+
+
+def scraper_call(name, driver, base_url, i):
+    """
+    Scrapes the i-th page of one path.
+
+    Returns:
+    int: Rows the scraper returned, to catch a path silently parsing nothing.
+    """
+    import UFC_main_pull
+
+    if name == "scrape_cards":
+        df = UFC_main_pull.scrape_cards(
+            driver, f"{base_url}/statistics/events/completed?page=all&i={i}"
+        )
+    elif name == "scrape_fights":
+        cards_df = pd.DataFrame(
+            [{"card_link": page_link(base_url, "event-details", i), "eventID": "0677"}]
+        )
+        df = UFC_main_pull.scrape_fights(driver, cards_df)
+    elif name == "scrape_event_pages":
+        cards_df = pd.DataFrame(
+            [{"card_link": page_link(base_url, "event-details", i), "eventID": "0677"}]
+        )
+        return sum(
+            len(fights_df) + len(event_details_df)
+            for fights_df, event_details_df in UFC_main_pull.scrape_event_pages(
+                driver, cards_df
+            )
+        )
+    elif name == "scrape_event_details":
+        df = UFC_main_pull.scrape_event_details(
+            driver, [page_link(base_url, "event-details", i)]
+        )
+    elif name == "scrape_fight_details":
+        df = UFC_main_pull.scrape_fight_details(
+            driver, page_link(base_url, "fight-details", i)
+        )
+    elif name == "scrape_significant_strikes":
+        df = UFC_main_pull.scrape_significant_strikes(
+            driver, page_link(base_url, "fight-details", i)
+        )
+    else:
+        # Both fight tables from one fetch, as the crawler scrapes them
+        fight_details_df, sig_strike_df = UFC_main_pull.scrape_fight_page(
+            driver, page_link(base_url, "fight-details", i)
+        )
+        return len(fight_details_df) + len(sig_strike_df)
+    return len(df)
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_path(name, backend, base_url, iterations, driver_profile):
+    """
+    Benchmarks one scraper path; runs in its own process.
+
+    Returns:
+    dict: Throughput, latency percentiles, peak RSS and rows per page, plus
+    kilobytes transferred per page on the Selenium backend.
+    """
+    import driver_profiles
+    import UFC_main_pull
+
+    driver = UFC_main_pull.init_backend(backend, driver_profile)
+    try:
+        for i in range(WARMUP_ITERATIONS):
+            scraper_call(name, driver, base_url, i)
+        rss_before = peak_rss_mb()
+
+        latencies = []
+        rows = 0
+        transferred = 0
+        elapsed = 0.0
+        for i in range(WARMUP_ITERATIONS, WARMUP_ITERATIONS + iterations):
+            page_start = time.perf_counter()
+            rows = scraper_call(name, driver, base_url, i)
+            latencies.append(time.perf_counter() - page_start)
+            elapsed += latencies[-1]
+            if backend == "selenium":
+                # Read outside the timed section; covers the last page loaded
+                transferred += driver_profiles.transferred_bytes(driver)
+    finally:
+        UFC_main_pull.close_backend(driver)
+
+    latencies_ms = np.array(latencies) * 1000
+    result = {
+        "pages_per_sec": round(iterations / elapsed, 1),
+        "p50_ms": round(float(np.percentile(latencies_ms, 50)), 2),
+        "p99_ms": round(float(np.percentile(latencies_ms, 99)), 2),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "rss_growth_mb": round(peak_rss_mb() - rss_before, 1),
+        "rows": rows,
+    }
+    if backend == "selenium":
+        result["kb_per_page"] = round(transferred / iterations / 1024, 1)
+    return result
+
+
+def run_benchmark(backend, iterations, paths=SCRAPER_PATHS, driver_profile="default"):
+    server, base_url = start_server()
+    # spawn, not fork, so no child inherits the parent's memory or the server
+    context = multiprocessing.get_context("spawn")
+    results = {}
+    try:
+        for name in paths:
+            with context.Pool(1) as pool:
+                results[name] = pool.apply(
+                    run_path, (name, backend, base_url, iterations, driver_profile)
+                )
+            print(f"{name}: {results[name]['pages_per_sec']} pages/s")
+    finally:
+        server.shutdown()
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=TESTS_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline):
+    """
+    Returns a table of each metric next to the baseline and the change in %.
+    """
+    rows = []
+    for name, current in results.items():
+        previous = baseline["results"].get(name)
+        if previous is None:
+            continue
+        for metric in COMPARED_METRICS:
+            if not previous.get(metric) or metric not in current:
+                continue
+            change = (current[metric] - previous[metric]) / previous[metric] * 100
+            rows.append(
+                {
+                    "path": name,
+                    "metric": metric,
+                    "baseline": previous[metric],
+                    "current": current[metric],
+                    "change_%": round(change, 1),
+                }
+            )
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the scraper paths")
+    parser.add_argument("--backend", choices=["http", "selenium"], default="http")
+    parser.add_argument(
+        "--driver-profile",
+        default="default",
+        help="Chrome profile for --backend selenium (default or lean)",
+    )
+    parser.add_argument("--iterations", type=int, help="Pages timed per path")
+    parser.add_argument("--path", action="append", choices=SCRAPER_PATHS)
+    parser.add_argument("--json", metavar="PATH", help="Save results to PATH")
+    parser.add_argument("--compare", metavar="PATH", help="Compare with saved results")
+    args = parser.parse_args()
+
+    iterations = args.iterations or DEFAULT_ITERATIONS[args.backend]
+    results = run_benchmark(
+        args.backend, iterations, args.path or SCRAPER_PATHS, args.driver_profile
+    )
+
+    backend = args.backend
+    if backend == "selenium":
+        backend = f"selenium ({args.driver_profile} profile)"
+    print(f"\n{backend} backend, {iterations} pages per path")
+    print(pd.DataFrame.from_dict(results, orient="index").to_string())
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if (
+            baseline["backend"] != args.backend
+            or baseline["iterations"] != iterations
+            or baseline.get("driver_profile") != args.driver_profile
+        ):
+            print("Warning: baseline was run with different settings")
+        print(f"\nCompared with {baseline['commit']}")
+        print(compare(results, baseline).to_string(index=False))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "commit": git_commit(),
+                    "backend": args.backend,
+                    "driver_profile": args.driver_profile,
+                    "iterations": iterations,
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+        print(f"Saved results to {args.json}")
@@ -0,0 +1,47 @@
+import os
+import sys
+
+import pytest
+from sqlalchemy import create_engine
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(TESTS_DIR, "fixtures")
+sys.path.insert(0, os.path.join(TESTS_DIR, "..", "scraping-scripts"))
+
+import migrations  # noqa: E402
+from mock_server import start_server  # noqa: E402
+
+
+@pytest.fixture
+def fixture_html():
+    """
+    Returns a function reading one of the saved pages in tests/fixtures.
+    """
+
+    def read(name):
+        with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+            return f.read()
+
+    return read
+
+
+@pytest.fixture
+def engine(tmp_path):
+    # A new SQLite file per test, migrated to the current schema
+    engine = create_engine(f"sqlite:///{tmp_path / 'ufc.db'}")
+    migrations.migrate(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(scope="module")
+def server():
+    # The fixture corpus served on localhost, standing in for ufcstats.com
+    server, _ = start_server()
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+def base_url(server):
+    return f"http://127.0.0.1:{server.server_address[1]}"
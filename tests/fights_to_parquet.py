@@ -1,16 +1,17 @@
+import os
+import sys
+
 import pandas as pd
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 
 
-def init_driver():
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service)
-    return driver
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scraping-scripts")
+)
+
+from chromedriver import init_driver  # noqa: E402
 
 
 def scrape_cards(driver, link):
@@ -110,13 +111,15 @@ if __name__ == "__main__":
 
     print(fights_df.head())  # Inspect the output
 
-    # Specify the path and name of the Excel file you want to create
-    excel_file_path = "fights_data.xlsx"  # Update this path as needed
+    # Write a Parquet dataset partitioned by the year/month of each fight's
+    # event instead of a slow openpyxl workbook
+    parquet_path = "parquet/fights"  # Update this path as needed
+    fights_df = fights_df.merge(cards_df[["eventID", "date"]], on="eventID")
+    fights_df.assign(
+        year=fights_df["date"].dt.year, month=fights_df["date"].dt.month
+    ).to_parquet(parquet_path, partition_cols=["year", "month"], index=False)
 
-    # Save the DataFrame to an Excel file
-    fights_df.to_excel(excel_file_path, index=False, engine="openpyxl")
-
-    print(f"Saved fights data to '{excel_file_path}'.")
+    print(f"Saved fights data to '{parquet_path}'.")
 
     driver.quit()
 if __name__ == "__main__":
@@ -131,12 +134,14 @@ if __name__ == "__main__":
 
     print(fights_df.head())  # Inspect the output
 
-    # Specify the path and name of the Excel file you want to create
-    excel_file_path = "fights_data.xlsx"  # Update this path as needed
-
-    # Save the DataFrame to an Excel file
-    fights_df.to_excel(excel_file_path, index=False, engine="openpyxl")
+    # Write a Parquet dataset partitioned by the year/month of each fight's
+    # event instead of a slow openpyxl workbook
+    parquet_path = "parquet/fights"  # Update this path as needed
+    fights_df = fights_df.merge(cards_df[["eventID", "date"]], on="eventID")
+    fights_df.assign(
+        year=fights_df["date"].dt.year, month=fights_df["date"].dt.month
+    ).to_parquet(parquet_path, partition_cols=["year", "month"], index=False)
 
-    print(f"Saved fights data to '{excel_file_path}'.")
+    print(f"Saved fights data to '{parquet_path}'.")
 
     driver.quit()
@@ -0,0 +1,334 @@
+"""
+Load test of the fighter comparison service (scraping-scripts/fighter_compare.py).
+
+Builds a synthetic database the size of the full ufcstats history, then
+measures per-request latency of compare and last-fights through the Python
+API and over HTTP, with most requests going to a small set of popular
+matchups the way real traffic does. Finally it simulates an ingest and checks
+that the cache is invalidated and the index reloaded.
+
+    python tests/load_compare.py
+    python tests/load_compare.py --db connectors/UFC_Data.db  # a real database
+
+Exits non-zero if a p99 is above --target-ms.
+"""
+
+import argparse
+import http.client
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(TESTS_DIR, "..", "scraping-scripts"))
+
+import db_writer  # noqa: E402
+import fighter_career  # noqa: E402
+import fighter_compare  # noqa: E402
+import migrations  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+
+
+DEFAULT_FIGHTERS = 4000
+DEFAULT_FIGHTS = 8000
+DEFAULT_REQUESTS = 20000
+# Concurrent HTTP clients, each its own process. They share the machine's
+# cores with the server, so on a small box more clients mostly measure queueing
+DEFAULT_CLIENTS = 4
+# Share of requests that go to the HOT_PAIRS most popular matchups
+HOT_SHARE = 0.8
+HOT_PAIRS = 200
+METHODS = ["KO/TKO", "SUB", "U-DEC", "S-DEC", "M-DEC"]
+
+
+def synthetic_database(path, fighters, fights, seed=0):
+    """
+    Writes fighters and fights with random but plausible stats to a new
+    SQLite database at path, through the real schema migrations.
+    """
+    rng = np.random.default_rng(seed)
+    engine = db_writer.configure_sqlite(create_engine(f"sqlite:///{path}"))
+    migrations.migrate(engine)
+
+    events = max(1, fights // 12)
+    dates = pd.date_range("1994-03-11", "2024-06-01", periods=events)
+    cards = pd.DataFrame(
+        {
+            "card_link": [
+                f"http://ufcstats.com/event-details/{i:016x}" for i in range(events)
+            ],
+            "title": [f"UFC Event {i}" for i in range(events)],
+            "date": dates,
+            "eventID": range(1, events + 1),
+            "details_scraped": True,
+        }
+    )
+    event_of_fight = np.sort(rng.integers(0, events, fights))
+    fight_links = [f"http://ufcstats.com/fight-details/{i:016x}" for i in range(fights)]
+    all_fights = pd.DataFrame(
+        {
+            "fight_link": fight_links,
+            "card_link": cards["card_link"].to_numpy()[event_of_fight],
+            "eventID": event_of_fight + 1,
+            "details_scraped": True,
+        }
+    )
+    fighter_table = pd.DataFrame(
+        {
+            "fighter_id": range(1, fighters + 1),
+            "fighter_link": [
+                f"http://ufcstats.com/fighter-details/{i:016x}" for i in range(fighters)
+            ],
+            "name": [f"Fighter {i}" for i in range(1, fighters + 1)],
+            "height_inches": rng.integers(62, 80, fighters).astype(float),
+            "reach_inches": rng.integers(62, 84, fighters).astype(float),
+            "stance": rng.choice(["Orthodox", "Southpaw", "Switch"], fighters),
+            "profile_scraped": True,
+        }
+    )
+
+    # Two rows per fight, winner first; fighters are drawn with a skew so
+    # some have long careers, like the real roster
+    weights = 1 / np.arange(1, fighters + 1) ** 0.5
+    corner_ids = rng.choice(
+        np.arange(1, fighters + 1), size=(fights, 2), p=weights / weights.sum()
+    )
+    same = corner_ids[:, 0] == corner_ids[:, 1]
+    corner_ids[same, 1] = corner_ids[same, 1] % fighters + 1
+    rows = fights * 2
+    fighter_ids = corner_ids.reshape(-1)
+    sig_attempts = rng.integers(10, 250, rows)
+    sig_landed = (sig_attempts * rng.uniform(0.25, 0.65, rows)).astype(int)
+    td_attempts = rng.integers(0, 10, rows)
+    rounds = np.repeat(rng.integers(1, 4, fights), 2)
+    times = np.repeat(rng.integers(10, 301, fights), 2)
+    common = {
+        "FIGHT_LINK": np.repeat(fight_links, 2),
+        "FIGHTER": [f"Fighter {i}" for i in fighter_ids],
+        "FIGHTER_ID": fighter_ids,
+        "EVENT_TITLE": np.repeat(cards["title"].to_numpy()[event_of_fight], 2),
+    }
+    fight_details = pd.DataFrame(
+        {
+            **common,
+            "KD": rng.integers(0, 2, rows),
+            "SIG_STR_SUCCESSFUL": sig_landed,
+            "SIG_STR_ATTEMPTS": sig_attempts,
+            "TOTAL_STR_SUCCESSFUL": sig_landed + rng.integers(0, 40, rows),
+            "TOTAL_STR_ATTEMPTS": sig_attempts + rng.integers(40, 80, rows),
+            "TD_SUCCESSFUL": (td_attempts * rng.uniform(0, 0.6, rows)).astype(int),
+            "TD_ATTEMPTS": td_attempts,
+            "SUB_ATT": rng.integers(0, 3, rows),
+            "REV": rng.integers(0, 2, rows),
+            "CTRL_SECONDS": rng.integers(0, 300, rows),
+        }
+    )
+    significant_strikes = pd.DataFrame(
+        {
+            **common,
+            "SIG_STR_SUCCESSFUL": sig_landed,
+            "SIG_STR_ATTEMPTS": sig_attempts,
+            "HEAD_SUCCESSFUL": sig_landed // 2,
+            "BODY_SUCCESSFUL": sig_landed // 4,
+            "LEG_SUCCESSFUL": sig_landed - sig_landed // 2 - sig_landed // 4,
+        }
+    )
+    event_details = pd.DataFrame(
+        {
+            "FIGHT_LINK": common["FIGHT_LINK"],
+            "WIN": np.tile(["WIN", "LOSS"], fights),
+            "FIGHTER": common["FIGHTER"],
+            "FIGHTER_ID": fighter_ids,
+            "METHOD": np.repeat(rng.choice(METHODS, fights), 2),
+            "ROUND": rounds,
+            "TIME_SECONDS": times,
+            "EVENT_TITLE": common["EVENT_TITLE"],
+        }
+    )
+
+    with engine.begin() as conn:
+        cards.to_sql("All_Cards", conn, if_exists="append", index=False)
+        all_fights.to_sql("All_Fights", conn, if_exists="append", index=False)
+        fighter_table.to_sql("Fighters", conn, if_exists="append", index=False)
+        fight_details.to_sql("Fight_Details", conn, if_exists="append", index=False)
+        significant_strikes.to_sql(
+            "Significant_Strikes", conn, if_exists="append", index=False
+        )
+        event_details.to_sql("Event_Details", conn, if_exists="append", index=False)
+        fighter_career.refresh(conn)
+        fighter_career.mark_changed(conn)
+    return engine
+
+
+def request_plan(fighter_ids, requests, seed=1):
+    """
+    Returns (kind, a, b) tuples: mostly comparisons, HOT_SHARE of them among
+    a few popular pairs, plus some last-fights lookups.
+    """
+    rng = np.random.default_rng(seed)
+    hot = rng.choice(fighter_ids, size=(HOT_PAIRS, 2))
+    plan = []
+    for _ in range(requests):
+        roll = rng.random()
+        if roll < 0.1:
+            plan.append(("fights", int(rng.choice(fighter_ids)), None))
+        elif roll < 0.1 + 0.9 * HOT_SHARE:
+            a, b = hot[rng.integers(HOT_PAIRS)]
+            plan.append(("compare", int(a), int(b)))
+        else:
+            a, b = rng.choice(fighter_ids, 2)
+            plan.append(("compare", int(a), int(b)))
+    return plan
+
+
+def percentiles(latencies):
+    ms = np.array(latencies) * 1000
+    return {
+        "requests": len(ms),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "max_ms": round(float(ms.max()), 3),
+    }
+
+
+def run_api(service, plan):
+    latencies = []
+    for kind, a, b in plan:
+        start = time.perf_counter()
+        if kind == "compare":
+            service.compare(a, b)
+        else:
+            service.last_fights(a)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def http_client(port, requests):
+    # One keep-alive connection per client
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    latencies = []
+    for kind, a, b in requests:
+        if kind == "compare":
+            path = f"/compare?a={a}&b={b}"
+        else:
+            path = f"/fights?fighter={a}"
+        start = time.perf_counter()
+        conn.request("GET", path)
+        response = conn.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - start)
+        if response.status != 200:
+            raise RuntimeError(f"{path} returned {response.status}")
+    conn.close()
+    return latencies
+
+
+def run_http(port, plan, clients):
+    # Clients run in their own processes so they don't compete with the
+    # server for this process's GIL
+    with multiprocessing.get_context("spawn").Pool(clients) as pool:
+        results = pool.starmap(
+            http_client, [(port, plan[i::clients]) for i in range(clients)]
+        )
+    return [latency for latencies in results for latency in latencies]
+
+
+def check_invalidation(service, engine):
+    """
+    Re-aggregates one fighter the way BufferedWriter does after a write and
+    checks that the service picks the new version up and empties its cache.
+    """
+    fighter_id = next(iter(service.index.fight_ranges))
+    service.compare(fighter_id, fighter_id)
+    version = service.version
+    with engine.begin() as conn:
+        fighter_career.refresh(conn, [fighter_id])
+        fighter_career.mark_changed(conn)
+
+    time.sleep(service.check_interval)
+    start = time.perf_counter()
+    service.compare(fighter_id, fighter_id)
+    request_seconds = time.perf_counter() - start
+    # The reload runs in the background; old answers are served meanwhile
+    while service.version == version and time.perf_counter() - start < 30:
+        time.sleep(0.01)
+    reload_seconds = time.perf_counter() - start
+    reloaded = service.version != version and not service.cache.entries
+    print(
+        f"Ingest invalidation: {'ok' if reloaded else 'FAILED'} (request during "
+        f"reload {request_seconds * 1000:.2f} ms, index swapped after "
+        f"{reload_seconds * 1000:.0f} ms)"
+    )
+    return reloaded
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the comparison service")
+    parser.add_argument(
+        "--db", help="Existing SQLite database to use instead of synthetic data"
+    )
+    parser.add_argument("--fighters", type=int, default=DEFAULT_FIGHTERS)
+    parser.add_argument("--fights", type=int, default=DEFAULT_FIGHTS)
+    parser.add_argument("--requests", type=int, default=DEFAULT_REQUESTS)
+    parser.add_argument("--clients", type=int, default=DEFAULT_CLIENTS)
+    parser.add_argument("--target-ms", type=float, default=10.0)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp()
+    try:
+        if args.db:
+            # Work on a copy; migrations add tables to it
+            path = os.path.join(work_dir, "UFC_Data.db")
+            shutil.copy(args.db, path)
+            engine = db_writer.configure_sqlite(create_engine(f"sqlite:///{path}"))
+            migrations.migrate(engine)
+        else:
+            start = time.perf_counter()
+            engine = synthetic_database(
+                os.path.join(work_dir, "UFC_Data.db"), args.fighters, args.fights
+            )
+            print(
+                f"Built {args.fighters} fighters / {args.fights} fights in "
+                f"{time.perf_counter() - start:.1f}s"
+            )
+
+        start = time.perf_counter()
+        service = fighter_compare.ComparisonService(engine)
+        print(f"Loaded the index in {(time.perf_counter() - start) * 1000:.0f} ms")
+        fighter_ids = np.array(sorted(service.index.fight_ranges))
+        if len(fighter_ids) < 2:
+            sys.exit("Need at least two fighters with stored fights")
+
+        results = {}
+        plan = request_plan(fighter_ids, args.requests)
+        results["api"] = percentiles(run_api(service, plan))
+        cache = service.cache
+        print(f"Cache hit rate {cache.hits / (cache.hits + cache.misses):.0%}")
+        server = fighter_compare.serve(service, port=0)
+        try:
+            results["http"] = percentiles(
+                run_http(
+                    server.server_address[1],
+                    request_plan(fighter_ids, args.requests, seed=2),
+                    args.clients,
+                )
+            )
+        finally:
+            server.shutdown()
+
+        print(pd.DataFrame(results).T.to_string())
+        invalidated = check_invalidation(service, engine)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    slow = [name for name, r in results.items() if r["p99_ms"] > args.target_ms]
+    if slow or not invalidated:
+        print(f"FAIL: p99 above {args.target_ms} ms for {', '.join(slow) or 'none'}")
+        sys.exit(1)
+    print(f"PASS: p99 under {args.target_ms} ms")
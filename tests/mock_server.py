@@ -0,0 +1,143 @@
+import collections
+import hashlib
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# Map ufcstats paths onto the saved HTML fixtures
+ROUTES = {
+    "/statistics/events/completed": "events_completed.html",
+    "/event-details/": "event_details.html",
+    "/fight-details/": "fight_details.html",
+    "/fighter-details/": "fighter_details.html",
+}
+
+
+def fixture_for(path):
+    path = path.split("?")[0]
+    for prefix, filename in ROUTES.items():
+        if path.startswith(prefix):
+            return os.path.join(FIXTURES_DIR, filename)
+    return None
+
+
+def throttle_status(server):
+    """
+    Decides whether to reject a request, imitating a site under load.
+
+    Returns:
+    int or None: 429 over the rate limit, 503 for a random error, else None.
+    """
+    with server.lock:
+        now = time.monotonic()
+        window = server.recent_requests
+        while window and now - window[0] > 1.0:
+            window.popleft()
+        if server.max_rate is not None and len(window) >= server.max_rate:
+            return 429
+        window.append(now)
+    if server.error_rate and random.random() < server.error_rate:
+        return 503
+    return None
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        fixture_path = fixture_for(self.path)
+        if fixture_path is None:
+            self.send_error(404)
+            return
+
+        status = throttle_status(self.server)
+        if status is not None:
+            with self.server.lock:
+                self.server.throttled_count += 1
+            self.send_response(status)
+            if status == 429:
+                self.send_header("Retry-After", "1")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        with self.server.lock:
+            self.server.request_count += 1
+        with open(fixture_path, "rb") as f:
+            body = f.read()
+
+        etag = '"%s"' % hashlib.md5(body).hexdigest()
+        if self.headers.get("If-None-Match") == etag:
+            with self.server.lock:
+                self.server.not_modified_count += 1
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(port=0, max_rate=None, error_rate=0.0, latency=0.0):
+    """
+    Serves the fixture corpus on localhost in a background thread.
+
+    Parameters:
+    port: Port to listen on (0 picks a free one).
+    max_rate: Requests per second served before answering 429 with Retry-After.
+    error_rate: Fraction of requests answered with a 503.
+    latency: Seconds added to every served page.
+
+    Returns:
+    tuple: (server, base_url) - call server.shutdown() when finished.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), FixtureHandler)
+    server.request_count = 0
+    server.throttled_count = 0
+    server.not_modified_count = 0
+    server.max_rate = max_rate
+    server.error_rate = error_rate
+    server.latency = latency
+    server.recent_requests = collections.deque()
+    server.lock = threading.Lock()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve the ufcstats fixtures")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--max-rate", type=float, help="Requests/s before 429s")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server, base_url = start_server(
+        args.port, args.max_rate, args.error_rate, args.latency
+    )
+    print(f"Serving fixtures on {base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
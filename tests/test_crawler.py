@@ -0,0 +1,73 @@
+import crawler
+import retry
+import ufc_parsers
+
+
+def test_every_page_is_delivered_once(server, base_url):
+    links = [f"{base_url}/fight-details/{i:016x}" for i in range(20)]
+    results = {}
+    requests_before = server.request_count
+
+    crawler.crawl_fight_pages(
+        links, lambda link, page: results.setdefault(link, []).append(page), 4
+    )
+
+    assert sorted(results) == sorted(links)
+    assert all(len(pages) == 1 for pages in results.values())
+    fight_details, sig_strikes = results[links[0]][0]
+    assert list(fight_details["FIGHTER"]) == ["Jack Hermansson", "Joe Pyfer"]
+    assert len(sig_strikes) == 2
+    assert server.request_count - requests_before == len(links)
+
+
+def test_fighter_profiles_are_fetched_once(server, base_url):
+    link = f"{base_url}/fighter-details/aa1e06c1ee5a7e2d"
+    profiles = []
+    requests_before = server.request_count
+
+    crawler.crawl_fighter_profiles(
+        [link, link, link], lambda link, profile: profiles.append(profile)
+    )
+
+    assert [profile["name"] for profile in profiles] == ["Jack Hermansson"]
+    assert server.request_count - requests_before == 1
+
+
+def test_failed_pages_go_to_handle_failure(base_url):
+    good = f"{base_url}/event-details/eaea0fc7b76525a8"
+    missing = f"{base_url}/no-such-page/1"
+    results, failures = [], []
+
+    crawler.crawl(
+        [good, missing],
+        ufc_parsers.parse_event_details,
+        lambda link, result: results.append(link),
+        handle_failure=lambda link, error: failures.append((link, error)),
+    )
+
+    assert results == [good]
+    [(link, failure)] = failures
+    assert link == missing
+    # A 404 is permanent, so it isn't retried
+    assert isinstance(failure, retry.ScrapeFailure)
+    assert failure.attempts == 1
+    assert not failure.transient
+
+
+def test_a_failed_write_goes_to_handle_failure(base_url):
+    link = f"{base_url}/event-details/eaea0fc7b76525a8"
+    failures = []
+
+    def handle_result(link, result):
+        raise ValueError("database is locked")
+
+    crawler.crawl(
+        [link],
+        ufc_parsers.parse_event_details,
+        handle_result,
+        handle_failure=lambda link, error: failures.append((link, error)),
+    )
+
+    [(failed_link, failure)] = failures
+    assert failed_link == link
+    assert failure.error_class == "ValueError"
@@ -0,0 +1,247 @@
+import pandas as pd
+import pytest
+from sqlalchemy import text
+
+import UFC_main_pull
+import db_writer
+import metrics
+import ufc_parsers
+
+EVENT_LINK = "http://ufcstats.com/event-details/eaea0fc7b76525a8"
+FIGHT_LINK = "http://ufcstats.com/fight-details/406f2aacd1d1faf9"
+
+
+@pytest.fixture
+def fight_page(fixture_html):
+    return ufc_parsers.parse_fight_page(
+        fixture_html("fight_details.html"), "http://ufcstats.com/fight-details/x"
+    )
+
+
+@pytest.fixture
+def event_page(fixture_html):
+    return ufc_parsers.parse_event_page(
+        fixture_html("event_details.html"), "0677", EVENT_LINK
+    )
+
+
+@pytest.fixture
+def card(engine, event_page):
+    # The card and its fights, as add_new_events leaves them before a crawl
+    fight_links, _ = event_page
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO All_Cards (card_link, title, eventID) "
+                "VALUES (:link, 'UFC Fight Night: Hermansson vs. Pyfer', '0677')"
+            ),
+            {"link": EVENT_LINK},
+        )
+        conn.execute(
+            text(
+                "INSERT INTO All_Fights (fight_link, card_link, eventID) "
+                "VALUES (:fight_link, :card_link, :eventID)"
+            ),
+            [{**row, "card_link": EVENT_LINK} for row in fight_links],
+        )
+    return engine
+
+
+def query(engine, sql, **params):
+    with engine.connect() as conn:
+        return conn.execute(text(sql), params).fetchall()
+
+
+def write_fight(engine, fight_page):
+    with db_writer.BufferedWriter(engine) as writer:
+        writer.add_fight_page(FIGHT_LINK, fight_page)
+
+
+def test_content_hash_depends_only_on_values(fight_page):
+    fight_details, sig_strikes = fight_page
+    page_hash = db_writer.content_hash(fight_page)
+
+    copies = (fight_details.copy(), sig_strikes.copy())
+    assert db_writer.content_hash(copies) == page_hash
+    corrected = fight_details.copy()
+    corrected.loc[0, "KD"] = 1
+    assert db_writer.content_hash((corrected, sig_strikes)) != page_hash
+
+
+def test_fight_page_is_written_and_marked(card, fight_page):
+    write_fight(card, fight_page)
+
+    rows = query(
+        card,
+        "SELECT FIGHTER, SIG_STR_SUCCESSFUL, SIG_STR_PCT, CTRL_SECONDS "
+        "FROM Fight_Details WHERE FIGHT_LINK = :link ORDER BY FIGHTER",
+        link=FIGHT_LINK,
+    )
+    assert [tuple(row) for row in rows] == [
+        ("Jack Hermansson", 121, 51.0, 188),
+        ("Joe Pyfer", 92, 36.0, 50),
+    ]
+    assert query(card, "SELECT count(*) FROM Significant_Strikes")[0][0] == 2
+    scraped = query(
+        card,
+        "SELECT details_scraped, content_hash FROM All_Fights WHERE fight_link = :link",
+        link=FIGHT_LINK,
+    )[0]
+    assert scraped.details_scraped
+    assert scraped.content_hash == db_writer.content_hash(fight_page)
+
+
+def test_fighters_get_stable_ids(card, fight_page, fixture_html):
+    write_fight(card, fight_page)
+
+    def fighter_ids(table):
+        rows = query(card, f"SELECT FIGHTER, FIGHTER_ID FROM {table} ORDER BY FIGHTER")
+        return [tuple(row) for row in rows]
+
+    ids = fighter_ids("Fight_Details")
+    # Fighter links are replaced by ids into Fighters
+    assert all(fighter_id is not None for _, fighter_id in ids)
+    assert fighter_ids("Significant_Strikes") == ids
+    assert query(card, "SELECT count(*) FROM Fighters")[0][0] == 2
+
+    fight_details, sig_strikes = fight_page
+    corrected = fight_details.copy()
+    corrected.loc[0, "KD"] = 1
+    write_fight(card, (corrected, sig_strikes))
+    assert fighter_ids("Fight_Details") == ids
+
+    hermansson_link = fight_details.loc[0, "FIGHTER_LINK"]
+    profile = ufc_parsers.parse_fighter_profile(fixture_html("fighter_details.html"))
+    for _ in range(2):
+        with db_writer.BufferedWriter(card) as writer:
+            writer.add_fighter_profile(hermansson_link, profile)
+
+    rows = query(
+        card,
+        "SELECT fighter_id, name, reach_inches, profile_scraped FROM Fighters "
+        "WHERE fighter_link = :link",
+        link=hermansson_link,
+    )
+    assert [tuple(row) for row in rows] == [(ids[0][1], "Jack Hermansson", 77.0, 1)]
+    assert query(card, "SELECT count(*) FROM Fighters")[0][0] == 2
+
+
+def test_rescraped_fight_is_upserted(card, fight_page):
+    write_fight(card, fight_page)
+    write_fight(card, fight_page)
+    assert query(card, "SELECT count(*) FROM Fight_Details")[0][0] == 2
+    assert query(card, "SELECT count(*) FROM Significant_Strikes")[0][0] == 2
+
+    # A stat correction overwrites the stored row instead of adding a copy
+    fight_details, sig_strikes = fight_page
+    corrected = fight_details.copy()
+    corrected.loc[0, "KD"] = 1
+    write_fight(card, (corrected, sig_strikes))
+    rows = query(card, "SELECT FIGHTER, KD FROM Fight_Details ORDER BY FIGHTER")
+    assert [tuple(row) for row in rows] == [("Jack Hermansson", 1), ("Joe Pyfer", 0)]
+
+
+def test_renamed_fighter_replaces_stale_row(card, fight_page):
+    write_fight(card, fight_page)
+
+    fight_details, sig_strikes = fight_page
+    renamed = fight_details.copy()
+    renamed.loc[1, "FIGHTER"] = "Joseph Pyfer"
+    write_fight(card, (renamed, sig_strikes))
+
+    rows = query(card, "SELECT FIGHTER FROM Fight_Details ORDER BY FIGHTER")
+    assert [row.FIGHTER for row in rows] == ["Jack Hermansson", "Joseph Pyfer"]
+
+
+def test_event_details_are_upserted(card, event_page):
+    _, event_details = event_page
+    for _ in range(2):
+        with db_writer.BufferedWriter(card) as writer:
+            writer.add_event_details(EVENT_LINK, event_details)
+
+    rows = query(
+        card,
+        "SELECT WIN, FIGHTER, STR, TIME_SECONDS FROM Event_Details "
+        "WHERE FIGHT_LINK = :link ORDER BY FIGHTER",
+        link=FIGHT_LINK,
+    )
+    assert [tuple(row) for row in rows] == [
+        ("WIN", "Jack Hermansson", 121, 300),
+        ("LOSS", "Joe Pyfer", 92, 300),
+    ]
+    assert query(card, "SELECT count(*) FROM Event_Details")[0][0] == 6
+    assert query(card, "SELECT details_scraped FROM All_Cards")[0][0]
+
+
+def test_pages_are_written_once_per_batch(card, fight_page, event_page):
+    writer = db_writer.BufferedWriter(card, batch_size=2)
+    writer.add_fight_page(FIGHT_LINK, fight_page)
+    # Nothing is written until the batch is full
+    assert query(card, "SELECT count(*) FROM Fight_Details")[0][0] == 0
+
+    writer.add_event_details(EVENT_LINK, event_page[1])
+    assert query(card, "SELECT count(*) FROM Fight_Details")[0][0] == 2
+    assert query(card, "SELECT count(*) FROM Event_Details")[0][0] == 6
+    assert query(card, "SELECT details_scraped FROM All_Cards")[0][0]
+    assert writer.pending_pages == 0
+    writer.close()
+
+
+def test_close_flushes_the_last_partial_batch(card, fight_page):
+    writer = db_writer.BufferedWriter(card, batch_size=50)
+    writer.add_fight_page(FIGHT_LINK, fight_page)
+    writer.close()
+    assert query(card, "SELECT count(*) FROM Fight_Details")[0][0] == 2
+
+
+def test_failure_is_recorded_until_the_page_is_written(card, fight_page):
+    with db_writer.BufferedWriter(card) as writer:
+        writer.add_failure("fight", FIGHT_LINK, ValueError("Totals table missing"))
+    failed = query(card, "SELECT page_type, error_class, transient FROM Failed_Links")
+    assert [tuple(row) for row in failed] == [("fight", "ValueError", 0)]
+
+    write_fight(card, fight_page)
+    assert query(card, "SELECT count(*) FROM Failed_Links")[0][0] == 0
+
+
+def test_frame_rows_binds_plain_values():
+    df = pd.DataFrame({"KD": pd.array([1, None], dtype="Int16")})
+    assert db_writer.frame_rows(df) == [{"p0": 1}, {"p0": None}]
+
+
+def test_rescrape_refetches_processed_fights(engine, server, base_url, monkeypatch):
+    links = [f"{base_url}/fight-details/{i:016x}" for i in range(3)]
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO All_Cards (card_link, details_scraped) "
+                "VALUES (:link, TRUE)"
+            ),
+            {"link": EVENT_LINK},
+        )
+        conn.execute(
+            text(
+                "INSERT INTO All_Fights (fight_link, card_link) "
+                "VALUES (:link, :card)"
+            ),
+            [{"link": link, "card": EVENT_LINK} for link in links],
+        )
+    # The fixture pages link to fighters on the live site
+    monkeypatch.setattr(UFC_main_pull, "get_unprofiled_fighter_links", lambda e: [])
+
+    def crawl(**options):
+        requests_before = server.request_count
+        UFC_main_pull.crawl_unprocessed(engine, cache=None, **options)
+        return server.request_count - requests_before
+
+    assert crawl() == 3
+    assert crawl() == 0
+
+    def unchanged():
+        return metrics.REGISTRY.summary()["counters"].get("unchanged_total", 0)
+
+    unchanged_before = unchanged()
+    assert crawl(rescrape=True) == 3
+    # Identical pages are fetched but not rewritten
+    assert unchanged() - unchanged_before == 3
+    assert query(engine, "SELECT count(*) FROM Fight_Details")[0][0] == 6
@@ -0,0 +1,45 @@
+import os
+
+import driver_pool
+import retry
+
+FIGHT_LINKS = [f"http://ufcstats.com/fight-details/{i:016x}" for i in range(5)]
+
+
+def dying_worker(worker_id, fight_links, results, driver_profile):
+    # Killed outright, so no end signal is ever sent
+    os._exit(3)
+
+
+def run_pool(monkeypatch):
+    monkeypatch.setattr(driver_pool, "WORKER_POLL_SECONDS", 0.2)
+    results, failures = [], []
+    driver_pool.run_driver_pool(
+        FIGHT_LINKS,
+        lambda link, page: results.append(link),
+        workers=2,
+        handle_failure=lambda link, failure: failures.append(failure),
+    )
+    return results, failures
+
+
+def test_workers_whose_chrome_fails_to_start_fail_their_links(monkeypatch):
+    monkeypatch.setenv("UFC_CHROMEDRIVER", os.devnull)
+
+    results, failures = run_pool(monkeypatch)
+
+    assert results == []
+    assert sorted(failure.link for failure in failures) == sorted(FIGHT_LINKS)
+    assert all(isinstance(failure, retry.ScrapeFailure) for failure in failures)
+    # Worth retrying once Chrome starts again
+    assert all(failure.transient for failure in failures)
+
+
+def test_dead_workers_do_not_hang_the_pool(monkeypatch):
+    monkeypatch.setattr(driver_pool, "worker_main", dying_worker)
+
+    results, failures = run_pool(monkeypatch)
+
+    assert results == []
+    assert sorted(failure.link for failure in failures) == sorted(FIGHT_LINKS)
+    assert "exited with code 3" in failures[0].message
@@ -0,0 +1,32 @@
+import multiprocessing
+import os
+
+import driver_profiles
+
+
+def cache_dir_argument(queue):
+    options = driver_profiles.chrome_options("lean")
+    queue.put([a for a in options.arguments if a.startswith("--disk-cache-dir=")])
+
+
+def test_lean_profile_is_opt_in():
+    options = driver_profiles.chrome_options()
+    assert driver_profiles.DEFAULT_PROFILE == "default"
+    assert options.page_load_strategy == "normal"
+    assert not any(a.startswith("--disk-cache-dir=") for a in options.arguments)
+
+
+def test_each_process_gets_its_own_disk_cache():
+    options = driver_profiles.chrome_options("lean")
+    assert "--headless=new" in options.arguments
+    assert options.page_load_strategy == "eager"
+    assert f"--disk-cache-dir={driver_profiles.disk_cache_dir()}" in options.arguments
+
+    # A driver pool worker is a separate process and must not share the cache
+    queue = multiprocessing.Queue()
+    worker = multiprocessing.Process(target=cache_dir_argument, args=(queue,))
+    worker.start()
+    [argument] = queue.get(timeout=10)
+    worker.join()
+    assert argument.endswith(os.sep + str(worker.pid))
+    assert argument != f"--disk-cache-dir={driver_profiles.disk_cache_dir()}"
@@ -0,0 +1,117 @@
+import pandas as pd
+import pytest
+from sqlalchemy import text
+
+import db_writer
+import fighter_career
+import ufc_parsers
+
+EVENT_LINK = "http://ufcstats.com/event-details/eaea0fc7b76525a8"
+FIGHT_LINK = "http://ufcstats.com/fight-details/406f2aacd1d1faf9"
+
+
+@pytest.fixture
+def card(engine, fixture_html):
+    fight_links, event_details = ufc_parsers.parse_event_page(
+        fixture_html("event_details.html"), "0677", EVENT_LINK
+    )
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO All_Cards (card_link, title, date, eventID) VALUES "
+                "(:link, 'UFC Fight Night: Hermansson vs. Pyfer', '2023-02-25', '0677')"
+            ),
+            {"link": EVENT_LINK},
+        )
+        conn.execute(
+            text(
+                "INSERT INTO All_Fights (fight_link, card_link, eventID) "
+                "VALUES (:fight_link, :card_link, :eventID)"
+            ),
+            [{**row, "card_link": EVENT_LINK} for row in fight_links],
+        )
+    with db_writer.BufferedWriter(engine) as writer:
+        writer.add_event_details(EVENT_LINK, event_details)
+    return engine
+
+
+def fighter_id(engine, name):
+    with engine.connect() as conn:
+        return conn.execute(
+            text("SELECT fighter_id FROM Fighters WHERE name = :name"), {"name": name}
+        ).scalar()
+
+
+def version(engine):
+    with engine.connect() as conn:
+        return fighter_career.data_version(conn)
+
+
+def fights(results, methods=None):
+    # FIGHTER_FIGHTS rows of fighter 1, one per result, oldest first
+    count = len(results)
+    rows = {
+        "fighter_id": [1] * count,
+        "fight_link": [f"fight-{i}" for i in range(count)],
+        "opponent_id": [2] * count,
+        "date": pd.date_range("2020-01-01", periods=count, freq="MS"),
+        "result": results,
+        "method": methods or ["U-DEC"] * count,
+        "round": [3] * count,
+        "time_seconds": [300] * count,
+    }
+    for column in fighter_career.TOTAL_COLUMNS[1:]:
+        rows[column] = [10] * count
+    # Knockdowns go up by one each fight, so averages show which fights count
+    rows["knockdowns"] = list(range(count))
+    return pd.DataFrame(rows)
+
+
+def test_written_fights_update_careers(card, fixture_html):
+    version_before = version(card)
+    fight_details, sig_strikes = ufc_parsers.parse_fight_page(
+        fixture_html("fight_details.html"), FIGHT_LINK
+    )
+    with db_writer.BufferedWriter(card) as writer:
+        writer.add_fight_page(FIGHT_LINK, (fight_details, sig_strikes))
+
+    hermansson = fighter_career.get_career(card, fighter_id(card, "Jack Hermansson"))
+    assert hermansson["wins"] == 1
+    assert hermansson["wins_decision"] == 1
+    assert hermansson["fight_seconds"] == 1500
+    assert hermansson["sig_strikes_absorbed"] == 92
+    assert hermansson["sig_strikes_landed_per_min"] == pytest.approx(4.84)
+    assert hermansson["sig_strike_defense"] == pytest.approx(1 - 92 / 250)
+    assert hermansson["last_fight_date"] == "2023-02-25"
+    assert fighter_career.get_career(card, fighter_id(card, "Joe Pyfer"))["losses"] == 1
+    assert version(card) > version_before
+
+    # A stat correction re-aggregates the fighters of that fight
+    corrected = fight_details.copy()
+    corrected.loc[0, "KD"] = 1
+    with db_writer.BufferedWriter(card) as writer:
+        writer.add_fight_page(FIGHT_LINK, (corrected, sig_strikes))
+    hermansson = fighter_career.get_career(card, fighter_id(card, "Jack Hermansson"))
+    assert hermansson["knockdowns"] == 1
+
+
+def test_draws_and_no_contests_are_other_results():
+    careers = fighter_career.career_frame(
+        fights(["WIN", "DRAW", "NC", "LOSS"], ["KO/TKO", "S-DEC", "Overturned", "SUB"])
+    )
+    career = careers.iloc[0]
+    assert (career["fights"], career["wins"], career["losses"]) == (4, 1, 1)
+    assert career["other_results"] == 2
+    assert career["wins_ko_tko"] == 1
+    assert career["losses_submission"] == 1
+    assert career["wins_decision"] == 0
+
+
+def test_recent_averages_cover_the_last_five_fights():
+    careers = fighter_career.career_frame(fights(["LOSS"] * 3 + ["WIN"] * 4))
+    career = careers.iloc[0]
+    assert career["recent_fights"] == fighter_career.RECENT_FIGHTS
+    # The last five of seven fights had 2 to 6 knockdowns
+    assert career["recent_avg_knockdowns"] == pytest.approx(4.0)
+    assert career["recent_win_rate"] == pytest.approx(0.8)
+    assert career["knockdowns"] == sum(range(7))
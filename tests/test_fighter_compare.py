@@ -0,0 +1,125 @@
+import time
+
+import pandas as pd
+import pytest
+from sqlalchemy import text
+
+import db_writer
+import fighter_career
+import fighter_compare
+import ufc_parsers
+
+EVENT_LINK = "http://ufcstats.com/event-details/eaea0fc7b76525a8"
+FIGHT_LINK = "http://ufcstats.com/fight-details/406f2aacd1d1faf9"
+
+
+@pytest.fixture
+def service(engine, fixture_html):
+    # One scraped fight between Jack Hermansson and Joe Pyfer
+    fight_links, event_details = ufc_parsers.parse_event_page(
+        fixture_html("event_details.html"), "0677", EVENT_LINK
+    )
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO All_Cards (card_link, title, date, eventID) VALUES "
+                "(:link, 'UFC Fight Night: Hermansson vs. Pyfer', '2023-02-25', '0677')"
+            ),
+            {"link": EVENT_LINK},
+        )
+        conn.execute(
+            text(
+                "INSERT INTO All_Fights (fight_link, card_link, eventID) "
+                "VALUES (:fight_link, :card_link, :eventID)"
+            ),
+            [{**row, "card_link": EVENT_LINK} for row in fight_links],
+        )
+    fight_page = ufc_parsers.parse_fight_page(
+        fixture_html("fight_details.html"), FIGHT_LINK
+    )
+    with db_writer.BufferedWriter(engine) as writer:
+        writer.add_event_details(EVENT_LINK, event_details)
+        writer.add_fight_page(FIGHT_LINK, fight_page)
+    return fighter_compare.ComparisonService(engine, check_interval=0)
+
+
+def test_compare_two_fighters(service):
+    result = service.compare("Jack Hermansson", "joe pyfer")
+
+    hermansson, pyfer = result["fighters"]
+    assert (hermansson["name"], pyfer["name"]) == ("Jack Hermansson", "Joe Pyfer")
+    assert result["differences"]["wins"] == 1
+    assert result["differences"]["sig_strikes_landed_per_min"] == pytest.approx(
+        (121 - 92) / 25
+    )
+    [fight] = result["head_to_head"]
+    assert (fight["fight_link"], fight["result"]) == (FIGHT_LINK, "WIN")
+    [pyfer_fight] = result["recent_fights"][1]
+    assert pyfer_fight["opponent"] == "Jack Hermansson"
+
+    # Fighters can also be looked up by id or fighter-details link
+    by_id = service.compare(hermansson["fighter_id"], pyfer["fighter_link"])
+    assert by_id == result
+
+
+def test_cached_results_are_copies(service):
+    first = service.compare("Jack Hermansson", "Joe Pyfer")
+    first["fighters"][0]["wins"] = 99
+    first["recent_fights"][0].clear()
+
+    second = service.compare("Jack Hermansson", "Joe Pyfer")
+    assert service.cache.hits == 1
+    assert second["fighters"][0]["wins"] == 1
+    assert len(second["recent_fights"][0]) == 1
+
+
+def test_unknown_fighters_raise_key_error(service):
+    with pytest.raises(KeyError):
+        service.compare("Jack Hermansson", "Nobody")
+    with pytest.raises(KeyError):
+        service.last_fights(123456)
+
+
+def test_a_new_data_version_reloads_the_index(service, engine):
+    service.compare("Jack Hermansson", "Joe Pyfer")
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "UPDATE Fighters SET name = 'Jack the Joker' "
+                "WHERE name = 'Jack Hermansson'"
+            )
+        )
+        fighter_career.mark_changed(conn)
+
+    # The reload runs in the background; the old index answers meanwhile
+    service.refresh_if_changed()
+    while service.reloading:
+        time.sleep(0.01)
+    assert service.last_fights("Jack the Joker")["name"] == "Jack the Joker"
+    assert len(service.cache.entries) == 0
+
+
+def test_last_fights_are_most_recent_first():
+    fighters = pd.DataFrame(
+        {
+            "fighter_id": [1, 2, 3],
+            "fighter_link": ["a", "b", "c"],
+            "name": ["A", "B", "B"],
+        }
+    )
+    fights = pd.DataFrame(
+        {column: [None] * 3 for column in fighter_compare.FIGHT_COLUMNS}
+    )
+    fights["fighter_id"] = [1, 1, 1]
+    fights["opponent_id"] = [2, 3, 2]
+    fights["date"] = pd.to_datetime(["2021-01-01", "2023-01-01", "2022-01-01"])
+    fights["fight_link"] = ["f1", "f3", "f2"]
+    index = fighter_compare.FighterIndex(
+        fighters, pd.DataFrame({"fighter_id": pd.Series([], dtype=int)}), fights
+    )
+
+    assert [f["fight_link"] for f in index.last_fights(1, 2)] == ["f3", "f2"]
+    assert [f["fight_link"] for f in index.head_to_head(1, 2)] == ["f1", "f2"]
+    # Two fighters share a name, so it can't pick one
+    with pytest.raises(ValueError):
+        index.resolve("B")
@@ -0,0 +1,98 @@
+import json
+import urllib.request
+
+import pytest
+
+import metrics
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(metrics.time, "perf_counter", clock)
+    return clock
+
+
+def test_nested_stages_are_timed_exclusively(clock):
+    registry = metrics.Registry()
+    with registry.timed("extract"):
+        clock.now += 0.002
+        with registry.timed("transform"):
+            clock.now += 0.003
+        clock.now += 0.001
+
+    stages = registry.snapshot()["histograms"]
+    assert stages["extract"]["sum"] == pytest.approx(0.003)
+    assert stages["transform"]["sum"] == pytest.approx(0.003)
+    # 3 ms falls in the 5 ms bucket
+    assert stages["transform"]["buckets"][metrics.BUCKETS.index(0.005)] == 1
+    assert registry.in_flight == {"extract": 0, "transform": 0}
+
+
+def test_worker_snapshots_merge_into_the_parent():
+    worker = metrics.Registry()
+    worker.observe("fetch", 0.2)
+    worker.inc("retries_total", page_type="fight")
+    # Snapshots cross a process boundary, where tuples can come back as lists
+    state = json.loads(json.dumps(worker.snapshot(reset=True)))
+    assert worker.snapshot() == {"histograms": {}, "counters": []}
+
+    parent = metrics.Registry()
+    parent.inc("retries_total", page_type="fight")
+    parent.merge(state)
+    summary = parent.summary()
+    assert summary["counters"] == {'retries_total{page_type="fight"}': 2}
+    assert summary["stages"]["fetch"]["count"] == 1
+
+
+def test_prometheus_buckets_are_cumulative():
+    registry = metrics.Registry()
+    registry.observe("write", 0.004)
+    registry.observe("write", 20)
+    registry.inc("pages_total", 3)
+
+    lines = registry.prometheus_text().splitlines()
+    assert 'ufc_scrape_stage_seconds_bucket{stage="write",le="0.001"} 0' in lines
+    assert 'ufc_scrape_stage_seconds_bucket{stage="write",le="0.005"} 1' in lines
+    assert 'ufc_scrape_stage_seconds_bucket{stage="write",le="+Inf"} 2' in lines
+    assert 'ufc_scrape_stage_seconds_count{stage="write"} 2' in lines
+    assert "ufc_scrape_pages_total 3" in lines
+
+
+def test_quantiles_interpolate_within_a_bucket():
+    histogram = metrics.empty_histogram()
+    # Ten observations, all in the (0.05, 0.1] bucket
+    histogram["buckets"][metrics.BUCKETS.index(0.1)] = 10
+    histogram["count"] = 10
+    assert metrics.bucket_quantile(histogram, 0.5) == pytest.approx(0.075)
+
+
+def test_metrics_endpoint_serves_the_global_registry():
+    metrics.REGISTRY.reset()
+
+    @metrics.stage("extract")
+    def parse():
+        metrics.inc("pages_total")
+
+    parse()
+    server = metrics.serve(0, host="127.0.0.1")
+    try:
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        with urllib.request.urlopen(f"{base}/metrics") as response:
+            body = response.read().decode()
+        with urllib.request.urlopen(f"{base}/summary") as response:
+            summary = json.load(response)
+    finally:
+        server.shutdown()
+        metrics.REGISTRY.reset()
+
+    assert "ufc_scrape_pages_total 1" in body.splitlines()
+    assert summary["stages"]["extract"]["count"] == 1
@@ -0,0 +1,141 @@
+import os
+import shutil
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.exc import IntegrityError
+
+import migrations
+from conftest import TESTS_DIR
+
+LEGACY_DB = os.path.join(TESTS_DIR, "..", "connectors", "UFC_Data.db")
+LATEST_VERSION = migrations.MIGRATIONS[-1][0]
+
+
+@pytest.fixture(scope="module")
+def legacy(tmp_path_factory):
+    # The checked-in database as the Excel pipeline built it, migrated once
+    path = tmp_path_factory.mktemp("legacy") / "UFC_Data.db"
+    shutil.copy(LEGACY_DB, path)
+    engine = create_engine(f"sqlite:///{path}")
+    migrations.migrate(engine)
+    yield engine
+    engine.dispose()
+
+
+def query(engine, sql):
+    with engine.connect() as conn:
+        return conn.execute(text(sql)).fetchall()
+
+
+def scalar(engine, sql):
+    return query(engine, sql)[0][0]
+
+
+def test_versions_are_in_order():
+    versions = [version for version, _, _ in migrations.MIGRATIONS]
+    assert versions == list(range(1, len(versions) + 1))
+
+
+def test_fresh_database_reaches_latest_version(engine):
+    assert migrations.current_version(engine) == LATEST_VERSION
+    tables = set(inspect(engine).get_table_names())
+    assert {"All_Cards", "All_Fights", "Fighters", "Event_Details"} <= tables
+    # Nothing left to apply the second time
+    assert migrations.migrate(engine) == []
+
+
+def test_legacy_database_is_upgraded(legacy):
+    assert migrations.current_version(legacy) == LATEST_VERSION
+    unique = {
+        index["name"]
+        for table in ["Event_Details", "Fight_Details", "Significant_Strikes"]
+        for index in inspect(legacy).get_indexes(table)
+        if index["unique"]
+    }
+    assert unique == {
+        "ux_event_details_fight_fighter",
+        "ux_fight_details_fight_fighter",
+        "ux_significant_strikes_fight_fighter",
+    }
+    # Exact duplicate rows are removed; tournament rematches are kept
+    assert scalar(legacy, "SELECT count(*) FROM Event_Details") == 15014
+    # Every event is scraped again for its results
+    assert scalar(legacy, "SELECT count(*) FROM All_Cards WHERE details_scraped") == 0
+
+
+def test_legacy_values_are_numeric(legacy):
+    row = query(
+        legacy,
+        "SELECT KD, typeof(KD) AS kd_type, SIG_STR_PCT, SIG_STR_SUCCESSFUL, "
+        "SIG_STR_ATTEMPTS, CTRL_SECONDS FROM Fight_Details "
+        "WHERE SIG_STR = '121 of 235' LIMIT 1",
+    )[0]
+    assert tuple(row) == (0, "integer", 51.0, 121, 235, 188)
+
+    types = query(legacy, "SELECT DISTINCT typeof(KD) FROM Event_Details")
+    assert {row[0] for row in types} == {"integer", "null"}
+    # ufcstats shows "--" where a stat wasn't recorded
+    assert scalar(legacy, "SELECT count(*) FROM Event_Details WHERE STR = '--'") == 0
+    assert query(
+        legacy,
+        "SELECT DISTINCT typeof(SIG_STR_PCT) FROM Significant_Strikes "
+        "WHERE SIG_STR_PCT IS NOT NULL",
+    ) == [("real",)]
+
+
+def test_target_stops_early(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'partial.db'}")
+    assert migrations.migrate(engine, target=3) == [1, 2, 3]
+    assert migrations.current_version(engine) == 3
+
+
+def test_a_failing_migration_is_not_recorded(engine, monkeypatch):
+    def broken(conn):
+        insert = text("INSERT INTO All_Cards (card_link) VALUES ('x')")
+        conn.execute(insert)
+        conn.execute(insert)
+
+    broken_migration = (LATEST_VERSION + 1, "broken", broken)
+    monkeypatch.setattr(
+        migrations, "MIGRATIONS", migrations.MIGRATIONS + [broken_migration]
+    )
+    # Only a clash on the version row means another process got there first
+    with pytest.raises(IntegrityError):
+        migrations.migrate(engine)
+    assert migrations.current_version(engine) == LATEST_VERSION
+    assert scalar(engine, "SELECT count(*) FROM All_Cards") == 0
+
+
+def test_tournament_rows_survive_deduplication(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'tournament.db'}")
+    migrations.migrate(engine, target=3)
+    link = "http://ufcstats.com/fight-details/406f2aacd1d1faf9"
+    rows = [
+        # Royce Gracie fought three times at UFC 1, before fight links were kept
+        ("UFC 1: The Beginning", "Royce Gracie", 0, None),
+        ("UFC 1: The Beginning", "Royce Gracie", 1, None),
+        ("UFC 1: The Beginning", "Royce Gracie", 2, None),
+        # An exact copy from a second run
+        ("UFC 1: The Beginning", "Royce Gracie", 2, None),
+        # A linked fight scraped twice, the second time after a correction
+        ("UFC Fight Night", "Jack Hermansson", 0, link),
+        ("UFC Fight Night", "Jack Hermansson", 1, link),
+    ]
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                'INSERT INTO Fight_Details ("EVENT_TITLE", "FIGHTER", "KD", '
+                '"FIGHT_LINK") VALUES (:title, :fighter, :kd, :link)'
+            ),
+            [dict(zip(["title", "fighter", "kd", "link"], row)) for row in rows],
+        )
+
+    assert migrations.migrate(engine, target=4) == [4]
+    kept = query(engine, 'SELECT "FIGHTER", "KD" FROM Fight_Details ORDER BY rowid')
+    assert [tuple(row) for row in kept] == [
+        ("Royce Gracie", 0),
+        ("Royce Gracie", 1),
+        ("Royce Gracie", 2),
+        ("Jack Hermansson", 1),
+    ]
@@ -0,0 +1,97 @@
+import glob
+import json
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+import page_cache
+from ufc_http import fetch_html, init_session
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return page_cache.PageCache(str(tmp_path / "cache"))
+
+
+def age_entry(cache, url):
+    entry = cache.get_entry(url)
+    entry["fetched_at"] = 0
+    page_cache.atomic_write(cache.entry_path(url), json.dumps(entry).encode("utf-8"))
+
+
+def test_fresh_pages_are_served_from_disk(server, base_url, cache):
+    session = init_session(cache=cache)
+    url = f"{base_url}/statistics/events/completed?page=all"
+    requests_before = server.request_count
+
+    first = fetch_html(session, url)
+    assert fetch_html(session, url) == first
+    assert server.request_count - requests_before == 1
+
+
+def test_stale_pages_are_revalidated(server, base_url, cache):
+    session = init_session(cache=cache)
+    url = f"{base_url}/statistics/events/completed?page=all"
+    body = fetch_html(session, url)
+    entry = cache.get_entry(url)
+    assert entry["etag"]
+
+    # Age the entry past its TTL; the unchanged page answers 304
+    age_entry(cache, url)
+    not_modified_before = server.not_modified_count
+    assert fetch_html(session, url) == body
+    assert server.not_modified_count - not_modified_before == 1
+    assert cache.get_entry(url)["fetched_at"] > 0
+
+
+def test_settled_fight_pages_never_expire(server, base_url, tmp_path):
+    settled = f"{base_url}/fight-details/0000000000000001"
+    recent = f"{base_url}/fight-details/0000000000000002"
+    cache = page_cache.PageCache(
+        str(tmp_path / "cache"),
+        event_dates={
+            settled: datetime(2019, 3, 16),
+            recent: datetime.now() - timedelta(days=3),
+        },
+    )
+    session = init_session(cache=cache)
+    for url in (settled, recent):
+        fetch_html(session, url)
+        age_entry(cache, url)
+
+    requests_before = server.request_count
+    fetch_html(session, settled)
+    assert server.request_count == requests_before
+    # Recent events can still get stat corrections, so they are revalidated
+    fetch_html(session, recent)
+    assert server.request_count - requests_before == 1
+
+
+def test_undated_event_pages_are_treated_as_recent():
+    url = "http://ufcstats.com/event-details/eaea0fc7b76525a8"
+    assert page_cache.ttl_for(url) == page_cache.RECENT_EVENT_TTL
+    assert page_cache.ttl_for(url, datetime(2001, 5, 4)) is None
+
+
+def test_identical_bodies_are_stored_once(base_url, cache):
+    session = init_session(cache=cache)
+    for i in range(3):
+        fetch_html(session, f"{base_url}/fight-details/{i:016x}")
+
+    bodies = glob.glob(os.path.join(cache.directory, "bodies", "*", "*.z"))
+    entries = glob.glob(os.path.join(cache.directory, "urls", "*", "*.json"))
+    assert len(bodies) == 1
+    assert len(entries) == 3
+
+
+def test_replay_only_never_touches_the_network(server, base_url, cache):
+    url = f"{base_url}/fight-details/406f2aacd1d1faf9"
+    body = fetch_html(init_session(cache=cache), url)
+
+    replay = init_session(cache=page_cache.PageCache(cache.directory, replay_only=True))
+    requests_before = server.request_count
+    assert fetch_html(replay, url) == body
+    with pytest.raises(page_cache.CacheMissError):
+        fetch_html(replay, f"{base_url}/fight-details/ffffffffffffffff")
+    assert server.request_count == requests_before
@@ -0,0 +1,59 @@
+import os
+
+import pandas as pd
+
+import parquet_store
+
+
+def strikes(dates, head):
+    return pd.DataFrame(
+        {
+            "FIGHTER": [f"Fighter {i}" for i in range(len(dates))],
+            "HEAD_SUCCESSFUL": head,
+            "EVENT_TITLE": ["UFC"] * len(dates),
+            "date": dates,
+        }
+    )
+
+
+def test_rows_are_partitioned_by_event_month(tmp_path):
+    df = strikes(
+        ["March 18, 2023", "March 25, 2023", "April 08, 2023", None], [1, 2, 3, 4]
+    )
+    # The undated row is skipped
+    assert parquet_store.write_table(df, "strikes", tmp_path) == 3
+
+    partitions = sorted(os.listdir(tmp_path / "strikes" / "year=2023"))
+    assert partitions == ["month=3", "month=4"]
+
+
+def test_reads_load_only_the_requested_partition_and_columns(tmp_path):
+    df = strikes(["March 18, 2023", "April 08, 2023", "May 13, 2022"], [1, 2, 3])
+    parquet_store.write_table(df, "strikes", tmp_path)
+
+    march = parquet_store.read_table(
+        "strikes", tmp_path, columns=["HEAD_SUCCESSFUL"], year=2023, month=3
+    )
+    assert list(march.columns) == ["HEAD_SUCCESSFUL"]
+    assert list(march["HEAD_SUCCESSFUL"]) == [1]
+
+    season = parquet_store.read_table("strikes", tmp_path, year=2023)
+    assert sorted(season["HEAD_SUCCESSFUL"]) == [1, 2]
+
+
+def test_reexport_replaces_only_the_months_written(tmp_path):
+    parquet_store.write_table(
+        strikes(["March 18, 2023", "April 08, 2023"], [1, 2]), "strikes", tmp_path
+    )
+    parquet_store.write_table(strikes(["March 18, 2023"], [10]), "strikes", tmp_path)
+
+    df = parquet_store.read_table("strikes", tmp_path).sort_values("month")
+    assert list(df["HEAD_SUCCESSFUL"]) == [10, 2]
+
+
+def test_mixed_text_and_numbers_are_written_as_strings(tmp_path):
+    # Legacy rows can hold "--" where newer rows hold numbers
+    df = strikes(["March 18, 2023", "March 25, 2023"], [5, "--"])
+    parquet_store.write_table(df, "strikes", tmp_path)
+    values = parquet_store.read_table("strikes", tmp_path)["HEAD_SUCCESSFUL"]
+    assert sorted(values) == ["--", "5"]
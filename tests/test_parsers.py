@@ -0,0 +1,171 @@
+import pandas as pd
+
+import UFC_main_pull
+import ufc_parsers
+import ufc_schema
+from ufc_http import init_session
+
+BASE_URL = "http://ufcstats.com"
+FIGHT_LINK = f"{BASE_URL}/fight-details/406f2aacd1d1faf9"
+
+
+def test_parse_cards(fixture_html):
+    cards_df = ufc_parsers.parse_cards(
+        fixture_html("events_completed.html"), f"{BASE_URL}/statistics/events/completed"
+    )
+
+    # Newest event first, numbered down from the number of events
+    assert list(cards_df["title"]) == [
+        "UFC Fight Night: Hermansson vs. Pyfer",
+        "UFC Fight Night: Dolidze vs. Imavov",
+        "UFC 297: Strickland vs. Du Plessis",
+    ]
+    assert list(cards_df["eventID"]) == ["0003", "0002", "0001"]
+    assert cards_df["date"].iloc[0] == pd.Timestamp("2024-02-10")
+    assert cards_df["location"].iloc[2] == "Toronto, Ontario, Canada"
+    assert cards_df["card_link"].iloc[0].startswith(f"{BASE_URL}/event-details/")
+
+
+def test_http_backend_scrapes_cards(base_url, fixture_html):
+    session = init_session()
+    try:
+        cards_df = UFC_main_pull.scrape_cards(
+            session, f"{base_url}/statistics/events/completed?page=all"
+        )
+    finally:
+        UFC_main_pull.close_backend(session)
+
+    # The HTTP backend reads the same cards as parsing the saved page
+    expected = ufc_parsers.parse_cards(fixture_html("events_completed.html"), base_url)
+    pd.testing.assert_frame_equal(cards_df, expected)
+
+
+def test_parse_event_page(fixture_html):
+    fight_links, event_details = ufc_parsers.parse_event_page(
+        fixture_html("event_details.html"), "0677", f"{BASE_URL}/event-details/x"
+    )
+
+    # Every row links to its fight twice; each fight is listed once
+    assert [row["fight_link"] for row in fight_links] == [
+        FIGHT_LINK,
+        f"{BASE_URL}/fight-details/25259e230be9cdc9",
+        f"{BASE_URL}/fight-details/9b9e2f0b7c6d5a41",
+    ]
+    assert {row["eventID"] for row in fight_links} == {"0677"}
+
+    assert len(event_details) == 6
+    assert list(event_details["W/L"]) == ["WIN", "LOSS", "WIN", "LOSS", "NC", "NC"]
+    assert list(event_details["Fighter"][:2]) == ["Jack Hermansson", "Joe Pyfer"]
+    assert list(event_details["STR"][:2]) == [121, 92]
+    assert list(event_details["Round"][:2]) == [5, 5]
+    assert list(event_details["Time_SECONDS"]) == [300, 300, 79, 79, 300, 300]
+    assert list(event_details["FIGHT_LINK"][:2]) == [FIGHT_LINK, FIGHT_LINK]
+    assert event_details["FIGHTER_LINK"].str.contains("fighter-details").all()
+    assert str(event_details["KD"].dtype) == "Int16"
+
+
+def test_parse_event_details_matches_event_page(fixture_html):
+    html = fixture_html("event_details.html")
+    _, from_page = ufc_parsers.parse_event_page(html, "0677", BASE_URL)
+    pd.testing.assert_frame_equal(
+        ufc_parsers.parse_event_details(html, BASE_URL), from_page
+    )
+
+
+def test_event_pages_are_yielded_one_card_at_a_time(server, base_url):
+    cards_df = pd.DataFrame(
+        {
+            "card_link": [f"{base_url}/event-details/{i:016x}" for i in range(3)],
+            "eventID": ["0677", "0678", "0679"],
+        }
+    )
+    session = init_session()
+    requests_before = server.request_count
+    try:
+        pages = UFC_main_pull.scrape_event_pages(session, cards_df)
+        fights_df, event_details = next(pages)
+        # Nothing past the first card has been fetched yet
+        assert server.request_count - requests_before == 1
+        assert list(fights_df["eventID"].unique()) == ["0677"]
+        assert len(event_details) == 6
+        assert [df["eventID"].iloc[0] for df, _ in pages] == ["0678", "0679"]
+    finally:
+        UFC_main_pull.close_backend(session)
+
+
+def test_draws_are_not_wins_or_losses():
+    row = [
+        ["draw"],
+        ["Fighter A", "Fighter B"],
+        ["0", "0"],
+        ["40", "41"],
+        ["1", "1"],
+        ["0", "0"],
+        ["Lightweight"],
+        ["S-DEC"],
+        ["3"],
+        ["5:00"],
+    ]
+    event_details = ufc_parsers.build_event_details_frame([row], "UFC Test")
+    assert list(event_details["W/L"]) == ["DRAW", "DRAW"]
+
+
+def test_parse_fight_page(fixture_html):
+    fight_details, sig_strikes = ufc_parsers.parse_fight_page(
+        fixture_html("fight_details.html"), f"{BASE_URL}/fight-details/x"
+    )
+
+    assert list(fight_details["FIGHTER"]) == ["Jack Hermansson", "Joe Pyfer"]
+    hermansson = fight_details.iloc[0]
+    assert hermansson["SIG_STR_SUCCESSFUL"] == 121
+    assert hermansson["SIG_STR_ATTEMPTS"] == 235
+    assert hermansson["SIG_STR_PCT"] == 51.0
+    assert hermansson["TD_SUCCESSFUL"] == 1
+    assert hermansson["TD_ATTEMPTS"] == 2
+    assert hermansson["CTRL_SECONDS"] == 188
+    assert hermansson["EVENT_TITLE"] == "UFC Fight Night: Hermansson vs. Pyfer"
+
+    assert list(sig_strikes["HEAD_SUCCESSFUL"]) == [74, 56]
+    assert list(sig_strikes["GROUND_ATTEMPTS"]) == [10, 0]
+    assert list(sig_strikes["FIGHTER_LINK"]) == list(fight_details["FIGHTER_LINK"])
+
+
+def test_one_fetch_per_fight_page(server, base_url):
+    session = init_session()
+    requests_before = server.request_count
+    try:
+        fight_details, sig_strikes = UFC_main_pull.scrape_fight_page(
+            session, f"{base_url}/fight-details/406f2aacd1d1faf9"
+        )
+    finally:
+        UFC_main_pull.close_backend(session)
+
+    # Both tables come from the same page load
+    assert server.request_count - requests_before == 1
+    assert list(fight_details["FIGHTER"]) == list(sig_strikes["FIGHTER"])
+
+
+def test_parse_fighter_profile(fixture_html):
+    profile = ufc_parsers.parse_fighter_profile(fixture_html("fighter_details.html"))
+    assert profile == {
+        "name": "Jack Hermansson",
+        "height_inches": 73.0,
+        "reach_inches": 77.0,
+        "stance": "Orthodox",
+        "dob": "1988-06-10",
+    }
+
+
+def test_typed_frame_blanks_become_null():
+    df = ufc_schema.typed_frame(
+        {"KD": ["--"], "SIG_STR": ["---"], "SIG_STR_PCT": ["---"], "CTRL": ["--"]},
+        ufc_schema.FIGHT_DETAILS_SCHEMA,
+    )
+    assert df.isna().all().all()
+    assert list(df.columns) == [
+        "KD",
+        "SIG_STR_SUCCESSFUL",
+        "SIG_STR_ATTEMPTS",
+        "SIG_STR_PCT",
+        "CTRL_SECONDS",
+    ]
@@ -0,0 +1,75 @@
+import time
+
+import rate_limit
+
+
+def limiter(rate=4.0, **kwargs):
+    return rate_limit.AdaptiveRateLimiter(rate=rate, log_interval=0, **kwargs)
+
+
+def request(limiter, latency=0.05, status=200, retry_after=None):
+    limiter.acquire()
+    limiter.record(latency, status, retry_after)
+
+
+def test_healthy_responses_raise_rate_and_concurrency():
+    rl = limiter()
+    for _ in range(3):
+        request(rl)
+    # Slow start adds one request/s and one slot per response
+    assert rl.rate == 7.0
+    assert rl.concurrency == 7.0
+    assert rl.in_flight == 0
+
+
+def test_throttling_halves_rate_once_per_cooldown():
+    rl = limiter(rate=8.0)
+    request(rl, status=429)
+    assert rl.rate == 4.0
+    assert not rl.slow_start
+    # A burst from the same overload doesn't back off again
+    request(rl, status=429)
+    assert rl.rate == 4.0
+    assert rl.throttled == 2
+
+
+def test_timeouts_back_off():
+    rl = limiter(rate=8.0)
+    request(rl, status=None)
+    assert rl.rate == 4.0
+
+
+def test_rate_never_drops_below_minimum():
+    rl = limiter(rate=0.6, min_rate=0.5)
+    request(rl, status=429)
+    assert rl.rate == 0.5
+
+
+def test_isolated_server_errors_are_tolerated():
+    rl = limiter(rate=8.0)
+    for _ in range(19):
+        rl.recent_errors.append(False)
+    # Up to ERROR_TOLERANCE of the last twenty responses may be errors
+    for _ in range(2):
+        request(rl, status=503)
+    assert rl.rate == 8.0
+    request(rl, status=503)
+    assert rl.rate == 4.0
+
+
+def test_latency_spike_backs_off():
+    rl = limiter(rate=8.0)
+    request(rl, latency=0.05)
+    rate = rl.rate
+    for _ in range(10):
+        request(rl, latency=2.0)
+    assert rl.rate < rate
+
+
+def test_retry_after_pauses_requests():
+    rl = limiter()
+    before = time.monotonic()
+    request(rl, status=429, retry_after="0.2")
+    assert rl.paused_until >= before + 0.2
+    rl.acquire()
+    assert time.monotonic() >= before + 0.2
@@ -0,0 +1,98 @@
+import json
+
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+from sqlalchemy import create_engine, text
+
+import record_sinks
+
+
+class ChunkRecorder(record_sinks.RecordSink):
+    def __init__(self, chunk_size):
+        super().__init__(chunk_size)
+        self.chunks = []
+
+    def write_chunk(self, table, df):
+        self.chunks.append((table, len(df)))
+
+
+def fights(start, count):
+    return [
+        {"fight_link": f"http://ufcstats.com/fight-details/{i}", "eventID": "0677"}
+        for i in range(start, start + count)
+    ]
+
+
+def test_rows_are_written_in_chunks():
+    sink = ChunkRecorder(chunk_size=4)
+    sink.write("All_Fights", fights(0, 3))
+    assert sink.chunks == []
+
+    sink.write("All_Fights", fights(3, 2))
+    sink.write("All_Cards", [{"title": "UFC 300"}])
+    sink.write("All_Fights", fights(5, 1))
+    # Buffers are flushed per table, and close writes the partial chunks
+    assert sink.chunks == [("All_Fights", 5)]
+    sink.close()
+    assert sorted(sink.chunks) == [
+        ("All_Cards", 1),
+        ("All_Fights", 1),
+        ("All_Fights", 5),
+    ]
+    assert sink.rows_written == {"All_Fights": 6, "All_Cards": 1}
+
+
+def test_write_all_drains_an_iterator():
+    with ChunkRecorder(chunk_size=100) as sink:
+        sink.write_all(("All_Fights", fights(i, 1)) for i in range(3))
+        sink.write("All_Fights", [])
+    assert sink.chunks == [("All_Fights", 3)]
+
+
+@pytest.mark.parametrize("kind", ["ndjson", "sqlite", "parquet"])
+def test_every_sink_keeps_all_rows(kind, tmp_path):
+    path = tmp_path / ("out.db" if kind == "sqlite" else "out")
+    with record_sinks.open_sink(kind, str(path), chunk_size=2) as sink:
+        sink.write("All_Fights", fights(0, 3))
+        sink.write("All_Fights", fights(3, 2))
+
+    if kind == "ndjson":
+        with open(path / "All_Fights.ndjson", encoding="utf-8") as f:
+            links = [json.loads(line)["fight_link"] for line in f]
+    elif kind == "sqlite":
+        engine = create_engine(f"sqlite:///{path}")
+        with engine.connect() as conn:
+            rows = conn.execute(text("SELECT fight_link FROM All_Fights")).fetchall()
+        engine.dispose()
+        links = [row[0] for row in rows]
+    else:
+        parquet = pq.ParquetFile(path / "All_Fights.parquet")
+        # One row group per chunk
+        assert parquet.metadata.num_row_groups == 2
+        links = parquet.read().column("fight_link").to_pylist()
+
+    assert links == [row["fight_link"] for row in fights(0, 5)]
+
+
+def test_parquet_schema_is_declared_not_inferred(tmp_path):
+    # The first chunk's FIGHTER_LINK is all null; later chunks must still fit
+    with record_sinks.ParquetSink(str(tmp_path), chunk_size=1) as sink:
+        sink.write("Significant_Strikes", [{"FIGHTER": "A", "FIGHTER_LINK": None}])
+        sink.write(
+            "Significant_Strikes",
+            [{"FIGHTER": "B", "FIGHTER_LINK": "http://ufcstats.com/fighter-details/b"}],
+        )
+
+    table = pq.read_table(tmp_path / "Significant_Strikes.parquet")
+    assert table.schema.field("FIGHTER_LINK").type == "string"
+    assert table.column("FIGHTER_LINK").to_pylist() == [
+        None,
+        "http://ufcstats.com/fighter-details/b",
+    ]
+
+
+def test_parquet_rejects_undeclared_columns(tmp_path):
+    sink = record_sinks.ParquetSink(str(tmp_path))
+    with pytest.raises(ValueError, match="missing from its schema"):
+        sink.write_chunk("All_Fights", pd.DataFrame({"surprise": [1]}))
@@ -0,0 +1,94 @@
+import pytest
+import requests
+
+import retry
+
+
+def http_error(status):
+    response = requests.Response()
+    response.status_code = status
+    return requests.HTTPError(f"{status} error", response=response)
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    monkeypatch.setattr(retry.time, "sleep", lambda seconds: None)
+
+
+@pytest.mark.parametrize(
+    "error, transient",
+    [
+        (http_error(429), True),
+        (http_error(503), True),
+        (http_error(404), False),
+        (requests.Timeout(), True),
+        (requests.ConnectionError(), True),
+        (ValueError("Totals table missing"), False),
+        (IndexError("list index out of range"), False),
+    ],
+)
+def test_is_transient(error, transient):
+    assert retry.is_transient(error) is transient
+
+
+def test_backoff_delay_is_capped():
+    delays = [retry.backoff_delay(attempt) for attempt in range(10)]
+    assert all(0 <= delay <= retry.MAX_DELAY for delay in delays)
+
+
+def test_transient_errors_are_retried():
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        if len(calls) < 3:
+            raise requests.Timeout()
+        return "page"
+
+    before_retry = []
+    result = retry.call_with_retry(
+        fetch, "http://x", before_retry=lambda: before_retry.append(1)
+    )
+    assert result == "page"
+    assert len(calls) == 3
+    assert len(before_retry) == 2
+
+
+def test_permanent_errors_fail_at_once():
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        raise http_error(404)
+
+    with pytest.raises(retry.ScrapeFailure) as failure:
+        retry.call_with_retry(fetch, "http://x")
+    assert len(calls) == 1
+    assert failure.value.attempts == 1
+    assert failure.value.error_class == "HTTPError"
+    assert not failure.value.transient
+
+
+def test_transient_errors_give_up_after_max_attempts():
+    def fetch():
+        raise http_error(503)
+
+    with pytest.raises(retry.ScrapeFailure) as failure:
+        retry.call_with_retry(fetch, "http://x", max_attempts=3)
+    assert failure.value.attempts == 3
+    assert failure.value.transient
+    assert failure.value.link == "http://x"
+
+
+def test_failed_write_is_dead_lettered():
+    failures = []
+
+    def handle_result(link, result):
+        raise ValueError("database is locked")
+
+    delivered = retry.deliver_result(
+        "http://x", "page", handle_result, lambda link, f: failures.append(f)
+    )
+    assert not delivered
+    assert [(f.link, f.error_class) for f in failures] == [("http://x", "ValueError")]
+    assert retry.deliver_result("http://x", "page", lambda link, result: None)
@@ -0,0 +1,87 @@
+import os
+import sqlite3
+import sys
+
+import pytest
+
+from conftest import TESTS_DIR
+
+sys.path.insert(0, os.path.join(TESTS_DIR, "..", "connectors"))
+
+import updateDB  # noqa: E402
+
+STRIKE_COLUMNS = ["HEAD", "BODY", "LEG", "DISTANCE", "CLINCH", "GROUND"]
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "UFC_Data.db")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE Fight_Details (FIGHTER TEXT, SIG_STR TEXT, TOTAL_STR TEXT, "
+        "TD TEXT, SIG_STR_SUCCESSFUL INTEGER, SIG_STR_ATTEMPTS INTEGER)"
+    )
+    conn.executemany(
+        "INSERT INTO Fight_Details VALUES (?, ?, ?, ?, ?, ?)",
+        [
+            # Legacy row, never split
+            ("A", "121 of 235", "188 of 327", "1 of 2", None, None),
+            # Legacy row an earlier split stored as zeros
+            ("B", "92 of 250", "95 of 254", "0 of 6", 0, 0),
+            # Row from the typed writer: no raw text
+            ("C", None, None, None, 5, 9),
+            # ufcstats shows "---" for stats it doesn't have
+            ("D", "---", "---", "---", None, None),
+        ],
+    )
+    conn.execute(
+        "CREATE TABLE Significant_Strikes (FIGHTER TEXT, "
+        + ", ".join(f"{column} TEXT" for column in STRIKE_COLUMNS)
+        + ")"
+    )
+    conn.execute(
+        "INSERT INTO Significant_Strikes VALUES (?, ?, ?, ?, ?, ?, ?)",
+        ("A", "74 of 174", "15 of 23", "32 of 38", "111 of 219", "5 of 6", "5 of 10"),
+    )
+    conn.commit()
+    conn.close()
+    return path
+
+
+def fetch(db_path, sql):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(sql).fetchall()
+    finally:
+        conn.close()
+
+
+def test_split_and_update(db_path):
+    updateDB.split_and_update(db_path)
+
+    rows = fetch(
+        db_path,
+        "SELECT FIGHTER, SIG_STR_SUCCESSFUL, SIG_STR_ATTEMPTS, TD_SUCCESSFUL, "
+        "TD_ATTEMPTS FROM Fight_Details ORDER BY FIGHTER",
+    )
+    assert rows == [
+        ("A", 121, 235, 1, 2),
+        ("B", 92, 250, 0, 6),
+        ("C", 5, 9, None, None),
+        ("D", None, None, None, None),
+    ]
+    assert fetch(
+        db_path, "SELECT HEAD_SUCCESSFUL, GROUND_ATTEMPTS FROM Significant_Strikes"
+    ) == [(74, 10)]
+
+
+def test_incremental_run_only_touches_unsplit_rows(db_path, capsys):
+    updateDB.split_and_update(db_path)
+    capsys.readouterr()
+
+    updateDB.split_and_update(db_path)
+    assert "Split 0 values in Fight_Details" in capsys.readouterr().out
+
+    updateDB.split_and_update(db_path, full=True)
+    # Every row with raw text, and only those, is split again
+    assert "Split 9 values in Fight_Details" in capsys.readouterr().out
@@ -0,0 +1,88 @@
+import pytest
+from sqlalchemy import text
+
+import work_queue
+
+CARD_LINKS = [f"http://ufcstats.com/event-details/{i:016x}" for i in range(3)]
+FIGHT_LINKS = [f"http://ufcstats.com/fight-details/{i:016x}" for i in range(10)]
+
+
+@pytest.fixture
+def queue_db(engine):
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO All_Cards (card_link, details_scraped) "
+                "VALUES (:link, :done)"
+            ),
+            [{"link": link, "done": i == 0} for i, link in enumerate(CARD_LINKS)],
+        )
+        conn.execute(
+            text("INSERT INTO All_Fights (fight_link) VALUES (:link)"),
+            [{"link": link} for link in FIGHT_LINKS],
+        )
+    return engine
+
+
+def statuses(engine):
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT link, status FROM Work_Queue"))
+        return {row.link: row.status for row in rows}
+
+
+def test_enqueue_adds_unscraped_pages_once(queue_db):
+    queue = work_queue.WorkQueue(queue_db, owner="a")
+    assert queue.enqueue_unprocessed() == 12
+    assert queue.enqueue_unprocessed() == 0
+    assert CARD_LINKS[0] not in statuses(queue_db)
+
+
+def test_workers_claim_disjoint_leases(queue_db):
+    a = work_queue.WorkQueue(queue_db, owner="a")
+    b = work_queue.WorkQueue(queue_db, owner="b")
+    a.enqueue_unprocessed()
+
+    claimed_a = a.claim("fight", limit=6)
+    claimed_b = b.claim("fight", limit=6)
+    assert len(claimed_a) == 6
+    assert sorted(claimed_a + claimed_b) == sorted(FIGHT_LINKS)
+    assert b.claim("fight") == []
+
+
+def test_only_the_lease_owner_finishes_links(queue_db):
+    a = work_queue.WorkQueue(queue_db, owner="a")
+    b = work_queue.WorkQueue(queue_db, owner="b")
+    a.enqueue_unprocessed()
+    claimed = a.claim("event")
+
+    b.complete(claimed)
+    assert {statuses(queue_db)[link] for link in claimed} == {work_queue.LEASED}
+    a.complete(claimed[:1])
+    a.fail(claimed[1:])
+    assert statuses(queue_db)[claimed[0]] == work_queue.DONE
+    assert statuses(queue_db)[claimed[1]] == work_queue.FAILED
+
+
+def test_expired_leases_are_claimed_again(queue_db):
+    crashed = work_queue.WorkQueue(queue_db, owner="crashed", lease_seconds=-1)
+    crashed.enqueue_unprocessed()
+    claimed = crashed.claim("fight", limit=4)
+
+    other = work_queue.WorkQueue(queue_db, owner="other")
+    reclaimed = other.claim("fight", limit=len(FIGHT_LINKS))
+    assert set(claimed) <= set(reclaimed)
+    # The crashed worker can no longer finish links it lost
+    crashed.complete(claimed)
+    assert {statuses(queue_db)[link] for link in claimed} == {work_queue.LEASED}
+
+
+def test_requeue_and_release_return_links_to_pending(queue_db):
+    queue = work_queue.WorkQueue(queue_db, owner="a", lease_seconds=-1)
+    queue.enqueue_unprocessed()
+    claimed = queue.claim("fight", limit=4)
+    assert queue.requeue_expired() == 4
+
+    queue.lease_seconds = 300
+    claimed = queue.claim("fight", limit=4)
+    queue.release(claimed)
+    assert {statuses(queue_db)[link] for link in claimed} == {work_queue.PENDING}
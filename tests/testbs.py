@@ -1,18 +1,19 @@
-from selenium import webdriver
+import os
+import sys
+
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait  # Import WebDriverWait
 from selenium.webdriver.support import (
     expected_conditions as EC,
 )  # Import expected_conditions
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 import pandas as pd
 
 
-def init_driver():
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service)
-    return driver
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scraping-scripts")
+)
+
+from chromedriver import init_driver  # noqa: E402
 
 
 def scrape_fight_details(driver, fight_link):